@@ -0,0 +1,37 @@
+"""Add snippets_through_message_id to stories table
+
+Revision ID: e4f5a6b7c8d9
+Revises: d8e9f0a1b2c3
+Create Date: 2026-10-16 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e4f5a6b7c8d9"
+down_revision: Union[str, Sequence[str], None] = "d8e9f0a1b2c3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add snippets_through_message_id to stories table.
+
+    snippets_through_message_id: Id of the last message already covered by
+               snippet generation. Incremental regeneration only sends the
+               messages after it. NULL until snippets are first generated.
+    """
+    op.add_column(
+        "stories",
+        sa.Column("snippets_through_message_id", sa.Integer(), nullable=True),
+    )
+
+
+def downgrade() -> None:
+    """Remove snippets_through_message_id from stories table."""
+    op.drop_column("stories", "snippets_through_message_id")
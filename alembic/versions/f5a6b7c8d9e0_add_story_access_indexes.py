@@ -0,0 +1,76 @@
+"""Add composite indexes for message and snippet access patterns
+
+Revision ID: f5a6b7c8d9e0
+Revises: e4f5a6b7c8d9
+Create Date: 2026-10-16 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f5a6b7c8d9e0"
+down_revision: Union[str, Sequence[str], None] = "e4f5a6b7c8d9"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Add composite indexes matching how messages and snippets are read.
+
+    ix_messages_story_id_created_at: Transcripts are read per story in
+               chronological order (id breaks ties), so history loads no
+               longer sort in memory. Replaces ix_messages_story_id.
+
+    ix_snippets_story_active_locked_created: Locked-card lookups,
+               regeneration and archived lists filter on story, is_active
+               and is_locked.
+
+    ix_snippets_story_created_active: Partial index on active cards only,
+               ordered by created_at; serves the active deck. Replaces the
+               low-selectivity ix_snippets_is_active.
+
+    Indexes are built CONCURRENTLY on PostgreSQL so writes are not blocked
+    while they are created.
+    """
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_messages_story_id_created_at",
+            "messages",
+            ["story_id", "created_at", "id"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_snippets_story_active_locked_created",
+            "snippets",
+            ["story_id", "is_active", "is_locked", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_snippets_story_created_active",
+            "snippets",
+            ["story_id", "created_at"],
+            unique=False,
+            postgresql_where=sa.text("is_active = true"),
+            sqlite_where=sa.text("is_active = 1"),
+            postgresql_concurrently=True,
+        )
+
+    # Covered by the leading columns of the composite indexes above
+    op.drop_index("ix_messages_story_id", table_name="messages")
+    op.drop_index("ix_snippets_is_active", table_name="snippets")
+
+
+def downgrade() -> None:
+    """Restore the single-column indexes and drop the composite ones."""
+    op.create_index("ix_snippets_is_active", "snippets", ["is_active"], unique=False)
+    op.create_index("ix_messages_story_id", "messages", ["story_id"], unique=False)
+    op.drop_index("ix_snippets_story_created_active", table_name="snippets")
+    op.drop_index("ix_snippets_story_active_locked_created", table_name="snippets")
+    op.drop_index("ix_messages_story_id_created_at", table_name="messages")
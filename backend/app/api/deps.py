@@ -0,0 +1,120 @@
+"""
+Shared FastAPI dependencies that load a resource and authorize access to it.
+
+Each dependency resolves the row in a single query and checks that it
+belongs to the authenticated user, raising 404 if it does not exist and
+403 if it belongs to someone else. Endpoints receive the loaded row and
+pass it on to the service layer instead of querying for it again.
+
+FastAPI caches dependencies per request, so the session used here is the
+same one the endpoint receives.
+"""
+
+from typing import Callable
+
+from fastapi import Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend.app.core.auth import (
+    authenticate_token_async,
+    get_current_active_user,
+    get_current_active_user_async,
+)
+from backend.app.core.principal_cache import Principal
+from backend.app.db.session import get_async_db, get_db
+from backend.app.models.snippets import Snippet
+from backend.app.models.story import Story
+
+
+def _authorize_story(story: Story, current_user: Principal) -> Story:
+    if not story:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
+        )
+
+    # Ensure user owns the story
+    if story.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this story",
+        )
+
+    return story
+
+
+def get_owned_story(
+    story_id: int,
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+) -> Story:
+    """Load a story owned by the authenticated user."""
+    story = db.query(Story).filter(Story.id == story_id).first()
+    return _authorize_story(story, current_user)
+
+
+async def get_owned_story_async(
+    story_id: int,
+    current_user: Principal = Depends(get_current_active_user_async),
+    db: AsyncSession = Depends(get_async_db),
+) -> Story:
+    """Async variant of get_owned_story for endpoints on the async engine."""
+    story = await db.get(Story, story_id)
+    return _authorize_story(story, current_user)
+
+
+async def authorize_story_token(
+    story_id: int, token: str, db: AsyncSession
+) -> Story:
+    """
+    Load a story owned by the holder of a raw access token.
+
+    Used by the events WebSocket, which cannot use the bearer dependencies.
+
+    Raises:
+        HTTPException: 401 for a bad token, otherwise as get_owned_story
+    """
+    current_user = await authenticate_token_async(token, db)
+    story = await db.get(Story, story_id)
+    return _authorize_story(story, current_user)
+
+
+def owned_snippet(action: str = "access") -> Callable[..., Snippet]:
+    """
+    Build a dependency that loads a snippet owned by the authenticated user.
+
+    Ownership is checked through the snippet's story, joined in the same
+    query.
+
+    Args:
+        action: Verb used in the 403 message, e.g. "update"
+    """
+
+    def get_owned_snippet(
+        snippet_id: int,
+        current_user: Principal = Depends(get_current_active_user),
+        db: Session = Depends(get_db),
+    ) -> Snippet:
+        row = (
+            db.query(Snippet, Story.user_id)
+            .outerjoin(Story, Story.id == Snippet.story_id)
+            .filter(Snippet.id == snippet_id)
+            .first()
+        )
+        if not row:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Snippet not found",
+            )
+
+        # Verify user owns the snippet (via story ownership)
+        snippet, owner_id = row
+        if owner_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Not authorized to {action} this snippet",
+            )
+
+        return snippet
+
+    return get_owned_snippet
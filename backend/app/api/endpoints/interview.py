@@ -1,14 +1,16 @@
-from typing import List, Optional
+import json
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from backend.app.core.auth import get_current_active_user
-from backend.app.db.session import get_db
+from backend.app.api.deps import get_owned_story_async
+from backend.app.core.responses import prebuilt_response
+from backend.app.db.session import get_async_db
 from backend.app.models.story import Story
-from backend.app.models.user import User
-from backend.app.services.interview import InterviewService
+from backend.app.services.interview import AsyncInterviewService
 
 router = APIRouter()
 
@@ -34,11 +36,10 @@ class ChatResponse(BaseModel):
 
 
 @router.post("/{story_id}", response_model=ChatResponse)
-def chat_with_agent(
-    story_id: int,
+async def chat_with_agent(
     request: ChatRequest,
-    current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db),
+    story: Story = Depends(get_owned_story_async),
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
     Send a message to the AI interviewer for a specific story.
@@ -52,39 +53,83 @@ def chat_with_agent(
     - age_range: User's selected age range (if set)
     - phase_description: Human-readable phase description
     """
-    # Verify story exists and user owns it
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
-        )
-
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
-    service = InterviewService(db)
+    service = AsyncInterviewService(db)
     try:
         # Process the chat (Save User -> Think -> Save AI)
-        ai_message, phase_metadata = service.process_chat(
-            story_id, request.message, advance_phase=request.advance_phase or False
+        ai_message, phase_metadata = await service.process_chat(
+            story.id,
+            request.message,
+            advance_phase=request.advance_phase or False,
+            story=story,
         )
 
-        return {
-            "id": ai_message.id,
-            "role": ai_message.role,
-            "content": ai_message.content,
-            "phase": phase_metadata["phase"],
-            "phase_order": phase_metadata["phase_order"],
-            "phase_index": phase_metadata["phase_index"],
-            "age_range": phase_metadata["age_range"],
-            "phase_description": phase_metadata["phase_description"],
-        }
+        return prebuilt_response(
+            {
+                "id": ai_message.id,
+                "role": ai_message.role,
+                "content": ai_message.content,
+                "phase": phase_metadata["phase"],
+                "phase_order": phase_metadata["phase_order"],
+                "phase_index": phase_metadata["phase_index"],
+                "age_range": phase_metadata["age_range"],
+                "phase_description": phase_metadata["phase_description"],
+            }
+        )
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         print(f"Error processing chat: {e}")
         raise HTTPException(status_code=500, detail="Internal Server Error")
-        raise HTTPException(status_code=500, detail="Internal Server Error")
+
+
+def _format_sse(event: str, data: Dict) -> str:
+    """Encode a single Server-Sent Event frame."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _sse_stream(
+    events: AsyncIterator[Tuple[str, Dict]],
+) -> AsyncIterator[str]:
+    """Convert service events to SSE frames, reporting failures in-band."""
+    try:
+        async for event, data in events:
+            yield _format_sse(event, data)
+    except Exception as e:
+        # Headers are already sent, so errors go out as an event
+        print(f"Error streaming chat: {e}")
+        yield _format_sse("error", {"detail": "Internal Server Error"})
+
+
+@router.post("/{story_id}/stream")
+async def stream_chat_with_agent(
+    request: ChatRequest,
+    story: Story = Depends(get_owned_story_async),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Streaming variant of POST /api/interview/{story_id} using Server-Sent Events.
+
+    Requires authentication. User must own the story.
+
+    Event stream:
+    - event: token - {"content": "..."} for each generated text chunk
+    - event: done  - same payload as ChatResponse, sent once the assistant
+                     message has been saved
+    - event: error - {"detail": "..."} if generation fails mid-stream
+    """
+    service = AsyncInterviewService(db)
+    try:
+        events = await service.stream_chat(
+            story.id,
+            request.message,
+            advance_phase=request.advance_phase or False,
+            story=story,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
+    return StreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,28 @@
-from fastapi import APIRouter, Depends, HTTPException
+"""
+Message feed endpoints: the authenticated user's messages across stories.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from backend.app.core.auth import get_current_active_user
+from backend.app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    InvalidCursor,
+    fetch_page,
+)
+from backend.app.core.principal_cache import Principal
+from backend.app.core.responses import json_response
+from backend.app.db.read_models import MESSAGE_COLUMNS, rows_to_dicts
 from backend.app.db.session import get_db
 from backend.app.models.message import Message
+from backend.app.models.story import Story
 
 router = APIRouter()
 
@@ -22,6 +41,20 @@ class MessageResponse(BaseModel):
         orm_mode = True  # Pydantic v1
 
 
+class MessageFeedItem(BaseModel):
+    """Message in the user's feed."""
+
+    id: int
+    story_id: int
+    role: str
+    content: str
+    phase_context: Optional[str]
+    created_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
+
+
 @router.post("/", response_model=MessageResponse)
 def create_message(msg: MessageCreate, db: Session = Depends(get_db)):
     db_msg = Message(role=msg.role, content=msg.content)
@@ -31,6 +64,51 @@ def create_message(msg: MessageCreate, db: Session = Depends(get_db)):
     return db_msg
 
 
-@router.get("/")
-def read_messages(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Message).offset(skip).limit(limit).all()
+@router.get("/", response_model=List[MessageFeedItem])
+def read_messages(
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page"
+    ),
+    story_id: Optional[int] = Query(None, description="Only this story's messages"),
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
+):
+    """
+    List the messages of the authenticated user's stories, oldest first.
+
+    Only the messages of stories the caller owns are visible. Pages hold at
+    most PAGE_SIZE_MAX messages whatever limit is asked for; when more
+    follow, the response carries an X-Next-Cursor header to pass back as
+    ?cursor=.
+
+    Args:
+        limit: Page size (capped at PAGE_SIZE_MAX)
+        cursor: Cursor of the previous page
+        story_id: Only return the messages of this story
+        current_user: Authenticated user
+        db: Database session
+
+    Returns:
+        One page of the user's messages
+
+    Raises:
+        HTTPException: If the cursor is invalid
+    """
+    query = (
+        db.query(*MESSAGE_COLUMNS)
+        .join(Story, Story.id == Message.story_id)
+        .filter(Story.user_id == current_user.id)
+    )
+    if story_id is not None:
+        query = query.filter(Message.story_id == story_id)
+
+    try:
+        messages, next_cursor = fetch_page(
+            query, (Message.id,), cursor, min(limit, PAGE_SIZE_MAX)
+        )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(rows_to_dicts(messages), headers=headers)
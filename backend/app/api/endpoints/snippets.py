@@ -3,21 +3,34 @@ Snippet endpoints for story game cards.
 
 GET /api/snippets/{story_id} - Get existing snippets for a story (cached)
 POST /api/snippets/{story_id} - Generate/regenerate snippets for a story
+    (?incremental=true to only process messages since the last generation,
+    ?background=true to queue a job instead of waiting for the result)
+GET /api/snippets/jobs/{job_id} - Status and result of a background job
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from backend.app.api.deps import get_owned_story, owned_snippet
 from backend.app.core.auth import get_current_active_user
+from backend.app.core.jobs import JOB_SUCCEEDED, Job, JobConflict
+from backend.app.core.principal_cache import Principal
+from backend.app.core.responses import json_response, prebuilt_response
 from backend.app.db.session import get_db
 from backend.app.models.snippets import Snippet
 from backend.app.models.story import Story
-from backend.app.models.user import User
-from backend.app.services.snippets import SnippetService
+from backend.app.services.snippets import (
+    SnippetService,
+    publish_snippets_result,
+    run_snippet_generation,
+    snippet_job_key,
+    snippet_job_mode,
+    snippet_jobs,
+)
 
 router = APIRouter()
 
@@ -53,6 +66,19 @@ class SnippetsResponse(BaseModel):
     error: Optional[str] = None
 
 
+class SnippetJobResponse(BaseModel):
+    """Status of a background snippet generation job."""
+
+    job_id: str
+    status: str  # queued, running, succeeded, failed
+    mode: Optional[str] = None  # full or incremental
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[SnippetsResponse] = None  # Set once the job succeeded
+    error: Optional[str] = None  # Set if the job crashed
+
+
 class ArchivedSnippetsResponse(BaseModel):
     """Response for archived snippets."""
 
@@ -71,13 +97,66 @@ class SnippetUpdate(BaseModel):
     phase: Optional[str] = None
 
 
+# --- Helpers ---
+
+
+def _snippets_payload(result: dict) -> dict:
+    """
+    Build the SnippetsResponse body for a SnippetService.generate_snippets result.
+
+    The snippet dicts come from Snippet.to_dict(), so the body already has
+    the shape of SnippetsResponse and can be sent without re-validation.
+    """
+    if not result["success"]:
+        # Return the error in the response body, not as HTTP error
+        # This allows frontend to show a friendly message
+        print(f"[API] Generation failed: {result.get('error')}")
+        return {
+            "success": False,
+            "snippets": [],
+            "count": 0,
+            "cached": False,
+            "locked_count": None,
+            "model": result.get("model"),
+            "error": result.get("error", "Failed to generate snippets"),
+        }
+
+    print(f"[API] ✅ Success! Generated {result['count']} snippets")
+    return {
+        "success": True,
+        "snippets": result["snippets"],
+        "count": result["count"],
+        "cached": result.get("cached", False),  # False if freshly generated
+        "locked_count": None,
+        "model": result.get("model"),
+        "error": None,
+    }
+
+
+def _job_response(job: Job) -> SnippetJobResponse:
+    """Build the API response for a snippet job."""
+    result = None
+    if job.status == JOB_SUCCEEDED:
+        result = SnippetsResponse(**_snippets_payload(job.result))
+
+    return SnippetJobResponse(
+        job_id=job.id,
+        status=job.status,
+        mode=job.mode,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        result=result,
+        error=job.error,
+    )
+
+
 # --- Endpoints ---
 
 
 @router.get("/{story_id}", response_model=SnippetsResponse)
 def get_snippets(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
@@ -90,47 +169,39 @@ def get_snippets(
     Requires authentication. User must own the story.
 
     Args:
-        story_id: ID of the story
-        current_user: Authenticated user (injected)
+        story: Story owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
         SnippetsResponse with cached snippets
     """
-    # Verify story exists
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Story not found",
-        )
-
-    # Verify user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
     # Get existing snippets
     service = SnippetService(db)
-    result = service.get_existing_snippets(story_id)
-    locked_count = service.get_locked_snippet_count(story_id)
-
-    return SnippetsResponse(
-        success=True,
-        snippets=[SnippetItem(**s) for s in result["snippets"]],
-        count=result["count"],
-        cached=result["cached"],
-        locked_count=locked_count,
-        error=None,
+    result = service.get_existing_snippets(story.id)
+    locked_count = service.get_locked_snippet_count(story.id)
+
+    # The dicts already match SnippetItem; skip re-validating every card
+    return json_response(
+        {
+            "success": True,
+            "snippets": result["snippets"],
+            "count": result["count"],
+            "cached": result["cached"],
+            "locked_count": locked_count,
+            "model": None,
+            "error": None,
+        }
     )
 
 
-@router.post("/{story_id}", response_model=SnippetsResponse)
+@router.post(
+    "/{story_id}", response_model=Union[SnippetsResponse, SnippetJobResponse]
+)
 def generate_snippets(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    response: Response,
+    incremental: bool = False,
+    background: bool = False,
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
@@ -142,67 +213,67 @@ def generate_snippets(
     3. Sends them to Gemini for analysis
     4. Saves and returns 3-8 snippets (max 300 chars each)
 
+    With ?incremental=true, existing cards are kept and only the messages
+    added since the last generation are analyzed; new cards are added or
+    replace the unlocked cards they update. The full active deck is returned.
+
+    With ?background=true, generation is queued on the snippet job workers
+    and 202 is returned with a SnippetJobResponse right away; poll
+    GET /api/snippets/jobs/{job_id} for the result. While a job for the
+    story is queued or running, the same job is returned; if that job is of
+    the other mode (full vs incremental), 409 is returned instead.
+
     Use GET /api/snippets/{story_id} to check for existing snippets first.
 
     Requires authentication. User must own the story.
 
     Args:
-        story_id: ID of the story to generate snippets for
-        current_user: Authenticated user (injected)
+        incremental: Update existing cards instead of regenerating all
+        background: Queue a job instead of generating within the request
+        story: Story owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
-        SnippetsResponse with generated snippets
+        SnippetsResponse with generated snippets, or SnippetJobResponse
+        when background=true
     """
-    # Verify story exists
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Story not found",
-        )
-
-    # Verify user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
+    if background:
+        try:
+            job = snippet_jobs.submit(
+                snippet_job_key(story.id),
+                run_snippet_generation,
+                story.id,
+                incremental=incremental,
+                owner_id=story.user_id,
+                mode=snippet_job_mode(incremental),
+            )
+        except JobConflict as e:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=(
+                    f"A {e.active.mode} snippet job ({e.active.id}) is already "
+                    f"{e.active.status} for this story"
+                ),
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return _job_response(job)
 
     # Generate snippets
     print(
-        f"[API] POST /api/snippets/{story_id} - Generating snippets for story {story_id}"
+        f"[API] POST /api/snippets/{story.id} - Generating snippets for story {story.id}"
     )
     service = SnippetService(db)
 
     try:
-        result = service.generate_snippets(story_id)
+        result = service.generate_snippets(
+            story.id, incremental=incremental, story=story
+        )
+        publish_snippets_result(story.id, result)
         print(
             f"[API] Service returned: success={result.get('success')}, model={result.get('model')}"
         )
 
-        if not result["success"]:
-            # Return the error in the response body, not as HTTP error
-            # This allows frontend to show a friendly message
-            print(f"[API] Generation failed: {result.get('error')}")
-            return SnippetsResponse(
-                success=False,
-                snippets=[],
-                count=0,
-                cached=False,
-                model=result.get("model"),
-                error=result.get("error", "Failed to generate snippets"),
-            )
-
-        print(f"[API] ✅ Success! Generated {result['count']} snippets")
-        return SnippetsResponse(
-            success=True,
-            snippets=[SnippetItem(**snippet) for snippet in result["snippets"]],
-            count=result["count"],
-            cached=False,  # Freshly generated
-            model=result.get("model"),
-            error=None,
-        )
+        return prebuilt_response(_snippets_payload(result))
 
     except Exception as e:
         print(f"[API] ❌ Unexpected error: {type(e).__name__}: {e}")
@@ -212,11 +283,46 @@ def generate_snippets(
         )
 
 
+@router.get("/jobs/{job_id}", response_model=SnippetJobResponse)
+def get_snippet_job(
+    job_id: str,
+    current_user: Principal = Depends(get_current_active_user),
+):
+    """
+    Get the status of a background snippet generation job.
+
+    Once the job has succeeded, result holds the same SnippetsResponse the
+    synchronous POST returns. Finished jobs are kept for an hour.
+
+    Requires authentication. User must own the job.
+
+    Args:
+        job_id: ID returned by POST /api/snippets/{story_id}?background=true
+        current_user: Authenticated user (injected)
+
+    Returns:
+        SnippetJobResponse with status and, when done, the result
+    """
+    job = snippet_jobs.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job not found",
+        )
+
+    if job.owner_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this job",
+        )
+
+    return _job_response(job)
+
+
 @router.put("/{snippet_id}", response_model=SnippetItem)
 def update_snippet(
-    snippet_id: int,
     snippet_data: SnippetUpdate,
-    current_user: User = Depends(get_current_active_user),
+    snippet: Snippet = Depends(owned_snippet("update")),
     db: Session = Depends(get_db),
 ):
     """
@@ -226,9 +332,8 @@ def update_snippet(
     Only the owner of the snippet (via story ownership) can update it.
 
     Args:
-        snippet_id: ID of the snippet to update
         snippet_data: Fields to update (all optional)
-        current_user: Authenticated user (injected)
+        snippet: Snippet owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
@@ -238,22 +343,6 @@ def update_snippet(
         HTTPException 404: Snippet not found
         HTTPException 403: Not authorized (not owner)
     """
-    # Find the snippet
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Snippet not found",
-        )
-
-    # Verify user owns the snippet (via story ownership)
-    story = db.query(Story).filter(Story.id == snippet.story_id).first()
-    if not story or story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to update this snippet",
-        )
-
     # Update fields if provided
     if snippet_data.title is not None:
         snippet.title = snippet_data.title[:200]  # Enforce max length
@@ -267,7 +356,7 @@ def update_snippet(
     db.commit()
     db.refresh(snippet)
 
-    print(f"[API] ✅ Updated snippet {snippet_id}: title='{snippet.title[:30]}...'")
+    print(f"[API] ✅ Updated snippet {snippet.id}: title='{snippet.title[:30]}...'")
 
     return SnippetItem(
         id=snippet.id,
@@ -283,8 +372,7 @@ def update_snippet(
 
 @router.patch("/{snippet_id}/lock", response_model=SnippetItem)
 def toggle_snippet_lock(
-    snippet_id: int,
-    current_user: User = Depends(get_current_active_user),
+    snippet: Snippet = Depends(owned_snippet("modify")),
     db: Session = Depends(get_db),
 ):
     """
@@ -294,8 +382,7 @@ def toggle_snippet_lock(
     deleted when new snippets are generated.
 
     Args:
-        snippet_id: ID of the snippet to lock/unlock
-        current_user: Authenticated user (injected)
+        snippet: Snippet owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
@@ -305,36 +392,19 @@ def toggle_snippet_lock(
         HTTPException 404: Snippet not found
         HTTPException 403: Not authorized (not owner)
     """
-    # Find the snippet
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Snippet not found",
-        )
-
-    # Verify user owns the snippet (via story ownership)
-    story = db.query(Story).filter(Story.id == snippet.story_id).first()
-    if not story or story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to modify this snippet",
-        )
-
     # Toggle lock
     service = SnippetService(db)
-    result = service.toggle_lock(snippet_id)
+    result = service.toggle_lock(snippet.id)
 
     action = "locked" if result["is_locked"] else "unlocked"
-    print(f"[API] ✅ {action.capitalize()} snippet {snippet_id}")
+    print(f"[API] ✅ {action.capitalize()} snippet {snippet.id}")
 
     return SnippetItem(**result)
 
 
 @router.get("/{story_id}/archived", response_model=ArchivedSnippetsResponse)
 def get_archived_snippets(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
@@ -343,51 +413,35 @@ def get_archived_snippets(
     Archived snippets can be restored using POST /api/snippets/{snippet_id}/restore.
 
     Args:
-        story_id: ID of the story
-        current_user: Authenticated user (injected)
+        story: Story owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
         ArchivedSnippetsResponse with archived snippets
     """
-    # Verify story exists
-    story = db.query(Story).filter(Story.id == story_id).first()
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Story not found",
-        )
-
-    # Verify user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
     service = SnippetService(db)
-    result = service.get_archived_snippets(story_id)
-
-    return ArchivedSnippetsResponse(
-        success=True,
-        snippets=[SnippetItem(**s) for s in result["snippets"]],
-        count=result["count"],
-        error=None,
+    result = service.get_archived_snippets(story.id)
+
+    return json_response(
+        {
+            "success": True,
+            "snippets": result["snippets"],
+            "count": result["count"],
+            "error": None,
+        }
     )
 
 
 @router.post("/{snippet_id}/restore", response_model=SnippetItem)
 def restore_snippet(
-    snippet_id: int,
-    current_user: User = Depends(get_current_active_user),
+    snippet: Snippet = Depends(owned_snippet("restore")),
     db: Session = Depends(get_db),
 ):
     """
     Restore an archived (soft-deleted) snippet.
 
     Args:
-        snippet_id: ID of the snippet to restore
-        current_user: Authenticated user (injected)
+        snippet: Snippet owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
@@ -397,35 +451,18 @@ def restore_snippet(
         HTTPException 404: Snippet not found
         HTTPException 403: Not authorized (not owner)
     """
-    # Find the snippet
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Snippet not found",
-        )
-
-    # Verify user owns the snippet (via story ownership)
-    story = db.query(Story).filter(Story.id == snippet.story_id).first()
-    if not story or story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to restore this snippet",
-        )
-
     service = SnippetService(db)
-    result = service.restore_snippet(snippet_id)
+    result = service.restore_snippet(snippet.id)
 
-    print(f"[API] ✅ Restored snippet {snippet_id}")
+    print(f"[API] ✅ Restored snippet {snippet.id}")
 
     return SnippetItem(**result)
 
 
 @router.delete("/{snippet_id}", response_model=SnippetItem)
 def delete_snippet(
-    snippet_id: int,
     permanent: bool = False,
-    current_user: User = Depends(get_current_active_user),
+    snippet: Snippet = Depends(owned_snippet("delete")),
     db: Session = Depends(get_db),
 ):
     """
@@ -435,9 +472,8 @@ def delete_snippet(
     Permanent deletion cannot be undone.
 
     Args:
-        snippet_id: ID of the snippet to delete
         permanent: If True, permanently delete instead of soft-delete
-        current_user: Authenticated user (injected)
+        snippet: Snippet owned by the authenticated user (injected)
         db: Database session (injected)
 
     Returns:
@@ -447,31 +483,15 @@ def delete_snippet(
         HTTPException 404: Snippet not found
         HTTPException 403: Not authorized (not owner)
     """
-    # Find the snippet
-    snippet = db.query(Snippet).filter(Snippet.id == snippet_id).first()
-    if not snippet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Snippet not found",
-        )
-
-    # Verify user owns the snippet (via story ownership)
-    story = db.query(Story).filter(Story.id == snippet.story_id).first()
-    if not story or story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to delete this snippet",
-        )
-
     service = SnippetService(db)
 
     if permanent:
         # Return snippet data before permanent deletion
         snippet_data = snippet.to_dict()
-        service.permanently_delete_snippet(snippet_id)
-        print(f"[API] ✅ Permanently deleted snippet {snippet_id}")
+        service.permanently_delete_snippet(snippet_data["id"])
+        print(f"[API] ✅ Permanently deleted snippet {snippet_data['id']}")
         return SnippetItem(**snippet_data)
     else:
-        result = service.soft_delete_snippet(snippet_id)
-        print(f"[API] ✅ Soft-deleted (archived) snippet {snippet_id}")
+        result = service.soft_delete_snippet(snippet.id)
+        print(f"[API] ✅ Soft-deleted (archived) snippet {snippet.id}")
         return SnippetItem(**result)
@@ -2,21 +2,50 @@
 Story management endpoints for creating and managing user stories.
 """
 
+import asyncio
+import hashlib
+import os
 from datetime import datetime
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from pydantic import BaseModel
+from sqlalchemy import func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend.app.api.deps import authorize_story_token, get_owned_story
 from backend.app.core.auth import get_current_active_user
-from backend.app.db.session import get_db
+from backend.app.core.events import story_events
+from backend.app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    PAGE_SIZE_DEFAULT,
+    PAGE_SIZE_MAX,
+    InvalidCursor,
+    fetch_page,
+)
+from backend.app.core.principal_cache import Principal
+from backend.app.core.responses import json_response
+from backend.app.db.read_models import MESSAGE_COLUMNS, STORY_COLUMNS, rows_to_dicts
+from backend.app.db.session import get_async_db, get_db
 from backend.app.models.message import Message
 from backend.app.models.story import Story
-from backend.app.models.user import User
 
 router = APIRouter()
 
+# Idle seconds before the events socket sends a ping
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("STORY_EVENTS_HEARTBEAT_SECONDS", "25"))
+
 
 # --- Pydantic Models ---
 
@@ -67,13 +96,58 @@ class MessageResponse(BaseModel):
         from_attributes = True
 
 
+# --- Helpers ---
+
+
+def _messages_etag(
+    story_id: int,
+    after_id: Optional[int],
+    since: Optional[datetime],
+    page_key: str,
+    count: int,
+    last_id: Optional[int],
+) -> str:
+    """
+    Build the ETag of a message list.
+
+    Messages are append-only, so the number of matching rows and the
+    highest id identify the list without reading the rows themselves.
+    page_key tells apart the pages (cursor and limit) of the same list.
+    """
+    since_key = since.isoformat() if since else ""
+    key = f"{story_id}:{after_id}:{since_key}:{page_key}:{count}:{last_id}"
+    return f'W/"{hashlib.sha1(key.encode()).hexdigest()[:16]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def _opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(_opaque(tag) == _opaque(etag) for tag in if_none_match.split(","))
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    """Read (and ignore) client frames until the client goes away."""
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
 # --- Endpoints ---
 
 
 @router.post("/", response_model=StoryResponse, status_code=status.HTTP_201_CREATED)
 def create_story(
     story_data: StoryCreate,
-    current_user: User = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
     """
@@ -105,34 +179,51 @@ def create_story(
 
 @router.get("/", response_model=List[StoryResponse])
 def list_stories(
-    current_user: User = Depends(get_current_active_user), db: Session = Depends(get_db)
+    limit: int = Query(PAGE_SIZE_DEFAULT, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page"
+    ),
+    current_user: Principal = Depends(get_current_active_user),
+    db: Session = Depends(get_db),
 ):
     """
-    List all stories for the authenticated user.
+    List the stories of the authenticated user, oldest first, one page at a time.
+
+    When more stories follow, the response carries an X-Next-Cursor header;
+    pass it back as ?cursor= to get the next page.
 
     Args:
+        limit: Page size
+        cursor: Cursor of the previous page
         current_user: Authenticated user
         db: Database session
 
     Returns:
-        List of user's stories
+        One page of the user's stories
+
+    Raises:
+        HTTPException: If the cursor is invalid
     """
-    stories = db.query(Story).filter(Story.user_id == current_user.id).all()
-    return stories
+    query = db.query(*STORY_COLUMNS).filter(Story.user_id == current_user.id)
+    try:
+        stories, next_cursor = fetch_page(query, (Story.id,), cursor, limit)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else None
+    return json_response(rows_to_dicts(stories), headers=headers)
 
 
 @router.get("/{story_id}", response_model=StoryResponse)
 def get_story(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
     Get a specific story by ID.
 
     Args:
-        story_id: Story ID
-        current_user: Authenticated user
+        story: Story owned by the authenticated user (injected)
         db: Database session
 
     Returns:
@@ -141,37 +232,21 @@ def get_story(
     Raises:
         HTTPException: If story not found or not owned by user
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
-
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
-        )
-
-    # Ensure user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
     return story
 
 
 @router.put("/{story_id}", response_model=StoryResponse)
 def update_story(
-    story_id: int,
     story_data: StoryUpdate,
-    current_user: User = Depends(get_current_active_user),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
     Update a story's metadata.
 
     Args:
-        story_id: Story ID
         story_data: Story update data
-        current_user: Authenticated user
+        story: Story owned by the authenticated user (injected)
         db: Database session
 
     Returns:
@@ -180,20 +255,6 @@ def update_story(
     Raises:
         HTTPException: If story not found or not owned by user
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
-
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
-        )
-
-    # Ensure user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
     # Update fields
     if story_data.title is not None:
         story.title = story_data.title
@@ -212,35 +273,19 @@ def update_story(
 
 @router.delete("/{story_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_story(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
     Delete a story.
 
     Args:
-        story_id: Story ID
-        current_user: Authenticated user
+        story: Story owned by the authenticated user (injected)
         db: Database session
 
     Raises:
         HTTPException: If story not found or not owned by user
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
-
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
-        )
-
-    # Ensure user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
-
     db.delete(story)
     db.commit()
 
@@ -249,44 +294,137 @@ def delete_story(
 
 @router.get("/{story_id}/messages", response_model=List[MessageResponse])
 def get_story_messages(
-    story_id: int,
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    after_id: Optional[int] = Query(
+        None, ge=0, description="Only return messages with an id greater than this"
+    ),
+    since: Optional[datetime] = Query(
+        None, description="Only return messages created after this time"
+    ),
+    limit: int = Query(PAGE_SIZE_MAX, ge=1, le=PAGE_SIZE_MAX),
+    cursor: Optional[str] = Query(
+        None, description="X-Next-Cursor of the previous page"
+    ),
+    story: Story = Depends(get_owned_story),
     db: Session = Depends(get_db),
 ):
     """
-    Get all messages for a story.
+    Get the messages of a story, optionally only those after a cursor.
+
+    Polling clients pass the id of the last message they have as after_id
+    and send back the ETag they got as If-None-Match; when nothing new
+    matches, the response is 304 Not Modified with no body.
+
+    At most limit messages are returned. When more follow, the response
+    carries an X-Next-Cursor header; pass it back as ?cursor= (with the
+    same filters) to get the next page.
 
     Args:
-        story_id: Story ID
-        current_user: Authenticated user
+        after_id: Only return messages with an id greater than this
+        since: Only return messages created after this time
+        limit: Page size
+        cursor: Cursor of the previous page
+        story: Story owned by the authenticated user (injected)
         db: Database session
 
     Returns:
-        List of messages for the story
+        One page of the story's messages, oldest first
 
     Raises:
-        HTTPException: If story not found or not owned by user
+        HTTPException: If story not found or not owned by user, or the
+            cursor is invalid
     """
-    story = db.query(Story).filter(Story.id == story_id).first()
-
-    if not story:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Story not found"
+    filters = [Message.story_id == story.id]
+    if after_id is not None:
+        filters.append(Message.id > after_id)
+    if since is not None:
+        filters.append(Message.created_at > since)
+
+    # Cheap aggregate first, so an unchanged poll never loads the rows
+    count, last_id = (
+        db.query(func.count(Message.id), func.max(Message.id)).filter(*filters).one()
+    )
+    page_key = f"{cursor or ''}:{limit}"
+    etag = _messages_etag(story.id, after_id, since, page_key, count, last_id)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if count == 0:
+        return json_response([], headers=headers)
+
+    # Fetch one page of messages, ordered by creation time
+    try:
+        messages, next_cursor = fetch_page(
+            db.query(*MESSAGE_COLUMNS).filter(*filters),
+            (Message.created_at, Message.id),
+            cursor,
+            limit,
         )
+    except InvalidCursor as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    # Ensure user owns the story
-    if story.user_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not authorized to access this story",
-        )
+    if next_cursor:
+        headers[NEXT_CURSOR_HEADER] = next_cursor
+    return json_response(rows_to_dicts(messages), headers=headers)
 
-    # Fetch messages for this story, ordered by creation time
-    messages = (
-        db.query(Message)
-        .filter(Message.story_id == story_id)
-        .order_by(Message.created_at.asc())
-        .all()
-    )
 
-    return messages
+@router.websocket("/{story_id}/events")
+async def story_events_socket(
+    websocket: WebSocket,
+    story_id: int,
+    token: str = "",
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Push the events of a story to the client over a WebSocket.
+
+    Browsers cannot set headers on WebSocket connections, so the access
+    token is passed as ?token=. Each frame is a JSON object with event,
+    story_id and data:
+    - message: a saved message, with the fields of MessageResponse
+    - phase: phase metadata after a phase change
+    - snippets: snippet generation finished (success, count, cached, error)
+    - resync: events were dropped; refetch over HTTP
+    - ping: heartbeat, sent after EVENTS_HEARTBEAT_SECONDS without events
+
+    The socket is closed with 4401 for a bad token, 4403 if the story
+    belongs to someone else and 4404 if it does not exist.
+    """
+    await websocket.accept()
+    try:
+        await authorize_story_token(story_id, token, db)
+    except HTTPException as e:
+        await websocket.close(code=4000 + e.status_code, reason=str(e.detail))
+        return
+    finally:
+        # Give the connection back to the pool; the socket may stay open
+        # for hours
+        await db.close()
+
+    subscription = story_events.subscribe(story_id)
+    disconnected = asyncio.create_task(_wait_for_disconnect(websocket))
+    try:
+        while True:
+            next_event = asyncio.create_task(subscription.get())
+            done, _ = await asyncio.wait(
+                {next_event, disconnected},
+                timeout=EVENTS_HEARTBEAT_SECONDS,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if disconnected in done:
+                next_event.cancel()
+                break
+            if next_event in done:
+                await websocket.send_json(next_event.result())
+            else:
+                next_event.cancel()
+                await websocket.send_json(
+                    {"event": "ping", "story_id": story_id, "data": {}}
+                )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        disconnected.cancel()
+        story_events.unsubscribe(subscription)
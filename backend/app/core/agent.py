@@ -1,11 +1,33 @@
 import os
-from typing import Annotated, List, TypedDict, Union
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Annotated, Iterator, List, Optional, TypedDict, Union
 
 from dotenv import load_dotenv
+from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.tracers.context import register_configure_hook
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langgraph.graph import END, StateGraph
 
+from backend.app.core.llm_clients import llm_clients
+from backend.app.core.llm_scheduler import caller_from_config, llm_scheduler
+from backend.app.core.model_health import model_health
+from backend.app.core.prompt_cache import prompt_cache
+from backend.app.core.retry_policy import (
+    ACTION_FAIL,
+    ACTION_RETRY,
+    ERROR_BUSY,
+    ERROR_FATAL,
+    ERROR_RATE_LIMIT,
+    RetryDecision,
+    classify_error,
+    record_model_error,
+    retry_policy,
+)
+from backend.domain.services.context_window import ContextWindowService
+
 load_dotenv()
 
 
@@ -43,87 +65,341 @@ if not os.getenv("GEMINI_API_KEY"):
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
+AGENT_TEMPERATURE = 0.7
+
 
 # 4. Define Nodes with Fallback Logic
-def chatbot_node(state: AgentState):
+def _build_prompt(state: AgentState) -> List[BaseMessage]:
+    """Prepend the system instruction (Phase/Persona) to the conversation."""
+    system_msg = SystemMessage(content=state["phase_instruction"])
+    return [system_msg] + state["messages"]
+
+
+def _new_llm(model_name: str, temperature: float) -> ChatGoogleGenerativeAI:
+    """Build a new chat model client (called by the client registry on a miss)."""
+    llm = ChatGoogleGenerativeAI(
+        model=model_name,
+        google_api_key=GEMINI_API_KEY,
+        temperature=temperature,
+        convert_system_message_to_human=True,
+    )
+    print(f"[Agent] 🔄 LLM initialized for {model_name}")
+    return llm
+
+
+def _create_llm(model_name: str) -> ChatGoogleGenerativeAI:
+    """Get the shared chat model client for a single cascade attempt."""
+    return llm_clients.get(model_name, AGENT_TEMPERATURE, _new_llm)
+
+
+def warm_up_llm_clients() -> List[str]:
+    """Create clients for the whole cascade up front (called at startup)."""
+    return llm_clients.warm_up(get_model_cascade(), AGENT_TEMPERATURE, _new_llm)
+
+
+def _healthy_cascade() -> List[str]:
+    """Model cascade minus the models the circuit breaker has opened."""
+    model_cascade = get_model_cascade()
+    available = model_health.available_models(model_cascade)
+    skipped = [m for m in model_cascade if m not in available]
+    if skipped:
+        print(f"[Agent] ⏭️ Skipping cooling-down models: {skipped}")
+    print(f"[Agent] 🔄 Model cascade: {available}")
+    return available
+
+
+def _handle_model_failure(
+    error: Exception,
+    decision: RetryDecision,
+    model_name: str,
+    attempt_idx: int,
+    cascade_size: int,
+    deadline_passed: bool = False,
+) -> None:
     """
-    The core node that talks to the AI with automatic model fallback.
+    Give up on a model after the retry policy decided not to retry it.
 
-    Tries models in cascade until one succeeds or all fail.
+    Returns normally when the cascade should move on to the next model,
+    raises when it should stop: on a fatal error, after the last model, or
+    once the request's retry deadline has passed.
     """
-    messages = state["messages"]
-    phase_instruction = state["phase_instruction"]
+    record_model_error(model_name, error, decision.kind)
+    is_last = attempt_idx == cascade_size - 1
 
-    # Prepend the system instruction (Phase/Persona)
-    system_msg = SystemMessage(content=phase_instruction)
-    full_messages = [system_msg] + messages
+    if decision.action == ACTION_FAIL:
+        print(f"[Agent] ⚠️ Non-retryable error, aborting cascade")
+        raise error
 
-    # Get model cascade
-    model_cascade = get_model_cascade()
-    print(f"[Agent] 🔄 Model cascade: {model_cascade}")
+    if deadline_passed and not is_last:
+        print(f"[Agent] ⌛ Request deadline passed, not trying further models")
+        raise error
+
+    if decision.kind == ERROR_RATE_LIMIT:
+        print(f"[Agent] 🔄 Rate limit detected, trying next model...")
+
+        # If last model, raise error
+        if is_last:
+            print(f"[Agent] ❌ ALL MODELS EXHAUSTED")
+            raise Exception(f"All {cascade_size} models exhausted rate limits")
+        return
+
+    if decision.kind == ERROR_BUSY:
+        # Busy here, not unhealthy: the circuit breaker was left alone
+        print(f"[Agent] ⏭️ {error}, trying next model...")
+    else:
+        print(f"[Agent] 🔄 {model_name} still failing, trying next model...")
+    if is_last:
+        raise error
+
+
+class StreamedTokenCounter(BaseCallbackHandler):
+    """Counts the tokens a node's model calls have streamed out."""
+
+    run_inline = True
+
+    def __init__(self):
+        self.count = 0
+
+    def on_llm_new_token(self, token, **kwargs) -> None:
+        if token:
+            self.count += 1
+
+
+# Attached to every model call made while a node has set it (see _tokens_streamed)
+_streamed_tokens: ContextVar[Optional[StreamedTokenCounter]] = ContextVar(
+    "agent_streamed_tokens", default=None
+)
+register_configure_hook(_streamed_tokens, inheritable=True)
+
+
+def _tokens_streamed() -> bool:
+    """
+    Whether the current node already streamed part of a reply.
+
+    Under stream_mode="messages" every token reaches the client as it is
+    generated. Once that has happened, retrying or falling through to the
+    next model would append a second reply to the partial first one, so
+    the error has to go to the caller instead.
+    """
+    counter = _streamed_tokens.get()
+    return counter is not None and counter.count > 0
+
+
+def _give_up_mid_stream(error: Exception, model_name: str) -> None:
+    """Record a model that failed after streaming tokens, then re-raise."""
+    print(f"[Agent] ⚠️ {model_name} failed mid-stream, not retrying")
+    record_model_error(model_name, error, classify_error(error))
+    raise error
+
+
+@contextmanager
+def _track_streamed_tokens() -> Iterator[None]:
+    """Count the tokens streamed by the model calls made inside the block."""
+    reset_token = _streamed_tokens.set(StreamedTokenCounter())
+    try:
+        yield
+    finally:
+        _streamed_tokens.reset(reset_token)
+
+
+def _log_failure(error: Exception, model_name: str) -> None:
+    error_message = str(error)
+    print(f"[Agent] ❌ {model_name} FAILED")
+    print(f"[Agent] ❌ Error type: {type(error).__name__}")
+    print(f"[Agent] ❌ Error message: {error_message[:200]}")
+
+
+def _estimate_prompt_tokens(messages: List[BaseMessage]) -> int:
+    """Rough prompt size, charged against the model's tokens-per-minute quota."""
+    return sum(ContextWindowService.estimate_tokens(str(m.content)) for m in messages)
 
-    # Try each model in cascade
-    for attempt_idx, model_name in enumerate(model_cascade):
+
+def _invoke_llm(
+    llm: ChatGoogleGenerativeAI, model_name: str, full_messages: List[BaseMessage]
+):
+    """
+    Call a model, reusing a provider cache of the system prompt when one exists.
+
+    A cache that expired or was evicted on the provider side fails the
+    request; it is then forgotten and the full prompt is sent instead.
+    """
+    prepared = prompt_cache.prepare(model_name, full_messages)
+    if prepared.cached_content is None:
+        response = llm.invoke(full_messages)
+    else:
         try:
-            print(
-                f"[Agent] 🔄 Attempt {attempt_idx + 1}/{len(model_cascade)}: Trying '{model_name}'..."
+            response = llm.invoke(
+                prepared.messages, cached_content=prepared.cached_content
             )
+        except Exception as e:
+            # Only a rejected cache is handled here; the cascade retries the rest
+            if classify_error(e) != ERROR_FATAL or _tokens_streamed():
+                raise
+            print(f"[Agent] ⚠️ Cached prompt rejected, resending in full: {e}")
+            prompt_cache.discard(prepared)
+            response = llm.invoke(full_messages)
+    prompt_cache.record_usage(response)
+    return response
 
-            # Initialize model for this attempt
-            llm = ChatGoogleGenerativeAI(
-                model=model_name,
-                google_api_key=GEMINI_API_KEY,
-                temperature=0.7,
-                convert_system_message_to_human=True,
+
+async def _ainvoke_llm(
+    llm: ChatGoogleGenerativeAI, model_name: str, full_messages: List[BaseMessage]
+):
+    """Async counterpart of _invoke_llm."""
+    prepared = await prompt_cache.aprepare(model_name, full_messages)
+    if prepared.cached_content is None:
+        response = await llm.ainvoke(full_messages)
+    else:
+        try:
+            response = await llm.ainvoke(
+                prepared.messages, cached_content=prepared.cached_content
             )
-            print(f"[Agent] 🔄 LLM initialized for {model_name}")
+        except Exception as e:
+            # Only a rejected cache is handled here; the cascade retries the rest
+            if classify_error(e) != ERROR_FATAL or _tokens_streamed():
+                raise
+            print(f"[Agent] ⚠️ Cached prompt rejected, resending in full: {e}")
+            prompt_cache.discard(prepared)
+            response = await llm.ainvoke(full_messages)
+    prompt_cache.record_usage(response)
+    return response
 
-            # Call Gemini
-            print(f"[Agent] 🔄 Sending request to {model_name}...")
-            response = llm.invoke(full_messages)
 
-            # Success!
-            print(f"[Agent] ✅ SUCCESS with {model_name}!")
-            return {"messages": [response]}
+def chatbot_node(state: AgentState, config: Optional[RunnableConfig] = None):
+    """
+    The core node that talks to the AI with automatic model fallback.
 
-        except Exception as e:
-            error_message = str(e)
-            print(f"[Agent] ❌ {model_name} FAILED")
-            print(f"[Agent] ❌ Error type: {type(e).__name__}")
-            print(f"[Agent] ❌ Error message: {error_message[:200]}")
-
-            # Check if rate limit error
-            is_rate_limit = any(
-                indicator in error_message.lower()
-                for indicator in ["429", "resource_exhausted", "rate limit", "quota"]
-            )
+    Tries models in cascade until one succeeds or all fail. Each call
+    waits for a slot from llm_scheduler; the user and priority it is
+    queued under come from the run config (see caller_config).
+    """
+    full_messages = _build_prompt(state)
+    user_key, priority = caller_from_config(config)
+    prompt_tokens = _estimate_prompt_tokens(full_messages)
+
+    # Get model cascade (skipping models that are cooling down)
+    model_cascade = _healthy_cascade()
+
+    budget = retry_policy.start()
 
-            if is_rate_limit:
-                print(f"[Agent] 🔄 Rate limit detected, trying next model...")
+    with _track_streamed_tokens():
+        # Try each model in cascade, retrying transient errors on the same one
+        for attempt_idx, model_name in enumerate(model_cascade):
+            print(
+                f"[Agent] 🔄 Attempt {attempt_idx + 1}/{len(model_cascade)}: Trying '{model_name}'..."
+            )
+            while True:
+                try:
+                    llm = _create_llm(model_name)
 
-                # If last model, raise error
-                if attempt_idx == len(model_cascade) - 1:
-                    print(f"[Agent] ❌ ALL MODELS EXHAUSTED")
-                    raise Exception(
-                        f"All {len(model_cascade)} models exhausted rate limits"
-                    )
+                    # Call Gemini
+                    with llm_scheduler.slot(
+                        model_name,
+                        user_key,
+                        priority,
+                        prompt_tokens,
+                        timeout=budget.remaining(),
+                    ) as permit:
+                        print(f"[Agent] 🔄 Sending request to {model_name}...")
+                        response = _invoke_llm(llm, model_name, full_messages)
+                        permit.record_usage(response)
 
-                # Continue to next model
-                continue
+                    # Success!
+                    model_health.record_success(model_name)
+                    print(f"[Agent] ✅ SUCCESS with {model_name}!")
+                    return {"messages": [response]}
 
-            # Non-rate-limit error - fail immediately
-            print(f"[Agent] ⚠️ Non-rate-limit error, aborting cascade")
-            raise
+                except Exception as e:
+                    _log_failure(e, model_name)
+                    if _tokens_streamed():
+                        _give_up_mid_stream(e, model_name)
+                    decision = budget.decide(e, model_name)
+                    if decision.action != ACTION_RETRY:
+                        _handle_model_failure(
+                            e,
+                            decision,
+                            model_name,
+                            attempt_idx,
+                            len(model_cascade),
+                            deadline_passed=budget.expired(),
+                        )
+                        break
+                    print(f"[Agent] 🔁 Retrying {model_name} in {decision.delay:.2f}s...")
+                    budget.sleep(decision.delay)
 
     # Should never reach here
     raise Exception("Failed to generate response with any model")
 
 
+async def achatbot_node(
+    state: AgentState, config: Optional[RunnableConfig] = None
+):
+    """
+    Async counterpart of chatbot_node, used by agent_app.ainvoke/astream.
+
+    Awaits the model (and its scheduler slot) instead of blocking a worker
+    thread for the whole Gemini round-trip. Fallback behaviour is identical.
+    """
+    full_messages = _build_prompt(state)
+    user_key, priority = caller_from_config(config)
+    prompt_tokens = _estimate_prompt_tokens(full_messages)
+
+    model_cascade = _healthy_cascade()
+
+    budget = retry_policy.start()
+
+    with _track_streamed_tokens():
+        for attempt_idx, model_name in enumerate(model_cascade):
+            print(
+                f"[Agent] 🔄 Attempt {attempt_idx + 1}/{len(model_cascade)}: Trying '{model_name}'..."
+            )
+            while True:
+                try:
+                    llm = _create_llm(model_name)
+
+                    async with llm_scheduler.aslot(
+                        model_name,
+                        user_key,
+                        priority,
+                        prompt_tokens,
+                        timeout=budget.remaining(),
+                    ) as permit:
+                        print(f"[Agent] 🔄 Sending request to {model_name}...")
+                        response = await _ainvoke_llm(
+                            llm, model_name, full_messages
+                        )
+                        permit.record_usage(response)
+
+                    model_health.record_success(model_name)
+                    print(f"[Agent] ✅ SUCCESS with {model_name}!")
+                    return {"messages": [response]}
+
+                except Exception as e:
+                    _log_failure(e, model_name)
+                    if _tokens_streamed():
+                        _give_up_mid_stream(e, model_name)
+                    decision = budget.decide(e, model_name)
+                    if decision.action != ACTION_RETRY:
+                        _handle_model_failure(
+                            e,
+                            decision,
+                            model_name,
+                            attempt_idx,
+                            len(model_cascade),
+                            deadline_passed=budget.expired(),
+                        )
+                        break
+                    print(f"[Agent] 🔁 Retrying {model_name} in {decision.delay:.2f}s...")
+                    await budget.asleep(decision.delay)
+
+    raise Exception("Failed to generate response with any model")
+
+
 # 4. Build Graph
 workflow = StateGraph(AgentState)
 
-# Add the node
-workflow.add_node("chatbot", chatbot_node)
+# Add the node (sync for invoke/stream, async for ainvoke/astream)
+workflow.add_node("chatbot", RunnableLambda(chatbot_node, afunc=achatbot_node))
 
 # Define flow (Start -> Chatbot -> End)
 workflow.set_entry_point("chatbot")
@@ -6,35 +6,26 @@ from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from backend.app.core.principal_cache import Principal, principal_cache
 from backend.app.core.security import decode_access_token
-from backend.app.db.session import get_db
+from backend.app.db.session import get_async_db, get_db
 from backend.app.models.user import User
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
+def _user_id_from_token(token: str) -> int:
     """
-    Dependency to get the current authenticated user from JWT token.
-
-    Args:
-        credentials: Bearer token from Authorization header
-        db: Database session
-
-    Returns:
-        User object for the authenticated user
+    Decode a bearer token and return the user id from its ``sub`` claim.
 
     Raises:
-        HTTPException: If token is invalid or user not found
+        HTTPException: If the token is invalid or has no usable subject
     """
-    token = credentials.credentials
-
     # Decode token
     payload = decode_access_token(token)
     if payload is None:
@@ -53,9 +44,8 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-    # Fetch user from database
     try:
-        user_id = int(user_id_str)
+        return int(user_id_str)
     except (ValueError, TypeError):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -63,6 +53,39 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+
+def _check_active(is_active: bool) -> None:
+    """Reject inactive accounts."""
+    if not is_active:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
+        )
+
+
+def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> User:
+    """
+    Dependency to get the current authenticated user from JWT token.
+
+    Loads the full User row; use it where profile fields are needed.
+    Endpoints that only need the caller's id should use
+    get_current_active_user, which is served from the principal cache.
+
+    Args:
+        credentials: Bearer token from Authorization header
+        db: Database session
+
+    Returns:
+        User object for the authenticated user
+
+    Raises:
+        HTTPException: If token is invalid or user not found
+    """
+    user_id = _user_id_from_token(credentials.credentials)
+
+    # Fetch user from database
     user = db.query(User).filter(User.id == user_id).first()
     if user is None:
         raise HTTPException(
@@ -71,19 +94,119 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    principal_cache.set(
+        str(user.id), Principal(id=user.id, is_active=user.is_active)
+    )
+
     # Check if user is active
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user"
-        )
+    _check_active(user.is_active)
 
     return user
 
 
-def get_current_active_user(current_user: User = Depends(get_current_user)) -> User:
+def get_current_principal(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: Session = Depends(get_db),
+) -> Principal:
+    """
+    Dependency to get the id and active status of the authenticated user.
+
+    Served from the principal cache when possible, so most requests do not
+    touch the users table. On a miss only the id and is_active columns are
+    loaded.
+
+    Args:
+        credentials: Bearer token from Authorization header
+        db: Database session
+
+    Returns:
+        Principal for the authenticated user
+
+    Raises:
+        HTTPException: If token is invalid, user not found or inactive
+    """
+    user_id = _user_id_from_token(credentials.credentials)
+
+    principal = principal_cache.get(str(user_id))
+    if principal is None:
+        row = db.query(User.id, User.is_active).filter(User.id == user_id).first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal(id=row.id, is_active=bool(row.is_active))
+        principal_cache.set(str(user_id), principal)
+
+    _check_active(principal.is_active)
+
+    return principal
+
+
+async def authenticate_token_async(token: str, db: AsyncSession) -> Principal:
+    """
+    Resolve a raw access token to a Principal on the async engine.
+
+    For connections that cannot send an Authorization header, such as
+    browser WebSockets, which pass the token as a query parameter.
+
+    Raises:
+        HTTPException: If token is invalid, user not found or inactive
+    """
+    user_id = _user_id_from_token(token)
+
+    principal = principal_cache.get(str(user_id))
+    if principal is None:
+        result = await db.execute(
+            select(User.id, User.is_active).where(User.id == user_id)
+        )
+        row = result.first()
+        if row is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        principal = Principal(id=row.id, is_active=bool(row.is_active))
+        principal_cache.set(str(user_id), principal)
+
+    _check_active(principal.is_active)
+
+    return principal
+
+
+def get_current_active_user(
+    current_user: Principal = Depends(get_current_principal),
+) -> Principal:
     """
     Dependency to get the current active user.
 
     This is a convenience wrapper that can be extended with additional checks.
+    Returns a Principal (id, is_active), not a User row; depend on
+    get_current_user for the full profile.
+    """
+    return current_user
+
+
+async def get_current_principal_async(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncSession = Depends(get_async_db),
+) -> Principal:
+    """
+    Async variant of get_current_principal for endpoints on the async engine.
+
+    A cache miss is looked up on the request's AsyncSession instead of a
+    sync session from get_db. A sync session would keep its connection
+    checked out until the request is torn down, i.e. for the whole model
+    call or SSE stream; the async session's transaction is ended by the
+    service before the model runs.
     """
+    return await authenticate_token_async(credentials.credentials, db)
+
+
+async def get_current_active_user_async(
+    current_user: Principal = Depends(get_current_principal_async),
+) -> Principal:
+    """Async variant of get_current_active_user."""
     return current_user
@@ -0,0 +1,207 @@
+"""
+Response compression for large JSON bodies.
+
+Transcripts from /api/stories/{id}/messages and snippet decks are large,
+repetitive text, and the frontend polls some of them every few seconds.
+Compressing them cuts the bytes on the wire several-fold.
+
+CompressionMiddleware compresses a response only when all of these hold:
+- the client accepts one of COMPRESSION_ENCODINGS (br needs the optional
+  brotli package; otherwise gzip is used)
+- the Content-Type is one of COMPRESSION_CONTENT_TYPES (JSON by default)
+- the body is sent in one piece and is at least COMPRESSION_MIN_SIZE bytes
+- the response is not already encoded
+
+Streaming responses (SSE chat streams, StreamingResponse) and WebSockets
+are passed through untouched: they are never buffered or compressed, and
+the response start of anything that cannot be compressed is sent as soon
+as the app produces it, so SSE clients get headers before the first token.
+"""
+
+import gzip
+import os
+from typing import List, Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # Optional dependency, see requirements.txt
+    brotli = None
+
+COMPRESSION_ENABLED = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = os.getenv("COMPRESSION_ENCODINGS", "br,gzip")
+COMPRESSION_CONTENT_TYPES = os.getenv("COMPRESSION_CONTENT_TYPES", "application/json")
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "5"))
+
+# Bodies above this size are compressed off the event loop
+THREAD_MIN_SIZE = 64 * 1024
+
+# Never compressed, whatever COMPRESSION_CONTENT_TYPES says
+NEVER_COMPRESSED = {"text/event-stream"}
+
+
+def _split_list(value: str) -> List[str]:
+    return [item.strip().lower() for item in value.split(",") if item.strip()]
+
+
+def parse_accept_encoding(header: str) -> dict:
+    """Map each coding in an Accept-Encoding header to its q-value."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip().lower() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing large, complete bodies of selected types."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = COMPRESSION_MIN_SIZE,
+        encodings: str = COMPRESSION_ENCODINGS,
+        content_types: str = COMPRESSION_CONTENT_TYPES,
+        gzip_level: int = COMPRESSION_GZIP_LEVEL,
+        brotli_quality: int = COMPRESSION_BROTLI_QUALITY,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = set(_split_list(content_types)) - NEVER_COMPRESSED
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+        self.encodings = []
+        for encoding in _split_list(encodings):
+            if encoding == "br" and brotli is None:
+                continue
+            if encoding in ("br", "gzip"):
+                self.encodings.append(encoding)
+
+    def choose_encoding(self, accept_encoding: str) -> Optional[str]:
+        """Pick the first configured encoding the client accepts."""
+        accepted = parse_accept_encoding(accept_encoding)
+        for encoding in self.encodings:
+            q = accepted.get(encoding, accepted.get("*", 0.0))
+            if q > 0:
+                return encoding
+        return None
+
+    def is_compressible_type(self, content_type: str) -> bool:
+        media_type = content_type.split(";")[0].strip().lower()
+        if not media_type or media_type in NEVER_COMPRESSED:
+            return False
+        if media_type in self.content_types:
+            return True
+        return f"{media_type.split('/')[0]}/*" in self.content_types
+
+    def compress(self, body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.choose_encoding(
+            Headers(scope=scope).get("accept-encoding", "")
+        )
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressingResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressingResponder:
+    """
+    Holds back the response start until the body shows whether to compress.
+
+    Only responses that could be compressed are held: anything else (SSE,
+    non-JSON types, already encoded bodies, 1xx/204/304) has its start sent
+    at once, so streamed responses get their status and headers before the
+    first chunk is produced.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start: Optional[Message] = None
+        self.passthrough = False
+
+    async def send(self, message: Message) -> None:
+        if self.passthrough:
+            await self.downstream(message)
+            return
+
+        if message["type"] == "http.response.start":
+            if self._is_candidate(message):
+                self.start = message
+            else:
+                self.passthrough = True
+                await self.downstream(message)
+            return
+
+        if message["type"] != "http.response.body" or self.start is None:
+            # Anything but a body (e.g. pathsend): release the start first
+            if self.start is not None:
+                await self.downstream(self.start)
+                self.start = None
+            self.passthrough = True
+            await self.downstream(message)
+            return
+
+        # Only the first body message of a candidate response gets here
+        start, self.start = self.start, None
+        self.passthrough = True
+        body = message.get("body", b"")
+
+        if message.get("more_body", False) or len(body) < self.middleware.minimum_size:
+            # Streamed or not worth it: send as is
+            await self.downstream(start)
+            await self.downstream(message)
+            return
+
+        compressed = await self._compress(body)
+        headers = MutableHeaders(raw=start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        await self.downstream(start)
+        await self.downstream(
+            {"type": "http.response.body", "body": compressed, "more_body": False}
+        )
+
+    def _is_candidate(self, start: Message) -> bool:
+        """Whether the body of a response may be compressed (decided at start)."""
+        headers = MutableHeaders(raw=start["headers"])
+        if not self.middleware.is_compressible_type(headers.get("content-type", "")):
+            return False
+        headers.add_vary_header("Accept-Encoding")
+        if start["status"] < 200 or start["status"] in (204, 304):
+            return False
+        return "content-encoding" not in headers
+
+    async def _compress(self, body: bytes) -> bytes:
+        if len(body) >= THREAD_MIN_SIZE:
+            return await anyio.to_thread.run_sync(
+                self.middleware.compress, body, self.encoding
+            )
+        return self.middleware.compress(body, self.encoding)
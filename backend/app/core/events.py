@@ -0,0 +1,127 @@
+"""
+In-process publish/subscribe of story events.
+
+Open chat tabs used to poll the messages endpoint every few seconds to
+notice new messages, phase changes and finished snippet jobs. Instead,
+they subscribe to a story's channel (see the events WebSocket in
+api/endpoints/stories.py) and the code that makes those changes publishes
+an event to it.
+
+Publishers run on request threads, job workers and the event loop, so
+publish() is thread-safe: each event is handed to the subscriber's own
+event loop with call_soon_threadsafe. A subscriber that falls behind by
+more than its queue size gets its backlog replaced by a single "resync"
+event, telling the client to refetch over HTTP.
+
+Subscribers live in process memory and only see events published by the
+same process; with several workers, clients should keep a slow fallback
+poll.
+"""
+
+import asyncio
+import os
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Optional, Set
+
+EVENT_QUEUE_SIZE = int(os.getenv("STORY_EVENTS_QUEUE_SIZE", "100"))
+
+EVENT_MESSAGE = "message"
+EVENT_PHASE = "phase"
+EVENT_SNIPPETS = "snippets"
+EVENT_RESYNC = "resync"
+
+
+class Subscription:
+    """One client's queue of events for a story."""
+
+    def __init__(
+        self,
+        story_id: int,
+        loop: asyncio.AbstractEventLoop,
+        max_queue: int = EVENT_QUEUE_SIZE,
+    ):
+        self.story_id = story_id
+        self.loop = loop
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max_queue)
+
+    def _deliver(self, event: Dict[str, Any]) -> None:
+        """Enqueue an event; runs on the subscriber's event loop."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # Too far behind: drop the backlog, let the client refetch
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"event": EVENT_RESYNC, "story_id": self.story_id})
+
+    async def get(self) -> Dict[str, Any]:
+        """Wait for the next event."""
+        return await self.queue.get()
+
+
+class StoryEventBus:
+    """Fans story events out to the subscribers of each story."""
+
+    def __init__(self, max_queue: int = EVENT_QUEUE_SIZE):
+        self.max_queue = max_queue
+        self._subscribers: Dict[int, Set[Subscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, story_id: int) -> Subscription:
+        """Subscribe to a story. Must be called from the subscriber's event loop."""
+        subscription = Subscription(
+            story_id, asyncio.get_running_loop(), self.max_queue
+        )
+        with self._lock:
+            self._subscribers[story_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Stop delivering events to a subscription."""
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.story_id)
+            if subscribers is None:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.story_id]
+
+    def has_subscribers(self, story_id: int) -> bool:
+        """Check whether anyone listens to a story (to skip building payloads)."""
+        with self._lock:
+            return bool(self._subscribers.get(story_id))
+
+    def publish(
+        self, story_id: int, event: str, data: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Send an event to every subscriber of a story. Safe from any thread.
+
+        Returns:
+            Number of subscribers the event was handed to
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(story_id, ()))
+
+        payload = {"event": event, "story_id": story_id, "data": data or {}}
+        delivered = 0
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription._deliver, payload
+                )
+                delivered += 1
+            except RuntimeError:
+                # The subscriber's loop is closed; it will never read again
+                self.unsubscribe(subscription)
+        return delivered
+
+    def clear(self) -> None:
+        """Drop all subscriptions."""
+        with self._lock:
+            self._subscribers.clear()
+
+
+# Shared by the services that change stories and the events endpoint
+story_events = StoryEventBus()
@@ -0,0 +1,182 @@
+"""
+In-process background job queue with a local worker pool.
+
+Long model calls (snippet generation, phase summaries) used to run inside
+the request that triggered them, holding a request thread for as long as
+the Gemini cascade took. Jobs run on a small thread pool instead; callers
+get a Job back immediately and poll its status.
+
+Jobs are deduplicated by key: submitting a job while another job with the
+same key is queued or running returns the existing job. A job may carry a
+mode (e.g. full vs incremental); submitting a different mode for a busy
+key raises JobConflict instead, so two kinds of work on the same
+resource never run at once. Finished jobs are
+kept for a while so their result can still be fetched, then pruned.
+
+The queue lives in process memory, so job ids are only valid on the
+instance that created them and are lost on restart.
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+
+@dataclass
+class Job:
+    """A unit of background work and its outcome."""
+
+    id: str
+    key: str
+    owner_id: Optional[int] = None
+    mode: Optional[str] = None
+    status: str = JOB_QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    _done: threading.Event = field(default_factory=threading.Event, repr=False)
+    _finished_clock: float = field(default=0.0, repr=False)
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in (JOB_SUCCEEDED, JOB_FAILED)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the job finishes. Returns False on timeout."""
+        return self._done.wait(timeout)
+
+
+class JobConflict(Exception):
+    """A job of another mode is already queued or running for the key."""
+
+    def __init__(self, active: Job):
+        super().__init__(
+            f"A {active.mode} job ({active.id}) is already {active.status} "
+            f"for {active.key}"
+        )
+        self.active = active
+
+
+class JobQueue:
+    """Thread-pool backed job queue with per-key deduplication."""
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        name: str = "jobs",
+        retention_seconds: float = 3600.0,
+        max_finished: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self.retention_seconds = retention_seconds
+        self.max_finished = max_finished
+        self._clock = clock
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._jobs: Dict[str, Job] = {}
+        self._active: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        key: str,
+        fn: Callable[..., Any],
+        *args: Any,
+        owner_id: Optional[int] = None,
+        mode: Optional[str] = None,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Queue fn(*args, **kwargs), unless a job with the same key is pending.
+
+        Args:
+            key: Deduplication key, e.g. "snippets:42"
+            fn: Work to run on a worker thread; its return value is the result
+            owner_id: ID of the user the job belongs to, for access checks
+            mode: Kind of work; only a pending job of the same mode is reused
+
+        Returns:
+            The new job, or the queued/running job with the same key
+
+        Raises:
+            JobConflict: If the pending job for the key has another mode
+        """
+        with self._lock:
+            active = self._active.get(key)
+            if active is not None:
+                if active.mode != mode:
+                    raise JobConflict(active)
+                print(f"[Jobs] ♻️ {self.name}: reusing {active.status} job {active.id} for {key}")
+                return active
+
+            job = Job(id=uuid.uuid4().hex, key=key, owner_id=owner_id, mode=mode)
+            self._jobs[job.id] = job
+            self._active[key] = job
+            self._prune()
+
+        self._executor.submit(self._run, job, fn, args, kwargs)
+        print(f"[Jobs] 📥 {self.name}: queued job {job.id} for {key}")
+        return job
+
+    def _run(self, job: Job, fn: Callable[..., Any], args: tuple, kwargs: dict) -> None:
+        job.status = JOB_RUNNING
+        job.started_at = datetime.utcnow()
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = JOB_SUCCEEDED
+        except Exception as e:
+            print(f"[Jobs] ❌ {self.name}: job {job.id} failed: {type(e).__name__}: {e}")
+            job.error = str(e)
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = datetime.utcnow()
+            job._finished_clock = self._clock()
+            with self._lock:
+                if self._active.get(job.key) is job:
+                    del self._active[job.key]
+            job._done.set()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Look up a job by id."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active_job(self, key: str) -> Optional[Job]:
+        """Get the queued or running job for a key, if any."""
+        with self._lock:
+            return self._active.get(key)
+
+    def _prune(self) -> None:
+        """Drop expired finished jobs, and the oldest beyond max_finished."""
+        now = self._clock()
+        finished = [job for job in self._jobs.values() if job.is_finished]
+        finished.sort(key=lambda job: job._finished_clock)
+
+        excess = len(finished) - self.max_finished
+        for idx, job in enumerate(finished):
+            expired = now - job._finished_clock > self.retention_seconds
+            if idx < excess or expired:
+                del self._jobs[job.id]
+
+    def clear(self) -> None:
+        """Forget all jobs (running jobs still finish)."""
+        with self._lock:
+            self._jobs.clear()
+            self._active.clear()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker pool."""
+        self._executor.shutdown(wait=wait)
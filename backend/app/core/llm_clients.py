@@ -0,0 +1,87 @@
+"""
+Process-wide registry of chat model clients.
+
+Building a ChatGoogleGenerativeAI instance sets up auth and an HTTP
+transport. The agent and the snippet service used to do that for every
+model on every request; the registry keeps one warm client per
+(model, temperature) and hands the same instance to every caller.
+"""
+
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from langchain_core.language_models.chat_models import BaseChatModel
+
+# Builds a new client for (model_name, temperature)
+ClientFactory = Callable[[str, float], BaseChatModel]
+
+ClientKey = Tuple[str, float]
+
+
+class LLMClientRegistry:
+    """Thread-safe cache of chat model clients keyed by (model, temperature)."""
+
+    def __init__(self):
+        self._clients: Dict[ClientKey, BaseChatModel] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self, model_name: str, temperature: float, factory: ClientFactory
+    ) -> BaseChatModel:
+        """
+        Get the client for a model, creating it with factory on first use.
+
+        Args:
+            model_name: Gemini model name
+            temperature: Sampling temperature the client is configured with
+            factory: Called as factory(model_name, temperature) on a miss
+
+        Returns:
+            Shared client instance
+        """
+        key = (model_name, temperature)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            # Another thread may have created it while we waited
+            client = self._clients.get(key)
+            if client is None:
+                client = factory(model_name, temperature)
+                self._clients[key] = client
+        return client
+
+    def warm_up(
+        self, model_names: Iterable[str], temperature: float, factory: ClientFactory
+    ) -> List[str]:
+        """
+        Create clients ahead of time so the first request does not pay for it.
+
+        Models whose client cannot be built are skipped and reported in the
+        log; they will be retried lazily on first use.
+
+        Returns:
+            Names of the models that are warm
+        """
+        warmed = []
+        for model_name in model_names:
+            try:
+                self.get(model_name, temperature, factory)
+                warmed.append(model_name)
+            except Exception as e:
+                print(f"[LLMClients] ⚠️ Could not warm up {model_name}: {e}")
+        return warmed
+
+    def keys(self) -> List[ClientKey]:
+        """List the (model, temperature) pairs with a cached client."""
+        return list(self._clients.keys())
+
+    def clear(self) -> None:
+        """Drop all cached clients."""
+        with self._lock:
+            self._clients.clear()
+
+
+# Shared by the agent and SnippetService
+llm_clients = LLMClientRegistry()
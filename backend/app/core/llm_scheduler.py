@@ -0,0 +1,469 @@
+"""
+Outbound scheduler for Gemini calls.
+
+Nothing used to bound how many model calls ran at once: a burst of chat
+turns or snippet regenerations hit Gemini together, tripped 429s and
+walked the whole fallback cascade. Every call now takes a slot from the
+model's lane first:
+
+- at most max_concurrency calls per model are in flight;
+- token buckets hold each model to its requests-per-minute and
+  tokens-per-minute quota (0 disables a bucket);
+- waiting calls are served by priority (interactive chat before snippet
+  and summary jobs), round-robin across users within a priority, FIFO
+  per user.
+
+A call that cannot get a slot within the queue timeout raises
+QueueTimeout; the cascades then move on to the next model without
+counting it against the model's health. LLM_QUEUE_TIMEOUT_SECONDS bounds
+the wait on one model; callers pass the time left in their request's
+retry deadline as timeout= so the waits across the cascade stay within
+it as well.
+
+Limits per model come from LLM_MODEL_LIMITS, e.g.
+"gemini-2.5-flash=8:1000:1000000,gemma-3-27b-it=4:30:15000"
+(concurrency:rpm:tpm); other models use the LLM_* defaults.
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Deque,
+    Dict,
+    Hashable,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+PRIORITY_CHAT = 0
+PRIORITY_BACKGROUND = 1
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_DEFAULT_RPM = int(os.getenv("LLM_DEFAULT_RPM", "0"))
+LLM_DEFAULT_TPM = int(os.getenv("LLM_DEFAULT_TPM", "0"))
+LLM_MODEL_LIMITS = os.getenv("LLM_MODEL_LIMITS", "")
+LLM_QUEUE_TIMEOUT_SECONDS = float(os.getenv("LLM_QUEUE_TIMEOUT_SECONDS", "30"))
+
+# Log calls that waited longer than this for a slot
+SLOW_WAIT_SECONDS = 1.0
+
+
+class QueueTimeout(Exception):
+    """A call waited longer than the queue timeout for a model slot."""
+
+
+@dataclass
+class ModelLimits:
+    """Concurrency and quota of one model (0 = no rpm/tpm limit)."""
+
+    max_concurrency: int = LLM_MAX_CONCURRENCY
+    rpm: int = LLM_DEFAULT_RPM
+    tpm: int = LLM_DEFAULT_TPM
+
+
+def parse_model_limits(spec: str) -> Dict[str, ModelLimits]:
+    """Parse "model=concurrency:rpm:tpm,..." (rpm and tpm are optional)."""
+    limits: Dict[str, ModelLimits] = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        model_name, values = item.split("=", 1)
+        parts = [int(v) for v in values.split(":") if v.strip()]
+        defaults = ModelLimits()
+        limits[model_name.strip()] = ModelLimits(
+            max_concurrency=parts[0] if len(parts) > 0 else defaults.max_concurrency,
+            rpm=parts[1] if len(parts) > 1 else defaults.rpm,
+            tpm=parts[2] if len(parts) > 2 else defaults.tpm,
+        )
+    return limits
+
+
+def caller_config(user_key: Optional[Hashable], priority: int) -> Dict[str, Any]:
+    """RunnableConfig telling the agent nodes who a call is for."""
+    return {"configurable": {"llm_user": user_key, "llm_priority": priority}}
+
+
+def caller_from_config(config: Optional[Dict[str, Any]]) -> Tuple[Any, int]:
+    """Read (user key, priority) back from a RunnableConfig; chat by default."""
+    configurable = (config or {}).get("configurable") or {}
+    return (
+        configurable.get("llm_user"),
+        configurable.get("llm_priority", PRIORITY_CHAT),
+    )
+
+
+class TokenBucket:
+    """Refills rate_per_minute units per minute, up to one minute's worth."""
+
+    def __init__(self, rate_per_minute: int, now: float):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.updated = now
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount can be taken (capped at a full bucket)."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing * 60 / self.capacity)
+
+    def take(self, amount: float, now: float) -> None:
+        if self.capacity > 0:
+            self._refill(now)
+            self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class _Waiter:
+    """A call waiting for a slot; notify() wakes it to re-check."""
+
+    def __init__(
+        self, user_key: Any, priority: int, tokens: int, notify: Callable[[], None]
+    ):
+        self.user_key = user_key
+        self.priority = priority
+        self.tokens = tokens
+        self.notify = notify
+        self.granted = False
+
+
+class ModelLane:
+    """Slots, quota buckets and the fair queue of one model."""
+
+    def __init__(self, limits: ModelLimits, now: float):
+        self.limits = limits
+        self.requests = TokenBucket(limits.rpm, now)
+        self.token_budget = TokenBucket(limits.tpm, now)
+        self.in_flight = 0
+        # priority -> user -> FIFO of that user's waiting calls
+        self.queues: Dict[int, "OrderedDict[Any, Deque[_Waiter]]"] = {}
+        self.granted = 0
+        self.timeouts = 0
+        self.max_wait = 0.0
+
+    def enqueue(self, waiter: _Waiter) -> None:
+        users = self.queues.setdefault(waiter.priority, OrderedDict())
+        users.setdefault(waiter.user_key, deque()).append(waiter)
+
+    def remove(self, waiter: _Waiter) -> None:
+        users = self.queues.get(waiter.priority, {})
+        pending = users.get(waiter.user_key)
+        if pending and waiter in pending:
+            pending.remove(waiter)
+            if not pending:
+                del users[waiter.user_key]
+
+    def head(self) -> Optional[_Waiter]:
+        """The call to serve next: best priority, then the next user in turn."""
+        for priority in sorted(self.queues):
+            users = self.queues[priority]
+            if users:
+                return users[next(iter(users))][0]
+        return None
+
+    def pop_head(self) -> _Waiter:
+        for priority in sorted(self.queues):
+            users = self.queues[priority]
+            if users:
+                user_key, pending = next(iter(users.items()))
+                waiter = pending.popleft()
+                # Rotate the user to the back of the line
+                del users[user_key]
+                if pending:
+                    users[user_key] = pending
+                return waiter
+        raise IndexError("no waiting calls")
+
+    def queued(self) -> int:
+        return sum(
+            len(pending) for users in self.queues.values() for pending in users.values()
+        )
+
+
+class Permit:
+    """A granted slot; release it when the call is done."""
+
+    def __init__(self, scheduler: "OutboundScheduler", model_name: str, tokens: int):
+        self.scheduler = scheduler
+        self.model_name = model_name
+        self.tokens = tokens
+        self.released = False
+
+    def record_usage(self, response: Any) -> None:
+        """Charge the tokens the response actually used instead of the estimate."""
+        usage = getattr(response, "usage_metadata", None)
+        if isinstance(usage, dict) and usage.get("total_tokens"):
+            self.scheduler._settle(self.model_name, usage["total_tokens"] - self.tokens)
+            self.tokens = usage["total_tokens"]
+
+    def release(self) -> None:
+        if not self.released:
+            self.released = True
+            self.scheduler._release(self.model_name)
+
+
+class OutboundScheduler:
+    """Per-model concurrency limits, quota buckets and fair queueing."""
+
+    def __init__(
+        self,
+        default_limits: Optional[ModelLimits] = None,
+        model_limits: Optional[Dict[str, ModelLimits]] = None,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.default_limits = default_limits or ModelLimits()
+        self.model_limits = model_limits or {}
+        self.queue_timeout = queue_timeout
+        self._clock = clock
+        self._lanes: Dict[str, ModelLane] = {}
+        self._lock = threading.Lock()
+
+    def _lane(self, model_name: str) -> ModelLane:
+        lane = self._lanes.get(model_name)
+        if lane is None:
+            limits = self.model_limits.get(model_name, self.default_limits)
+            lane = ModelLane(limits, self._clock())
+            self._lanes[model_name] = lane
+        return lane
+
+    def _dispatch(self, lane: ModelLane, caller: Optional[_Waiter] = None) -> float:
+        """
+        Grant slots to waiting calls in order. Must hold the lock.
+
+        Returns:
+            Seconds until the quota lets the next call through, or 0 if
+            the lane is only waiting for a free slot (or has no queue)
+        """
+        now = self._clock()
+        while lane.in_flight < lane.limits.max_concurrency:
+            waiter = lane.head()
+            if waiter is None:
+                return 0.0
+            delay = max(
+                lane.requests.wait_time(1, now),
+                lane.token_budget.wait_time(waiter.tokens, now),
+            )
+            if delay > 0:
+                # Make sure the next call in line sleeps on the refill time
+                if waiter is not caller:
+                    waiter.notify()
+                return delay
+            lane.pop_head()
+            lane.requests.take(1, now)
+            lane.token_budget.take(waiter.tokens, now)
+            lane.in_flight += 1
+            lane.granted += 1
+            waiter.granted = True
+            if waiter is not caller:
+                waiter.notify()
+        return 0.0
+
+    def _wait_limit(self, timeout: Optional[float]) -> float:
+        """Queue timeout of one call: the caller's limit, capped by ours."""
+        if timeout is None:
+            return self.queue_timeout
+        return max(0.0, min(timeout, self.queue_timeout))
+
+    def _poll(
+        self, model_name: str, waiter: _Waiter, started: float, timeout: float
+    ) -> Tuple[Optional[Permit], float]:
+        """
+        Try to get the waiter a slot.
+
+        Returns:
+            (permit, 0) once granted, else (None, seconds to sleep)
+        """
+        with self._lock:
+            lane = self._lane(model_name)
+            delay = self._dispatch(lane, caller=waiter)
+            now = self._clock()
+            if waiter.granted:
+                waited = now - started
+                lane.max_wait = max(lane.max_wait, waited)
+                if waited > SLOW_WAIT_SECONDS:
+                    print(f"[Scheduler] ⏳ {model_name} call waited {waited:.1f}s")
+                return Permit(self, model_name, waiter.tokens), 0.0
+            remaining = started + timeout - now
+            if remaining <= 0:
+                lane.remove(waiter)
+                lane.timeouts += 1
+                # The call behind it may have been relying on it to wake up
+                self._dispatch(lane)
+                message = f"No {model_name} slot within {timeout:.1f}s"
+                print(f"[Scheduler] ⌛ {message}")
+                raise QueueTimeout(message)
+            return None, min(remaining, delay) if delay > 0 else remaining
+
+    def _enqueue(self, model_name: str, waiter: _Waiter) -> None:
+        with self._lock:
+            self._lane(model_name).enqueue(waiter)
+
+    def _abandon(self, model_name: str, waiter: _Waiter) -> None:
+        """Drop a waiter that gave up (e.g. cancelled), freeing its slot."""
+        with self._lock:
+            lane = self._lane(model_name)
+            if waiter.granted:
+                lane.in_flight -= 1
+            else:
+                lane.remove(waiter)
+            self._dispatch(lane)
+
+    def acquire(
+        self,
+        model_name: str,
+        user_key: Optional[Hashable] = None,
+        priority: int = PRIORITY_CHAT,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Permit:
+        """
+        Wait (blocking the thread) for a slot on a model.
+
+        Args:
+            timeout: Longest wait the caller can afford; the queue timeout
+                applies when it is None or larger
+
+        Raises:
+            QueueTimeout: No slot within the timeout
+        """
+        wake = threading.Event()
+        waiter = _Waiter(user_key, priority, tokens, wake.set)
+        timeout = self._wait_limit(timeout)
+        started = self._clock()
+        self._enqueue(model_name, waiter)
+        try:
+            while True:
+                wake.clear()
+                permit, sleep_for = self._poll(model_name, waiter, started, timeout)
+                if permit is not None:
+                    return permit
+                wake.wait(sleep_for)
+        except QueueTimeout:
+            raise
+        except BaseException:
+            self._abandon(model_name, waiter)
+            raise
+
+    async def aacquire(
+        self,
+        model_name: str,
+        user_key: Optional[Hashable] = None,
+        priority: int = PRIORITY_CHAT,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Permit:
+        """Async counterpart of acquire; waits without blocking the loop."""
+        loop = asyncio.get_running_loop()
+        wake = asyncio.Event()
+
+        def notify() -> None:
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # Loop closed; the waiter is gone
+
+        waiter = _Waiter(user_key, priority, tokens, notify)
+        timeout = self._wait_limit(timeout)
+        started = self._clock()
+        self._enqueue(model_name, waiter)
+        try:
+            while True:
+                wake.clear()
+                permit, sleep_for = self._poll(model_name, waiter, started, timeout)
+                if permit is not None:
+                    return permit
+                try:
+                    await asyncio.wait_for(wake.wait(), sleep_for)
+                except asyncio.TimeoutError:
+                    pass
+        except QueueTimeout:
+            raise
+        except BaseException:
+            self._abandon(model_name, waiter)
+            raise
+
+    @contextmanager
+    def slot(
+        self,
+        model_name: str,
+        user_key: Optional[Hashable] = None,
+        priority: int = PRIORITY_CHAT,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Permit]:
+        """Hold a slot on a model for the duration of the block."""
+        permit = self.acquire(model_name, user_key, priority, tokens, timeout)
+        try:
+            yield permit
+        finally:
+            permit.release()
+
+    @asynccontextmanager
+    async def aslot(
+        self,
+        model_name: str,
+        user_key: Optional[Hashable] = None,
+        priority: int = PRIORITY_CHAT,
+        tokens: int = 0,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Permit]:
+        """Async counterpart of slot."""
+        permit = await self.aacquire(
+            model_name, user_key, priority, tokens, timeout
+        )
+        try:
+            yield permit
+        finally:
+            permit.release()
+
+    def _release(self, model_name: str) -> None:
+        with self._lock:
+            lane = self._lane(model_name)
+            lane.in_flight -= 1
+            self._dispatch(lane)
+
+    def _settle(self, model_name: str, extra_tokens: int) -> None:
+        with self._lock:
+            lane = self._lane(model_name)
+            lane.token_budget.take(extra_tokens, self._clock())
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model slots, queue length and counters for the health endpoint."""
+        with self._lock:
+            return {
+                model_name: {
+                    "max_concurrency": lane.limits.max_concurrency,
+                    "rpm": lane.limits.rpm,
+                    "tpm": lane.limits.tpm,
+                    "in_flight": lane.in_flight,
+                    "queued": lane.queued(),
+                    "granted": lane.granted,
+                    "timeouts": lane.timeouts,
+                    "max_wait_seconds": round(lane.max_wait, 3),
+                }
+                for model_name, lane in self._lanes.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all lanes (only safe when no calls are in flight)."""
+        with self._lock:
+            self._lanes.clear()
+
+
+# Shared by the agent nodes and SnippetService
+llm_scheduler = OutboundScheduler(model_limits=parse_model_limits(LLM_MODEL_LIMITS))
@@ -0,0 +1,186 @@
+"""
+Shared model-health circuit breaker for the Gemini fallback cascade.
+
+Every request used to walk the cascade from the first model, even when
+that model had answered 429 a second earlier. The breaker remembers which
+models are rate limited or failing and lets the agent and SnippetService
+skip them until their cooldown has passed.
+
+States per model:
+- closed: healthy, requests go through
+- open: skipped until the cooldown expires (after a rate limit, or after
+  FAILURE_THRESHOLD consecutive errors)
+- half_open: cooldown expired, a single request is let through as a probe
+  while the others keep skipping the model; success closes the circuit,
+  another failure opens it again. A probe that never reports back (the
+  request finished on an earlier model, or the worker died) is given up
+  after probe_timeout so the next request can probe instead.
+"""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+RATE_LIMIT_INDICATORS = ["429", "resource_exhausted", "rate limit", "quota"]
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Check whether an exception from the Gemini client is a rate limit."""
+    error_message = str(error).lower()
+    return any(indicator in error_message for indicator in RATE_LIMIT_INDICATORS)
+
+
+@dataclass
+class ModelHealth:
+    """Health record for a single model."""
+
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    last_error: Optional[str] = None
+    rate_limited: bool = False
+    tripped: bool = False
+    probe_until: float = 0.0
+
+
+class ModelCircuitBreaker:
+    """Thread-safe per-model circuit breaker with cooldown windows."""
+
+    def __init__(
+        self,
+        rate_limit_cooldown: float = 60.0,
+        failure_threshold: int = 3,
+        failure_cooldown: float = 30.0,
+        probe_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.rate_limit_cooldown = rate_limit_cooldown
+        self.failure_threshold = failure_threshold
+        self.failure_cooldown = failure_cooldown
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._models: Dict[str, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _health(self, model_name: str) -> ModelHealth:
+        return self._models.setdefault(model_name, ModelHealth())
+
+    def _state(self, health: ModelHealth, now: float) -> str:
+        if not health.tripped:
+            return "closed"
+        return "open" if now < health.open_until else "half_open"
+
+    def _probing(self, health: ModelHealth, now: float) -> bool:
+        return now < health.probe_until
+
+    def is_available(self, model_name: str) -> bool:
+        """Check whether a model may be tried right now."""
+        with self._lock:
+            health = self._models.get(model_name)
+            if health is None:
+                return True
+            now = self._clock()
+            state = self._state(health, now)
+            if state == "half_open":
+                return not self._probing(health, now)
+            return state != "open"
+
+    def _claim(self, model_name: str, now: float) -> bool:
+        """Check availability, taking the probe slot of a half-open model."""
+        health = self._models.get(model_name)
+        if health is None:
+            return True
+        state = self._state(health, now)
+        if state == "closed":
+            return True
+        if state == "open" or self._probing(health, now):
+            return False
+        health.probe_until = now + self.probe_timeout
+        return True
+
+    def available_models(self, cascade: List[str]) -> List[str]:
+        """
+        Filter a cascade down to the models that are not cooling down.
+
+        A half-open model is only returned to the caller that claims its
+        probe; concurrent callers skip it until the probe is resolved by
+        record_success / record_failure / record_rate_limit (or released).
+
+        If every model is open, the one whose cooldown ends first is
+        returned as a probe so requests are not rejected outright.
+        """
+        with self._lock:
+            now = self._clock()
+            available = [m for m in cascade if self._claim(m, now)]
+        if available or not cascade:
+            return available
+
+        with self._lock:
+            probe = min(cascade, key=lambda m: self._health(m).open_until)
+        return [probe]
+
+    def record_success(self, model_name: str) -> None:
+        """Close the circuit for a model after a successful call."""
+        with self._lock:
+            self._models[model_name] = ModelHealth()
+
+    def record_rate_limit(self, model_name: str, error: Exception) -> None:
+        """Open the circuit for a model that reported a rate limit."""
+        with self._lock:
+            health = self._health(model_name)
+            health.rate_limited = True
+            health.tripped = True
+            health.last_error = str(error)[:200]
+            health.open_until = self._clock() + self.rate_limit_cooldown
+            health.probe_until = 0.0
+
+    def record_failure(self, model_name: str, error: Exception) -> None:
+        """Count a non-rate-limit failure, opening the circuit at the threshold."""
+        with self._lock:
+            health = self._health(model_name)
+            health.consecutive_failures += 1
+            health.rate_limited = False
+            health.last_error = str(error)[:200]
+            # A failed half-open probe re-opens straight away
+            if health.tripped or health.consecutive_failures >= self.failure_threshold:
+                health.tripped = True
+                health.open_until = self._clock() + self.failure_cooldown
+            health.probe_until = 0.0
+
+    def release_probe(self, model_name: str) -> None:
+        """Free a half-open model's probe slot without judging its health."""
+        with self._lock:
+            health = self._models.get(model_name)
+            if health is not None:
+                health.probe_until = 0.0
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Current state of every model the breaker has seen."""
+        with self._lock:
+            now = self._clock()
+            return {
+                model_name: {
+                    "state": self._state(health, now),
+                    "rate_limited": health.rate_limited,
+                    "consecutive_failures": health.consecutive_failures,
+                    "retry_in_seconds": round(max(0.0, health.open_until - now), 1),
+                    "probing": self._probing(health, now),
+                    "last_error": health.last_error,
+                }
+                for model_name, health in self._models.items()
+            }
+
+    def reset(self) -> None:
+        """Forget all recorded state."""
+        with self._lock:
+            self._models.clear()
+
+
+# Shared by the agent and SnippetService
+model_health = ModelCircuitBreaker(
+    rate_limit_cooldown=float(os.getenv("GEMINI_RATE_LIMIT_COOLDOWN_SECONDS", "60")),
+    failure_threshold=int(os.getenv("GEMINI_FAILURE_THRESHOLD", "3")),
+    failure_cooldown=float(os.getenv("GEMINI_FAILURE_COOLDOWN_SECONDS", "30")),
+    probe_timeout=float(os.getenv("GEMINI_PROBE_TIMEOUT_SECONDS", "30")),
+)
@@ -0,0 +1,135 @@
+"""
+Keyset (seek) pagination with opaque cursors.
+
+List endpoints used to return whole tables (.all()) or page with OFFSET,
+which reads and throws away every skipped row, so deep pages get slower
+as a table grows. A page now continues *after* the last row the client
+has: the sort key of that row is packed into an opaque cursor, and the
+next query seeks past it with a WHERE on an indexed sort key.
+
+Cursors are URL-safe base64 of the JSON-encoded sort key. They are not
+signed: a forged cursor can only move the seek position inside a query
+that is already scoped to the caller.
+"""
+
+import base64
+import binascii
+import json
+import os
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Query
+
+PAGE_SIZE_DEFAULT = int(os.getenv("PAGE_SIZE_DEFAULT", "100"))
+PAGE_SIZE_MAX = int(os.getenv("PAGE_SIZE_MAX", "500"))
+
+# Response header carrying the cursor of the next page (absent on the last page)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor cannot be decoded for the requested listing."""
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Pack a row's sort key into an opaque cursor."""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence[Any]) -> List[Any]:
+    """
+    Unpack a cursor into sort key values for the given columns.
+
+    Args:
+        cursor: Cursor produced by encode_cursor
+        columns: Sort columns the cursor was built from
+
+    Returns:
+        One value per column, converted to the column's Python type
+
+    Raises:
+        InvalidCursor: If the cursor is malformed or does not fit the columns
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise InvalidCursor("Malformed cursor") from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor("Cursor does not match this listing")
+
+    decoded = []
+    for column, value in zip(columns, values):
+        try:
+            if column.type.python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif column.type.python_type is int and not isinstance(value, int):
+                raise TypeError(value)
+        except (TypeError, ValueError) as e:
+            raise InvalidCursor("Cursor does not match this listing") from e
+        decoded.append(value)
+    return decoded
+
+
+def seek_after(
+    columns: Sequence[Any], values: Sequence[Any], descending: bool = False
+):
+    """
+    Build the WHERE clause selecting rows strictly after a sort key.
+
+    Expands (a, b) > (x, y) into a > x OR (a = x AND b > y), which works on
+    every backend and still lets the planner use a composite index.
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        step = column < values[i] if descending else column > values[i]
+        equal = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal, step) if equal else step)
+    return or_(*clauses)
+
+
+def fetch_page(
+    query: Query,
+    columns: Sequence[Any],
+    cursor: Optional[str] = None,
+    limit: int = PAGE_SIZE_DEFAULT,
+    descending: bool = False,
+) -> Tuple[List[Any], Optional[str]]:
+    """
+    Fetch one page of a query ordered by the given sort columns.
+
+    The last column must be unique (normally the primary key) so the order
+    is total and no row is skipped or repeated between pages.
+
+    Args:
+        query: Filtered query, without ORDER BY, OFFSET or LIMIT
+        columns: Sort columns, e.g. (Message.created_at, Message.id)
+        cursor: Cursor of the previous page, or None for the first page
+        limit: Page size
+        descending: Sort newest first instead of oldest first
+
+    Returns:
+        The rows of the page and the cursor of the next page (None if last)
+
+    Raises:
+        InvalidCursor: If the cursor cannot be decoded
+    """
+    if cursor:
+        query = query.filter(
+            seek_after(columns, decode_cursor(cursor, columns), descending)
+        )
+    order = [c.desc() if descending else c.asc() for c in columns]
+
+    # One extra row tells whether another page follows, without a COUNT
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor([getattr(last, c.key) for c in columns])
@@ -0,0 +1,100 @@
+"""
+Short-lived cache of authenticated principals.
+
+Every authenticated request used to load the full User row just to learn
+the caller's id and whether the account is active. The frontend polls
+some routes every few seconds, so that was one extra query per poll. The
+cache maps a token's ``sub`` claim to a small Principal for a few seconds.
+
+Entries are dropped when the User row is updated or deleted through the
+ORM (see the mapper events at the bottom). Bulk ``query.update()`` calls
+bypass those events; such changes take effect once the TTL expires.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Optional, Tuple
+
+from sqlalchemy import event
+
+from backend.app.models.user import User
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller: just enough to authorize a request."""
+
+    id: int
+    is_active: bool
+
+
+class PrincipalCache:
+    """Thread-safe LRU cache of principals with a per-entry TTL."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = 30.0,
+        max_size: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, subject: str) -> Optional[Principal]:
+        """Get the cached principal for a token subject, if still fresh."""
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+
+            principal, expires_at = entry
+            if self._clock() >= expires_at:
+                del self._entries[subject]
+                return None
+
+            self._entries.move_to_end(subject)
+            return principal
+
+    def set(self, subject: str, principal: Principal) -> None:
+        """Cache a principal, evicting the least recently used beyond max_size."""
+        if self.ttl_seconds <= 0 or self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[subject] = (principal, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        """Drop the cached principal of a user."""
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self) -> None:
+        """Drop all cached principals."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Shared by the auth dependencies; AUTH_CACHE_TTL_SECONDS=0 disables it
+principal_cache = PrincipalCache(
+    ttl_seconds=float(os.getenv("AUTH_CACHE_TTL_SECONDS", "30")),
+    max_size=int(os.getenv("AUTH_CACHE_MAX_SIZE", "1024")),
+)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_user(mapper, connection, target: User) -> None:
+    """Forget a user's principal when their row changes (e.g. deactivation)."""
+    principal_cache.invalidate(target.id)
@@ -0,0 +1,347 @@
+"""
+Prompt-prefix cache for the chat agent.
+
+Every turn resends the phase prompt (plus chapter summaries) as the system
+instruction, followed by the history window. The system instruction is
+the stable prefix: it is identical for every turn of a phase and, before
+any chapter is summarized, for every user in that phase. The history
+window slides by one turn each time, so older turns do not stay a
+byte-identical prefix for long; Gemini's implicit caching picks up what
+does repeat, and the provider-reported cache_read tokens are counted here.
+
+Two layers:
+- A local fingerprint cache, always on. It hashes the prefix per model,
+  counts how often it repeats and records the cached tokens the provider
+  reports. GET /health/prompt-cache serves the numbers.
+- Provider context caching, opt-in with PROMPT_CACHE_PROVIDER=gemini. The
+  first time a long enough prefix is seen for a model, it is stored as a
+  Gemini CachedContent; later requests send only the conversation and
+  reference the cache. Models that reject caching (e.g. Gemma) are
+  remembered and skipped; other creation errors (timeouts, 5xx) only
+  pause creation for that model for PROMPT_CACHE_RETRY_SECONDS. The async
+  agent path creates caches on a worker thread (aprepare), since the
+  google-genai call blocks.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Protocol, Set, Tuple
+
+from langchain_core.messages import BaseMessage, SystemMessage
+
+from backend.domain.services.context_window import ContextWindowService
+
+PROMPT_CACHE_PROVIDER = os.getenv("PROMPT_CACHE_PROVIDER", "none").lower()
+# Gemini rejects explicit caches below a per-model minimum (1024-4096 tokens)
+PROMPT_CACHE_MIN_TOKENS = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "4096"))
+PROMPT_CACHE_TTL_SECONDS = int(os.getenv("PROMPT_CACHE_TTL_SECONDS", "3600"))
+PROMPT_CACHE_MAX_ENTRIES = int(os.getenv("PROMPT_CACHE_MAX_ENTRIES", "256"))
+PROMPT_CACHE_RETRY_SECONDS = float(os.getenv("PROMPT_CACHE_RETRY_SECONDS", "300"))
+
+# Stop referencing a provider cache this long before it expires
+EXPIRY_MARGIN_SECONDS = 60.0
+
+UNSUPPORTED_PATTERN = re.compile(
+    r"not supported|does not support|unsupported", re.IGNORECASE
+)
+# Client errors that say nothing about whether the model supports caching
+RETRYABLE_CLIENT_STATUS_CODES = {408, 429}
+
+
+class ContextCacheProvider(Protocol):
+    """Creates provider-side caches of a system instruction."""
+
+    def create(self, model_name: str, system_instruction: str, ttl_seconds: int) -> str:
+        """Store the instruction for a model and return the cache name."""
+        ...
+
+
+class GeminiContextCacheProvider:
+    """Context caching through the Gemini API (google-genai SDK)."""
+
+    def __init__(self, api_key: Optional[str] = None):
+        self.api_key = api_key or os.getenv("GEMINI_API_KEY")
+        self._client = None
+
+    def create(self, model_name: str, system_instruction: str, ttl_seconds: int) -> str:
+        from google import genai
+        from google.genai import types
+
+        if self._client is None:
+            self._client = genai.Client(api_key=self.api_key)
+        cache = self._client.caches.create(
+            model=model_name,
+            config=types.CreateCachedContentConfig(
+                display_name="life-story-phase-prompt",
+                system_instruction=system_instruction,
+                ttl=f"{ttl_seconds}s",
+            ),
+        )
+        return cache.name
+
+
+@dataclass
+class CachedPrefix:
+    """What is known about one prefix for one model."""
+
+    fingerprint: str
+    tokens: int
+    hits: int = 0
+    provider_name: Optional[str] = None
+    provider_expires_at: float = 0.0
+
+
+@dataclass
+class PreparedPrompt:
+    """Messages to send, and the provider cache they rely on (if any)."""
+
+    model_name: str
+    messages: List[BaseMessage]
+    fingerprint: Optional[str] = None
+    cached_content: Optional[str] = None
+
+
+def is_caching_unsupported(error: Exception) -> bool:
+    """Whether a cache creation error means the model can never be cached."""
+    for attr in ("code", "status_code"):
+        status = getattr(error, attr, None)
+        if isinstance(status, int):
+            return 400 <= status < 500 and status not in RETRYABLE_CLIENT_STATUS_CODES
+    return bool(UNSUPPORTED_PATTERN.search(str(error)))
+
+
+def split_prefix(
+    messages: List[BaseMessage],
+) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+    """Split a prompt into its leading system messages and the conversation."""
+    idx = 0
+    while idx < len(messages) and isinstance(messages[idx], SystemMessage):
+        idx += 1
+    return messages[:idx], messages[idx:]
+
+
+class PromptPrefixCache:
+    """Thread-safe fingerprint cache of prompt prefixes, per model."""
+
+    def __init__(
+        self,
+        provider: Optional[ContextCacheProvider] = None,
+        min_provider_tokens: int = PROMPT_CACHE_MIN_TOKENS,
+        ttl_seconds: int = PROMPT_CACHE_TTL_SECONDS,
+        max_entries: int = PROMPT_CACHE_MAX_ENTRIES,
+        retry_seconds: float = PROMPT_CACHE_RETRY_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.provider = provider
+        self.min_provider_tokens = min_provider_tokens
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.retry_seconds = retry_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, str], CachedPrefix]" = OrderedDict()
+        self._unsupported_models: Set[str] = set()
+        self._retry_after: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.requests = 0
+        self.prefix_hits = 0
+        self.prefix_tokens_repeated = 0
+        self.provider_hits = 0
+        self.provider_creates = 0
+        self.provider_errors = 0
+        self.input_tokens = 0
+        self.cache_read_tokens = 0
+
+    def prepare(self, model_name: str, messages: List[BaseMessage]) -> PreparedPrompt:
+        """
+        Fingerprint the stable prefix of a prompt and decide what to send.
+
+        Returns:
+            The prompt to send. With a provider cache for the prefix, the
+            system messages are left out and cached_content names the cache.
+        """
+        found = self._lookup(model_name, messages)
+        if found is None:
+            return PreparedPrompt(model_name, messages)
+        entry, text, cached_content = found
+        if cached_content is None and self._should_create(model_name, entry):
+            cached_content = self._create(model_name, entry, text)
+        return self._prepared(model_name, messages, entry, cached_content)
+
+    async def aprepare(
+        self, model_name: str, messages: List[BaseMessage]
+    ) -> PreparedPrompt:
+        """Async variant of prepare; creates provider caches off the event loop."""
+        found = self._lookup(model_name, messages)
+        if found is None:
+            return PreparedPrompt(model_name, messages)
+        entry, text, cached_content = found
+        if cached_content is None and self._should_create(model_name, entry):
+            cached_content = await asyncio.to_thread(
+                self._create, model_name, entry, text
+            )
+        return self._prepared(model_name, messages, entry, cached_content)
+
+    def _prepared(
+        self,
+        model_name: str,
+        messages: List[BaseMessage],
+        entry: CachedPrefix,
+        cached_content: Optional[str],
+    ) -> PreparedPrompt:
+        if cached_content is None:
+            return PreparedPrompt(model_name, messages, entry.fingerprint)
+        _, conversation = split_prefix(messages)
+        return PreparedPrompt(
+            model_name, conversation, entry.fingerprint, cached_content
+        )
+
+    def _lookup(
+        self, model_name: str, messages: List[BaseMessage]
+    ) -> Optional[Tuple[CachedPrefix, str, Optional[str]]]:
+        """
+        Count the request and find the entry for its prefix.
+
+        Returns:
+            None for a prompt without system messages, otherwise the entry,
+            the prefix text and the live provider cache name (if any)
+        """
+        prefix, _ = split_prefix(messages)
+        if not prefix:
+            with self._lock:
+                self.requests += 1
+            return None
+
+        text = "\n\n".join(str(m.content) for m in prefix)
+        fingerprint = hashlib.sha256(text.encode()).hexdigest()[:32]
+        key = (model_name, fingerprint)
+
+        with self._lock:
+            self.requests += 1
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = CachedPrefix(
+                    fingerprint, ContextWindowService.estimate_tokens(text)
+                )
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            else:
+                entry.hits += 1
+                self.prefix_hits += 1
+                self.prefix_tokens_repeated += entry.tokens
+                self._entries.move_to_end(key)
+
+            if entry.provider_name and self._clock() < entry.provider_expires_at:
+                self.provider_hits += 1
+                return entry, text, entry.provider_name
+        return entry, text, None
+
+    def _should_create(self, model_name: str, entry: CachedPrefix) -> bool:
+        """Whether a provider cache is worth creating for this prefix now."""
+        if self.provider is None or entry.tokens < self.min_provider_tokens:
+            return False
+        with self._lock:
+            if model_name in self._unsupported_models:
+                return False
+            return self._clock() >= self._retry_after.get(model_name, 0.0)
+
+    def _create(
+        self, model_name: str, entry: CachedPrefix, text: str
+    ) -> Optional[str]:
+        """Create the provider cache for a prefix (blocking)."""
+        now = self._clock()
+        try:
+            name = self.provider.create(model_name, text, self.ttl_seconds)
+        except Exception as e:
+            unsupported = is_caching_unsupported(e)
+            with self._lock:
+                self.provider_errors += 1
+                if unsupported:
+                    self._unsupported_models.add(model_name)
+                else:
+                    self._retry_after[model_name] = now + self.retry_seconds
+            if unsupported:
+                print(f"[PromptCache] ⚠️ No context caching for {model_name}: {e}")
+            else:
+                print(
+                    f"[PromptCache] ⚠️ Context cache for {model_name} failed, "
+                    f"retrying in {self.retry_seconds:.0f}s: {e}"
+                )
+            return None
+
+        with self._lock:
+            self.provider_creates += 1
+            self._retry_after.pop(model_name, None)
+            entry.provider_name = name
+            entry.provider_expires_at = (
+                now + self.ttl_seconds - EXPIRY_MARGIN_SECONDS
+            )
+        print(
+            f"[PromptCache] 📦 Cached {entry.tokens} prefix tokens for {model_name}"
+        )
+        return name
+
+    def discard(self, prepared: PreparedPrompt) -> None:
+        """Forget the provider cache a failed request relied on."""
+        if prepared.fingerprint is None:
+            return
+        with self._lock:
+            entry = self._entries.get((prepared.model_name, prepared.fingerprint))
+            if entry is not None:
+                entry.provider_name = None
+                entry.provider_expires_at = 0.0
+
+    def record_usage(self, response: Any) -> None:
+        """Count input and provider cache-read tokens from a model response."""
+        usage = getattr(response, "usage_metadata", None)
+        if not isinstance(usage, dict):
+            return
+        details = usage.get("input_token_details") or {}
+        with self._lock:
+            self.input_tokens += usage.get("input_tokens") or 0
+            self.cache_read_tokens += details.get("cache_read") or 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters for the health endpoint."""
+        with self._lock:
+            return {
+                "provider": type(self.provider).__name__ if self.provider else None,
+                "prefixes": len(self._entries),
+                "requests": self.requests,
+                "prefix_hits": self.prefix_hits,
+                "prefix_hit_rate": (
+                    round(self.prefix_hits / self.requests, 3) if self.requests else 0.0
+                ),
+                "prefix_tokens_repeated": self.prefix_tokens_repeated,
+                "provider_hits": self.provider_hits,
+                "provider_creates": self.provider_creates,
+                "provider_errors": self.provider_errors,
+                "unsupported_models": sorted(self._unsupported_models),
+                "input_tokens": self.input_tokens,
+                "cache_read_tokens": self.cache_read_tokens,
+            }
+
+    def clear(self) -> None:
+        """Forget all prefixes and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._unsupported_models.clear()
+            self._retry_after.clear()
+            self._reset_counters()
+
+
+# Shared by the agent nodes; PROMPT_CACHE_PROVIDER=gemini enables context caching
+prompt_cache = PromptPrefixCache(
+    provider=(
+        GeminiContextCacheProvider() if PROMPT_CACHE_PROVIDER == "gemini" else None
+    )
+)
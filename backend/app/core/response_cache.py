@@ -0,0 +1,117 @@
+"""
+Response cache for phase-entry turns.
+
+The first reply of a phase mostly reproduces the template in its prompt
+("Wonderful! Let's start with your roots..."), and the GREETING reply is
+the same for every new story. With RESPONSE_CACHE_ENABLED=true, such
+replies are stored under (phase, age range, normalized user input) and
+served again without calling the model.
+
+Only turns whose prompt carries nothing personal besides the input are
+cacheable (see InterviewService._phase_entry_cache_key); otherwise a
+reply mentioning one user's story could be served to another.
+"""
+
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "false").lower() in (
+    "1",
+    "true",
+    "yes",
+)
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = int(os.getenv("RESPONSE_CACHE_TTL_SECONDS", "86400"))
+
+CacheKey = Tuple[str, str, str]
+
+
+def normalize_input(text: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", text).strip().lower().rstrip(".!?")
+
+
+class ResponseCache:
+    """Thread-safe LRU of model replies with a time-to-live."""
+
+    def __init__(
+        self,
+        enabled: bool = RESPONSE_CACHE_ENABLED,
+        max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = RESPONSE_CACHE_TTL_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.enabled = enabled
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[CacheKey, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self, phase: str, age_range: Optional[str], user_input: str
+    ) -> Optional[CacheKey]:
+        """
+        Build the cache key for a turn.
+
+        Returns:
+            The key, or None when the cache is disabled
+        """
+        if not self.enabled:
+            return None
+        return (phase, age_range or "", normalize_input(user_input))
+
+    def get(self, key: Optional[CacheKey]) -> Optional[str]:
+        """Return the cached reply for a key, counting the hit or miss."""
+        if key is None:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] <= self._clock():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Optional[CacheKey], content: Any) -> None:
+        """Store a reply; non-text and empty replies are ignored."""
+        if key is None or not isinstance(content, str) or not content.strip():
+            return
+        with self._lock:
+            self._entries[key] = (content, self._clock() + self.ttl_seconds)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters for the health endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self) -> None:
+        """Drop all replies and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by the interview services; RESPONSE_CACHE_ENABLED=true turns it on
+phase_entry_cache = ResponseCache()
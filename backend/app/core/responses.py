@@ -0,0 +1,85 @@
+"""
+Fast JSON response path (opt-in).
+
+By default FastAPI runs whatever an endpoint returns through
+jsonable_encoder, validates it against the route's response_model and
+encodes it with json.dumps. For data the endpoint built itself (chat
+replies, snippet decks, projected message rows) the validation only
+repeats work that is already done, and on long transcripts the encoding
+takes most of the CPU time that is not spent in the database.
+
+With FAST_JSON_RESPONSES=true (and orjson installed), endpoints send such
+data straight to orjson and skip the response_model pass. The route's
+response_model still documents the shape, and tests check that both paths
+produce the same JSON. When the setting is off, or orjson is missing,
+responses go through FastAPI's normal path (with the stdlib encoder for
+the projected rows).
+
+Benchmark: scripts/bench_json_responses.py
+"""
+
+import os
+from typing import Any, Dict, Optional
+
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:  # Optional dependency, see requirements.txt
+    orjson = None
+
+FAST_JSON_RESPONSES = os.getenv("FAST_JSON_RESPONSES", "false").lower() == "true"
+
+if FAST_JSON_RESPONSES and orjson is None:
+    print("[Responses] ⚠️ FAST_JSON_RESPONSES is set but orjson is not installed")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON response encoded with orjson (datetimes as ISO 8601)."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json_enabled() -> bool:
+    """Whether the fast path is on (setting enabled and orjson available)."""
+    return FAST_JSON_RESPONSES and orjson is not None
+
+
+def json_response(
+    content: Any, status_code: int = 200, headers: Optional[Dict[str, str]] = None
+) -> Response:
+    """
+    Send JSON-ready data (plain dicts and lists) as a response.
+
+    Args:
+        content: Data to encode
+        status_code: HTTP status code
+        headers: Extra response headers
+
+    Returns:
+        An orjson response on the fast path, a stdlib JSONResponse otherwise
+    """
+    response_class = ORJSONResponse if fast_json_enabled() else JSONResponse
+    return response_class(content, status_code=status_code, headers=headers)
+
+
+def prebuilt_response(content: Any, status_code: int = 200) -> Any:
+    """
+    Send data the endpoint built itself in the shape of its response_model.
+
+    On the fast path the data is encoded directly and the response_model
+    pass is skipped. Otherwise the data is returned unchanged, for FastAPI
+    to validate and encode as usual.
+
+    Args:
+        content: Dict (or list of dicts) matching the route's response_model
+        status_code: HTTP status code, used on the fast path only
+
+    Returns:
+        A response on the fast path, otherwise content itself
+    """
+    if not fast_json_enabled():
+        return content
+    return ORJSONResponse(content, status_code=status_code)
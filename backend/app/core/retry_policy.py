@@ -0,0 +1,215 @@
+"""
+Retry policy shared by the agent and SnippetService model cascades.
+
+The cascades used to treat any error that was not a rate limit as fatal,
+and to leave the preferred model on the first 429. Requests that would
+have worked half a second later failed or landed on a weaker model.
+
+Errors are now sorted into:
+- transient: 5xx, timeouts, dropped connections. The same model is retried
+  with jittered exponential backoff, then the cascade falls through.
+- rate_limit: 429 / quota. What happens is set by RETRY_ON_RATE_LIMIT:
+  "hinted" (default) retries the same model only when the error carries a
+  short "retry in Xs" hint; "always" also backs off without a hint;
+  "never" falls through at once. Long hints (per-minute or daily quotas)
+  always fall through.
+- busy: no llm_scheduler slot in time; fall through, health untouched.
+- fatal: anything else; the request fails.
+
+Each request gets a RetryBudget. Backoff sleeps only happen while they fit
+in the request's deadline (RETRY_DEADLINE_SECONDS), waits for a scheduler
+slot are capped by the time left (RetryBudget.remaining), and once the
+deadline has passed the agent stops walking the cascade.
+
+Streamed replies are the exception: once a model call has sent tokens to
+the client, the agent neither retries nor falls through (see
+agent._tokens_streamed), since the new reply would be appended to the
+partial one.
+"""
+
+import asyncio
+import os
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from backend.app.core.llm_scheduler import QueueTimeout
+from backend.app.core.model_health import is_rate_limit_error, model_health
+
+RETRY_MAX_ATTEMPTS = int(os.getenv("RETRY_MAX_ATTEMPTS", "3"))
+RETRY_BASE_DELAY_SECONDS = float(os.getenv("RETRY_BASE_DELAY_SECONDS", "0.5"))
+RETRY_MAX_DELAY_SECONDS = float(os.getenv("RETRY_MAX_DELAY_SECONDS", "8"))
+RETRY_DEADLINE_SECONDS = float(os.getenv("RETRY_DEADLINE_SECONDS", "30"))
+RETRY_ON_RATE_LIMIT = os.getenv("RETRY_ON_RATE_LIMIT", "hinted").lower()
+
+ERROR_TRANSIENT = "transient"
+ERROR_RATE_LIMIT = "rate_limit"
+ERROR_BUSY = "busy"
+ERROR_FATAL = "fatal"
+
+ACTION_RETRY = "retry"
+ACTION_FALL_THROUGH = "fall_through"
+ACTION_FAIL = "fail"
+
+TRANSIENT_STATUS_CODES = {500, 502, 503, 504}
+TRANSIENT_PATTERN = re.compile(
+    r"\b(500|502|503|504)\b|internal error|unavailable|overloaded|"
+    r"deadline exceeded|timed out|timeout|connection (reset|aborted|refused)",
+    re.IGNORECASE,
+)
+RETRY_HINT_PATTERN = re.compile(
+    r"retry in (\d+(?:\.\d+)?)\s*s|retry_?delay\W+(\d+(?:\.\d+)?)s",
+    re.IGNORECASE,
+)
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    """HTTP status carried by google-genai / httpx style errors, if any."""
+    for attr in ("code", "status_code"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+def classify_error(error: Exception) -> str:
+    """Sort a model call error into transient, rate_limit, busy or fatal."""
+    if isinstance(error, QueueTimeout):
+        return ERROR_BUSY
+    status = _status_code(error)
+    if status == 429 or is_rate_limit_error(error):
+        return ERROR_RATE_LIMIT
+    if status in TRANSIENT_STATUS_CODES:
+        return ERROR_TRANSIENT
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return ERROR_TRANSIENT
+    if TRANSIENT_PATTERN.search(f"{type(error).__name__} {error}"):
+        return ERROR_TRANSIENT
+    return ERROR_FATAL
+
+
+def retry_hint(error: Exception) -> Optional[float]:
+    """Seconds the provider asked us to wait ("Please retry in 2.5s")."""
+    match = RETRY_HINT_PATTERN.search(str(error))
+    if not match:
+        return None
+    return float(match.group(1) or match.group(2))
+
+
+def record_model_error(model_name: str, error: Exception, kind: str) -> None:
+    """Tell the circuit breaker about a model the cascade is giving up on."""
+    if kind == ERROR_BUSY:
+        # Never reached the model: let another request take a half-open probe
+        model_health.release_probe(model_name)
+        return
+    if kind == ERROR_RATE_LIMIT:
+        model_health.record_rate_limit(model_name, error)
+    else:
+        model_health.record_failure(model_name, error)
+
+
+@dataclass
+class RetryDecision:
+    """What to do after a failed model call."""
+
+    kind: str
+    action: str
+    delay: float = 0.0
+
+
+class RetryPolicy:
+    """Backoff settings; start() hands out a budget per request."""
+
+    def __init__(
+        self,
+        max_attempts: int = RETRY_MAX_ATTEMPTS,
+        base_delay: float = RETRY_BASE_DELAY_SECONDS,
+        max_delay: float = RETRY_MAX_DELAY_SECONDS,
+        deadline: float = RETRY_DEADLINE_SECONDS,
+        rate_limit_mode: str = RETRY_ON_RATE_LIMIT,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[], float] = random.random,
+    ):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.rate_limit_mode = rate_limit_mode
+        self._clock = clock
+        self._jitter = jitter
+
+    def start(self) -> "RetryBudget":
+        """Start the retry budget of one request."""
+        return RetryBudget(self)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff after the given failed attempt."""
+        ceiling = min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+        return self._jitter() * ceiling
+
+
+class RetryBudget:
+    """Attempts per model and the remaining backoff time of one request."""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.deadline = policy._clock() + policy.deadline
+        self.attempts: Dict[str, int] = {}
+
+    def _retry_delay(
+        self, kind: str, error: Exception, attempt: int
+    ) -> Optional[float]:
+        """Delay before retrying the same model, or None to stop retrying it."""
+        policy = self.policy
+        if attempt >= policy.max_attempts:
+            return None
+
+        if kind == ERROR_RATE_LIMIT:
+            if policy.rate_limit_mode == "never":
+                return None
+            hint = retry_hint(error)
+            if hint is None and policy.rate_limit_mode != "always":
+                return None
+            delay = policy.backoff(attempt) if hint is None else hint
+        else:
+            delay = policy.backoff(attempt)
+
+        if delay > policy.max_delay:
+            return None
+        if policy._clock() + delay > self.deadline:
+            return None
+        return delay
+
+    def remaining(self) -> float:
+        """Seconds left before the request's deadline (0 once it passed)."""
+        return max(0.0, self.deadline - self.policy._clock())
+
+    def expired(self) -> bool:
+        """Whether the request's deadline has passed."""
+        return self.policy._clock() >= self.deadline
+
+    def decide(self, error: Exception, model_name: str) -> RetryDecision:
+        """Classify an error and choose: retry the model, fall through, or fail."""
+        kind = classify_error(error)
+        attempt = self.attempts.get(model_name, 0) + 1
+        self.attempts[model_name] = attempt
+
+        if kind == ERROR_FATAL:
+            return RetryDecision(kind, ACTION_FAIL)
+        if kind in (ERROR_TRANSIENT, ERROR_RATE_LIMIT):
+            delay = self._retry_delay(kind, error, attempt)
+            if delay is not None:
+                return RetryDecision(kind, ACTION_RETRY, delay)
+        return RetryDecision(kind, ACTION_FALL_THROUGH)
+
+    def sleep(self, delay: float) -> None:
+        time.sleep(delay)
+
+    async def asleep(self, delay: float) -> None:
+        await asyncio.sleep(delay)
+
+
+# Shared by the agent nodes and SnippetService
+retry_policy = RetryPolicy()
@@ -0,0 +1,70 @@
+"""
+Column projections for the hot read paths.
+
+Listing endpoints used to load full ORM objects (identity map, change
+tracking, lazy relationships), convert each one to a dict with to_dict(),
+and validate the dicts again with Pydantic before encoding them. On a
+long transcript that per-row work costs more CPU than the query itself.
+
+The read paths now select only the columns they return, as plain row
+tuples, and turn them into JSON-ready dicts in a single pass. Endpoints
+send those dicts straight out (see core/responses.py). The Pydantic
+response models stay on the routes for the OpenAPI schema, and the tests
+check that both produce the same JSON.
+
+Rows from these queries are not ORM objects: they are read-only and
+detached from the session.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Iterable, List
+
+from backend.app.models.message import Message
+from backend.app.models.snippets import Snippet
+from backend.app.models.story import Story
+
+# Fields of StoryResponse
+STORY_COLUMNS = (
+    Story.id,
+    Story.user_id,
+    Story.title,
+    Story.route_type,
+    Story.current_phase,
+    Story.age_range,
+    Story.status,
+)
+
+# Fields of MessageResponse
+MESSAGE_COLUMNS = (
+    Message.id,
+    Message.story_id,
+    Message.role,
+    Message.content,
+    Message.phase_context,
+    Message.created_at,
+)
+
+# Fields of SnippetItem, as returned by Snippet.to_dict()
+SNIPPET_COLUMNS = (
+    Snippet.id,
+    Snippet.title,
+    Snippet.content,
+    Snippet.theme,
+    Snippet.phase,
+    Snippet.is_locked,
+    Snippet.is_active,
+    Snippet.created_at,
+)
+
+
+def row_to_dict(row: Any) -> Dict[str, Any]:
+    """Convert a projected row into a JSON-ready dict (datetimes as ISO 8601)."""
+    return {
+        key: value.isoformat() if isinstance(value, datetime) else value
+        for key, value in row._asdict().items()
+    }
+
+
+def rows_to_dicts(rows: Iterable[Any]) -> List[Dict[str, Any]]:
+    """Convert projected rows into JSON-ready dicts."""
+    return [row_to_dict(row) for row in rows]
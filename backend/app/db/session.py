@@ -1,8 +1,16 @@
 import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Dict, Iterator, Optional
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool, Pool
 
 load_dotenv()
 
@@ -16,7 +24,143 @@ if not SQLALCHEMY_DATABASE_URL:
         "Please add it to your .env file."
     )
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL)
+# --- Engine configuration ---
+
+# "queue" keeps a pool of connections per process; "null" opens one per
+# checkout, for use behind PgBouncer in transaction pooling mode
+DB_POOL_MODE = os.getenv("DB_POOL_MODE", "queue").lower()
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle connections before server/load-balancer idle timeouts close them
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+# Server-side statement timeout in milliseconds (PostgreSQL only; 0 = off)
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "0"))
+
+
+def engine_options(database_url: str, is_async: bool = False) -> Dict[str, Any]:
+    """
+    Build create_engine keyword arguments from the DB_* settings.
+
+    SQLite keeps SQLAlchemy's defaults: its pools do not take sizing
+    arguments and it has no statement timeout.
+
+    Args:
+        database_url: URL the engine will connect to (sync or async driver)
+        is_async: Whether the options are for the asyncpg engine
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options: Dict[str, Any] = {"pool_pre_ping": DB_POOL_PRE_PING}
+    connect_args: Dict[str, Any] = {}
+
+    if DB_POOL_MODE == "null":
+        options["poolclass"] = NullPool
+        if is_async:
+            # PgBouncer in transaction mode cannot keep prepared statements
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    else:
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if DB_STATEMENT_TIMEOUT_MS > 0:
+        if is_async:
+            connect_args["server_settings"] = {
+                "statement_timeout": str(DB_STATEMENT_TIMEOUT_MS)
+            }
+        else:
+            timeout = DB_STATEMENT_TIMEOUT_MS
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+    return options
+
+
+class PoolMetrics:
+    """
+    Connection checkout counters for one engine's pool.
+
+    Hold time is measured from checkout to checkin; long holds point at
+    code that keeps a connection while waiting on something else.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checked_out_at: Dict[int, float] = {}
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.peak_checked_out = 0
+        self.total_hold_seconds = 0.0
+        self.max_hold_seconds = 0.0
+        self._pool: Optional[Pool] = None
+
+    def attach(self, engine: Engine) -> "PoolMetrics":
+        """Listen to the pool events of a (sync) engine."""
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        self._pool = engine.pool
+        return self
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, proxy) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self._checked_out_at[id(connection_record)] = time.monotonic()
+            self.peak_checked_out = max(
+                self.peak_checked_out, len(self._checked_out_at)
+            )
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        with self._lock:
+            started = self._checked_out_at.pop(id(connection_record), None)
+            if started is None:
+                return
+            self.checkins += 1
+            held = time.monotonic() - started
+            self.total_hold_seconds += held
+            self.max_hold_seconds = max(self.max_hold_seconds, held)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters plus the pool's own status line."""
+        with self._lock:
+            avg_hold = self.total_hold_seconds / self.checkins if self.checkins else 0
+            return {
+                "pool": self._pool.status() if self._pool is not None else None,
+                "checked_out": len(self._checked_out_at),
+                "peak_checked_out": self.peak_checked_out,
+                "connects": self.connects,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "invalidations": self.invalidations,
+                "avg_hold_ms": round(1000 * avg_hold, 1),
+                "max_hold_ms": round(1000 * self.max_hold_seconds, 1),
+            }
+
+
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)
+)
+pool_metrics = PoolMetrics().attach(engine)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
@@ -26,3 +170,114 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def release_connection(db: Session) -> None:
+    """
+    End the session's transaction so its connection goes back to the pool.
+
+    Call before slow work that does not touch the database, such as a
+    model call. The session stays usable: the next query starts a new
+    transaction on a fresh checkout. With SessionLocal (expire_on_commit)
+    loaded rows are expired and reload on next access.
+    """
+    if db.in_transaction():
+        db.commit()
+
+
+@contextmanager
+def unit_of_work(db: Session) -> Iterator[Session]:
+    """
+    Run a block of writes as one transaction, committed once at the end.
+
+    Use flush() inside the block when ids are needed; the INSERT returns
+    them (RETURNING on PostgreSQL), so rows do not have to be refreshed
+    after the commit. Objects written in the block stay loaded: the commit
+    does not expire them. Rolls back if the block raises.
+    """
+    expire_on_commit = db.expire_on_commit
+    db.expire_on_commit = False
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.expire_on_commit = expire_on_commit
+
+
+# --- Async engine (used by async endpoints) ---
+
+# Sync driver -> async driver for the same database
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """
+    Translate DATABASE_URL to its async driver equivalent.
+
+    asyncpg does not understand libpq's ``sslmode`` parameter, so it is
+    passed through as ``ssl`` instead.
+    """
+    url = make_url(database_url)
+    drivername = ASYNC_DRIVERS.get(url.drivername, url.drivername)
+    url = url.set(drivername=drivername)
+
+    if drivername == "postgresql+asyncpg" and "sslmode" in url.query:
+        sslmode = url.query["sslmode"]
+        url = url.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": sslmode}
+        )
+
+    return url.render_as_string(hide_password=False)
+
+
+# Filled in once the async engine is created
+async_pool_metrics = PoolMetrics()
+
+
+def get_pool_metrics() -> Dict[str, Any]:
+    """Checkout metrics of the sync and (if created) async pools."""
+    async_created = get_async_engine.cache_info().currsize > 0
+    return {
+        "sync": pool_metrics.snapshot(),
+        "async": async_pool_metrics.snapshot() if async_created else None,
+    }
+
+
+@lru_cache()
+def get_async_engine() -> AsyncEngine:
+    """
+    Get the process-wide async engine.
+
+    Created lazily so that sync-only entry points (scripts, Alembic) do not
+    need the async driver installed.
+    """
+    async_url = get_async_database_url(SQLALCHEMY_DATABASE_URL)
+    async_engine = create_async_engine(
+        async_url, **engine_options(async_url, is_async=True)
+    )
+    # Pool events fire on the sync engine the async engine wraps
+    async_pool_metrics.attach(async_engine.sync_engine)
+    return async_engine
+
+
+@lru_cache()
+def get_async_sessionmaker() -> async_sessionmaker:
+    """Get the async session factory bound to the async engine."""
+    # expire_on_commit=False: attribute access after commit must not
+    # trigger implicit IO, which AsyncSession cannot do
+    return async_sessionmaker(
+        bind=get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+async def get_async_db():
+    async with get_async_sessionmaker()() as db:
+        yield db
@@ -1,9 +1,30 @@
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from backend.app.api.endpoints import auth, interview, messages, snippets, stories
+from backend.app.core.agent import warm_up_llm_clients
+from backend.app.core.compression import COMPRESSION_ENABLED, CompressionMiddleware
+from backend.app.core.llm_scheduler import llm_scheduler
+from backend.app.core.model_health import model_health
+from backend.app.core.pagination import NEXT_CURSOR_HEADER
+from backend.app.core.prompt_cache import prompt_cache
+from backend.app.core.response_cache import phase_entry_cache
+from backend.app.db.session import get_pool_metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Pre-build Gemini clients so the first chat turn does not pay for setup
+    if os.getenv("GEMINI_PREWARM_CLIENTS", "true").lower() == "true":
+        warmed = warm_up_llm_clients()
+        print(f"[Startup] Warmed up LLM clients: {warmed}")
+    yield
+
 
-app = FastAPI(title="Life Story Game API")
+app = FastAPI(title="Life Story Game API", lifespan=lifespan)
 
 # Configure CORS for Frontend
 origins = [
@@ -20,8 +41,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],
 )
 
+# Compress large JSON bodies (transcripts, snippet decks); streams pass through
+if COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware)
+
 # Include API routers
 app.include_router(auth.router, prefix="/api/auth", tags=["authentication"])
 app.include_router(stories.router, prefix="/api/stories", tags=["stories"])
@@ -33,3 +59,33 @@ app.include_router(snippets.router, prefix="/api/snippets", tags=["snippets"])
 @app.get("/health")
 def health_check():
     return {"status": "ok", "service": "Life Story Game API"}
+
+
+@app.get("/health/models")
+def model_health_check():
+    """Circuit breaker state for each Gemini model seen so far."""
+    return {"models": model_health.snapshot()}
+
+
+@app.get("/health/llm-queue")
+def llm_queue_health_check():
+    """Slots in use, queue length and wait counters per Gemini model."""
+    return {"models": llm_scheduler.snapshot()}
+
+
+@app.get("/health/prompt-cache")
+def prompt_cache_health_check():
+    """Prompt-prefix reuse and provider context-cache counters."""
+    return prompt_cache.snapshot()
+
+
+@app.get("/health/response-cache")
+def response_cache_health_check():
+    """Hit rate of the phase-entry reply cache."""
+    return phase_entry_cache.snapshot()
+
+
+@app.get("/health/db")
+def db_pool_health_check():
+    """Connection pool checkout metrics for the sync and async engines."""
+    return get_pool_metrics()
@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base_class import Base
@@ -8,9 +8,13 @@ from backend.app.db.base_class import Base
 
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # Transcripts are always read per story in chronological order
+        Index("ix_messages_story_id_created_at", "story_id", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
-    story_id = Column(Integer, ForeignKey("stories.id"), nullable=False, index=True)
+    story_id = Column(Integer, ForeignKey("stories.id"), nullable=False)
 
     role = Column(String, nullable=False)
     content = Column(Text, nullable=False)
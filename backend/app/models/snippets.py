@@ -7,7 +7,17 @@ memorable moments or themes from the user's life story.
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from backend.app.db.base_class import Base
@@ -28,6 +38,24 @@ class Snippet(Base):
     """
 
     __tablename__ = "snippets"
+    __table_args__ = (
+        # Locked/unlocked cards of a story, and archived cards
+        Index(
+            "ix_snippets_story_active_locked_created",
+            "story_id",
+            "is_active",
+            "is_locked",
+            "created_at",
+        ),
+        # The active deck, read on every snippets page load
+        Index(
+            "ix_snippets_story_created_active",
+            "story_id",
+            "created_at",
+            postgresql_where=text("is_active = true"),
+            sqlite_where=text("is_active = 1"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -45,9 +73,7 @@ class Snippet(Base):
     is_locked = Column(
         Boolean, default=False, nullable=False
     )  # Protected during regeneration
-    is_active = Column(
-        Boolean, default=True, nullable=False, index=True
-    )  # Soft-delete flag
+    is_active = Column(Boolean, default=True, nullable=False)  # Soft-delete flag
 
     # Metadata
     created_at = Column(DateTime, default=datetime.utcnow)
@@ -19,6 +19,9 @@ class Story(Base):
     age_range = Column(String, nullable=True)
     status = Column(String, default="draft")  # 'draft', 'completed'
 
+    # Last message id already covered by snippet generation
+    snippets_through_message_id = Column(Integer, nullable=True)
+
     created_at = Column(DateTime, default=datetime.utcnow)
 
     # Relationships
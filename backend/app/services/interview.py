@@ -1,12 +1,30 @@
-from typing import Dict, List, Optional, Tuple
+import os
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 from langchain_core.messages import AIMessage, HumanMessage
+from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from backend.app.core.agent import agent_app
+from backend.app.core.events import EVENT_MESSAGE, EVENT_PHASE, story_events
+from backend.app.core.llm_scheduler import PRIORITY_CHAT, caller_config
+from backend.app.core.response_cache import CacheKey, phase_entry_cache
 from backend.app.db.base import Base  # Ensure all models are registered
+from backend.app.db.session import unit_of_work
 from backend.app.models.message import Message
 from backend.app.models.story import Story
+from backend.app.services.summaries import (
+    PhaseSummaryService,
+    format_summaries,
+    phase_summarizer,
+)
+from backend.domain.services.context_window import ContextWindowService
+
+# Conversation history sent to the model: newest N messages, trimmed to
+# an estimated token budget
+HISTORY_MAX_MESSAGES = int(os.getenv("CHAT_HISTORY_MAX_MESSAGES", "20"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("CHAT_HISTORY_TOKEN_BUDGET", "6000"))
 
 # Age range to phase mapping - determines which life stages to include
 AGE_PHASE_MAPPING: Dict[str, List[str]] = {
@@ -202,6 +220,11 @@ Make it emotionally resonant. Capture their authentic voice.""",
 }
 
 
+# Phases whose entry reply may be served from phase_entry_cache; the
+# synthesis is a summary of the user's own story
+CACHEABLE_ENTRY_PHASES = set(PHASE_CONFIG) - {"SYNTHESIS"}
+
+
 class InterviewService:
     def __init__(self, db: Session):
         self.db = db
@@ -256,21 +279,257 @@ class InterviewService:
                 return match.group(1)
         return None
 
-    def advance_to_next_phase(self, story: Story) -> str:
-        """Advance story to next phase and return new phase name."""
+    def _move_to_next_phase(self, story: Story) -> Optional[str]:
+        """
+        Set the story to the phase after its current one, without committing.
+
+        Returns:
+            The phase that was left, or None if already at the last phase
+        """
         phase_order = self.get_phase_order(story.age_range)
         current_idx = self.get_phase_index(story.current_phase, phase_order)
 
         if current_idx < len(phase_order) - 1:
-            new_phase = phase_order[current_idx + 1]
-            story.current_phase = new_phase
+            finished_phase = story.current_phase
+            story.current_phase = phase_order[current_idx + 1]
+            return finished_phase
+
+        return None
+
+    def advance_to_next_phase(self, story: Story) -> str:
+        """Advance story to next phase and return new phase name."""
+        finished_phase = self._move_to_next_phase(story)
+        if finished_phase is not None:
             self.db.commit()
-            return new_phase
+            # Condense the finished chapter off the request path
+            phase_summarizer.schedule(story.id, finished_phase)
+            self.publish_phase(story)
 
         return story.current_phase
 
+    def build_phase_metadata(self, story: Story) -> Dict:
+        """Build the phase metadata the frontend uses for phase tracking."""
+        phase_config = PHASE_CONFIG.get(story.current_phase, PHASE_CONFIG["GREETING"])
+        phase_order = self.get_phase_order(story.age_range)
+        phase_index = self.get_phase_index(story.current_phase, phase_order)
+
+        return {
+            "phase": story.current_phase,
+            "phase_order": phase_order,
+            "phase_index": phase_index,
+            "age_range": story.age_range,
+            "phase_description": phase_config.get("description", ""),
+        }
+
+    def publish_phase(self, story: Story) -> None:
+        """Tell the story's event subscribers about a phase change."""
+        if story_events.has_subscribers(story.id):
+            story_events.publish(
+                story.id, EVENT_PHASE, self.build_phase_metadata(story)
+            )
+
+    def publish_message(self, message: Message) -> None:
+        """Tell the story's event subscribers about a saved message."""
+        if story_events.has_subscribers(message.story_id):
+            story_events.publish(
+                message.story_id,
+                EVENT_MESSAGE,
+                {
+                    "id": message.id,
+                    "story_id": message.story_id,
+                    "role": message.role,
+                    "content": message.content,
+                    "phase_context": message.phase_context,
+                    "created_at": message.created_at.isoformat(),
+                },
+            )
+
+    def load_history_window(
+        self, story_id: int, exclude_phases: Optional[List[str]] = None
+    ) -> List[Message]:
+        """
+        Load the most recent messages of a story that fit the token budget.
+
+        Messages from exclude_phases (chapters already covered by a
+        summary) are left out. Returns messages in chronological order.
+        """
+        query = self.db.query(Message).filter(Message.story_id == story_id)
+        if exclude_phases:
+            query = query.filter(
+                or_(
+                    Message.phase_context.is_(None),
+                    Message.phase_context.notin_(exclude_phases),
+                )
+            )
+
+        # Newest first so LIMIT keeps the latest turns, then restore order
+        recent = (
+            query.order_by(Message.created_at.desc(), Message.id.desc())
+            .limit(HISTORY_MAX_MESSAGES)
+            .all()
+        )
+        recent.reverse()
+
+        return ContextWindowService.fit_to_budget(
+            recent, HISTORY_TOKEN_BUDGET, lambda msg: msg.content
+        )
+
+    def is_control_message(self, message: str) -> bool:
+        """Check whether a message is a UI action (age choice, next chapter)."""
+        return bool(
+            self.detect_age_selection(message) or self.detect_phase_advance(message)
+        )
+
+    def _phase_entry_cache_key(
+        self,
+        story: Story,
+        user_msg: Message,
+        history_records: List[Message],
+        has_summaries: bool,
+    ) -> Optional[CacheKey]:
+        """
+        Key for phase_entry_cache if this turn's reply can be shared.
+
+        That is the first turn of a phase whose prompt holds nothing
+        personal besides the new input: no chapter summaries, and only UI
+        actions among the earlier user messages (so the earlier replies
+        were not about the user's story either).
+        """
+        if has_summaries or story.current_phase not in CACHEABLE_ENTRY_PHASES:
+            return None
+        for msg in history_records:
+            if msg is user_msg:
+                continue
+            if msg.phase_context == story.current_phase:
+                return None
+            if msg.role == "user" and not self.is_control_message(msg.content):
+                return None
+        return phase_entry_cache.key(
+            story.current_phase, story.age_range, user_msg.content
+        )
+
+    def _prepare_chat(
+        self,
+        story_id: int,
+        user_content: str,
+        advance_phase: bool,
+        story: Optional[Story] = None,
+    ) -> Tuple[Story, Dict, Optional[CacheKey]]:
+        """
+        Run every step of a chat turn that happens before the agent call:
+        load the story, apply phase transitions, save the user message and
+        build the agent input (history + phase instruction).
+
+        Also returns the phase_entry_cache key when the reply can be served
+        from (and stored in) that cache, else None.
+
+        The story lookup is skipped when the caller passes the loaded row.
+        All writes go out in a single commit at the end, which also hands
+        the connection back, so none is held while the model runs;
+        _save_ai_response checks one out again to persist the reply.
+        """
+        phase_changed = False
+        finished_phase: Optional[str] = None
+
+        with unit_of_work(self.db):
+            # 1. Fetch Story Context
+            if story is None:
+                story = self.db.query(Story).filter(Story.id == story_id).first()
+            if not story:
+                raise ValueError(f"Story with ID {story_id} not found")
+
+            # 2. Handle age selection
+            detected_age = self.detect_age_selection(user_content)
+            if detected_age and not story.age_range:
+                story.age_range = detected_age
+                # Move from GREETING to first interview phase (FAMILY_HISTORY)
+                phase_order = self.get_phase_order(detected_age)
+                story.current_phase = phase_order[0]  # FAMILY_HISTORY
+                phase_changed = True
+
+            # 3. Handle explicit phase advance
+            target_phase = self.detect_phase_advance(user_content)
+            if target_phase or advance_phase:
+                finished_phase = self._move_to_next_phase(story)
+                phase_changed = phase_changed or finished_phase is not None
+
+            # 4. Save User Message (flushed so the history query sees it)
+            user_msg_db = Message(
+                story_id=story.id,
+                role="user",
+                content=user_content,
+                phase_context=story.current_phase,
+            )
+            self.db.add(user_msg_db)
+            self.db.flush()
+
+            # 5. Load History for Context: summaries of finished chapters plus
+            # the recent raw turns of chapters that have no summary yet
+            summaries = [
+                s
+                for s in PhaseSummaryService(self.db).get_summaries(story.id)
+                if s.phase != story.current_phase
+            ]
+            history_records = self.load_history_window(
+                story.id, exclude_phases=[s.phase for s in summaries]
+            )
+
+            # Convert DB models to LangChain message format
+            lc_messages = []
+            for msg in history_records:
+                if msg.role == "user":
+                    lc_messages.append(HumanMessage(content=msg.content))
+                elif msg.role == "assistant":
+                    lc_messages.append(AIMessage(content=msg.content))
+
+            # 6. Determine System Prompt based on Story Phase
+            phase_config = PHASE_CONFIG.get(
+                story.current_phase, PHASE_CONFIG["GREETING"]
+            )
+            current_instruction = phase_config["prompt"]
+            if summaries:
+                current_instruction += "\n\n" + format_summaries(summaries)
+
+            cache_key = self._phase_entry_cache_key(
+                story, user_msg_db, history_records, bool(summaries)
+            )
+
+        # Committed: now let background work and subscribers see the changes
+        if finished_phase is not None:
+            # Condense the finished chapter off the request path
+            phase_summarizer.schedule(story.id, finished_phase)
+        if phase_changed:
+            self.publish_phase(story)
+        self.publish_message(user_msg_db)
+
+        agent_input = {
+            "messages": lc_messages,
+            "phase_instruction": current_instruction,
+        }
+        return story, agent_input, cache_key
+
+    def _save_ai_response(self, story: Story, content: str) -> Tuple[Message, Dict]:
+        """Persist the assistant reply and return it with phase metadata."""
+        with unit_of_work(self.db):
+            ai_msg_db = Message(
+                story_id=story.id,
+                role="assistant",
+                content=content,
+                phase_context=story.current_phase,
+            )
+            self.db.add(ai_msg_db)
+            # Flush returns the id; no refresh needed after the commit
+            self.db.flush()
+        self.publish_message(ai_msg_db)
+
+        return ai_msg_db, self.build_phase_metadata(story)
+
     def process_chat(
-        self, story_id: int, user_content: str, advance_phase: bool = False
+        self,
+        story_id: int,
+        user_content: str,
+        advance_phase: bool = False,
+        story: Optional[Story] = None,
     ) -> Tuple[Message, Dict]:
         """
         Orchestrates the chat flow:
@@ -280,86 +539,178 @@ class InterviewService:
         4. Run AI Agent
         5. Save AI Response
         6. Return response with phase metadata
-        """
-        # 1. Fetch Story Context
-        story = self.db.query(Story).filter(Story.id == story_id).first()
-        if not story:
-            raise ValueError(f"Story with ID {story_id} not found")
-
-        # 2. Handle age selection
-        detected_age = self.detect_age_selection(user_content)
-        if detected_age and not story.age_range:
-            story.age_range = detected_age
-            # Move from GREETING to first interview phase (FAMILY_HISTORY)
-            phase_order = self.get_phase_order(detected_age)
-            story.current_phase = phase_order[0]  # FAMILY_HISTORY
-            self.db.commit()
 
-        # 3. Handle explicit phase advance
-        target_phase = self.detect_phase_advance(user_content)
-        if target_phase or advance_phase:
-            self.advance_to_next_phase(story)
-
-        # 4. Save User Message to DB
-        user_msg_db = Message(
-            story_id=story.id,
-            role="user",
-            content=user_content,
-            phase_context=story.current_phase,
+        Pass story to reuse a row the caller has already loaded.
+        """
+        story, agent_input, cache_key = self._prepare_chat(
+            story_id, user_content, advance_phase, story
         )
-        self.db.add(user_msg_db)
-        self.db.commit()
-
-        # 5. Load History for Context
-        history_records = (
-            self.db.query(Message)
-            .filter(Message.story_id == story.id)
-            .order_by(Message.created_at.asc())
-            .limit(20)
-            .all()
+
+        ai_response_content = phase_entry_cache.get(cache_key)
+        if ai_response_content is None:
+            # Invoke LangGraph Agent
+            result = agent_app.invoke(
+                agent_input, config=caller_config(story.user_id, PRIORITY_CHAT)
+            )
+
+            # Extract the AI's response content
+            ai_response_content = result["messages"][-1].content
+            phase_entry_cache.put(cache_key, ai_response_content)
+
+        return self._save_ai_response(story, ai_response_content)
+
+    def stream_chat(
+        self,
+        story_id: int,
+        user_content: str,
+        advance_phase: bool = False,
+        story: Optional[Story] = None,
+    ) -> Iterator[Tuple[str, Dict]]:
+        """
+        Streaming variant of process_chat.
+
+        Story lookup, phase transitions and the user message are handled
+        eagerly, so a missing story raises ValueError before any event is
+        produced. The returned iterator yields ("token", {"content": ...})
+        events while the model generates, then a single ("done", {...})
+        event carrying the persisted assistant message and phase metadata.
+        The assistant message is only saved once the stream completes.
+        """
+        story, agent_input, cache_key = self._prepare_chat(
+            story_id, user_content, advance_phase, story
         )
+        return self._stream_agent_response(story, agent_input, cache_key)
+
+    def _stream_agent_response(
+        self, story: Story, agent_input: Dict, cache_key: Optional[CacheKey] = None
+    ) -> Iterator[Tuple[str, Dict]]:
+        """Relay agent tokens (or a cached reply) as events, then persist it."""
+        content = phase_entry_cache.get(cache_key)
+        if content is not None:
+            yield "token", {"content": content}
+        else:
+            parts: List[str] = []
+            for chunk, _metadata in agent_app.stream(
+                agent_input,
+                config=caller_config(story.user_id, PRIORITY_CHAT),
+                stream_mode="messages",
+            ):
+                text = _chunk_text(chunk)
+                if not text:
+                    continue
+                parts.append(text)
+                yield "token", {"content": text}
+            content = "".join(parts)
+            phase_entry_cache.put(cache_key, content)
+
+        ai_msg_db, phase_metadata = self._save_ai_response(story, content)
+
+        yield "done", {
+            "id": ai_msg_db.id,
+            "role": ai_msg_db.role,
+            "content": ai_msg_db.content,
+            **phase_metadata,
+        }
 
-        # Convert DB models to LangChain message format
-        lc_messages = []
-        for msg in history_records:
-            if msg.role == "user":
-                lc_messages.append(HumanMessage(content=msg.content))
-            elif msg.role == "assistant":
-                lc_messages.append(AIMessage(content=msg.content))
 
-        # 6. Determine System Prompt based on Story Phase
-        phase_config = PHASE_CONFIG.get(story.current_phase, PHASE_CONFIG["GREETING"])
-        current_instruction = phase_config["prompt"]
+class AsyncInterviewService:
+    """
+    Async entry point for the chat flow, used by the async endpoints.
 
-        # 7. Invoke LangGraph Agent
-        result = agent_app.invoke(
-            {"messages": lc_messages, "phase_instruction": current_instruction}
-        )
+    Database steps reuse InterviewService through AsyncSession.run_sync,
+    while the agent call is awaited, so no worker thread is held for the
+    duration of the Gemini request.
+    """
 
-        # Extract the AI's response content
-        ai_response_content = result["messages"][-1].content
+    def __init__(self, db: AsyncSession):
+        self.db = db
 
-        # 8. Save AI Response to DB
-        ai_msg_db = Message(
-            story_id=story.id,
-            role="assistant",
-            content=ai_response_content,
-            phase_context=story.current_phase,
+    async def process_chat(
+        self,
+        story_id: int,
+        user_content: str,
+        advance_phase: bool = False,
+        story: Optional[Story] = None,
+    ) -> Tuple[Message, Dict]:
+        """Async variant of InterviewService.process_chat."""
+        story, agent_input, cache_key = await self.db.run_sync(
+            lambda session: InterviewService(session)._prepare_chat(
+                story_id, user_content, advance_phase, story
+            )
         )
-        self.db.add(ai_msg_db)
-        self.db.commit()
-        self.db.refresh(ai_msg_db)
 
-        # 9. Build phase metadata for frontend
-        phase_order = self.get_phase_order(story.age_range)
-        phase_index = self.get_phase_index(story.current_phase, phase_order)
+        ai_response_content = phase_entry_cache.get(cache_key)
+        if ai_response_content is None:
+            result = await agent_app.ainvoke(
+                agent_input, config=caller_config(story.user_id, PRIORITY_CHAT)
+            )
+            ai_response_content = result["messages"][-1].content
+            phase_entry_cache.put(cache_key, ai_response_content)
+
+        return await self.db.run_sync(
+            lambda session: InterviewService(session)._save_ai_response(
+                story, ai_response_content
+            )
+        )
 
-        phase_metadata = {
-            "phase": story.current_phase,
-            "phase_order": phase_order,
-            "phase_index": phase_index,
-            "age_range": story.age_range,
-            "phase_description": phase_config.get("description", ""),
+    async def stream_chat(
+        self,
+        story_id: int,
+        user_content: str,
+        advance_phase: bool = False,
+        story: Optional[Story] = None,
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Async variant of InterviewService.stream_chat."""
+        story, agent_input, cache_key = await self.db.run_sync(
+            lambda session: InterviewService(session)._prepare_chat(
+                story_id, user_content, advance_phase, story
+            )
+        )
+        return self._stream_agent_response(story, agent_input, cache_key)
+
+    async def _stream_agent_response(
+        self, story: Story, agent_input: Dict, cache_key: Optional[CacheKey] = None
+    ) -> AsyncIterator[Tuple[str, Dict]]:
+        """Relay agent tokens (or a cached reply) as events, then persist it."""
+        content = phase_entry_cache.get(cache_key)
+        if content is not None:
+            yield "token", {"content": content}
+        else:
+            parts: List[str] = []
+            async for chunk, _metadata in agent_app.astream(
+                agent_input,
+                config=caller_config(story.user_id, PRIORITY_CHAT),
+                stream_mode="messages",
+            ):
+                text = _chunk_text(chunk)
+                if not text:
+                    continue
+                parts.append(text)
+                yield "token", {"content": text}
+            content = "".join(parts)
+            phase_entry_cache.put(cache_key, content)
+
+        ai_msg_db, phase_metadata = await self.db.run_sync(
+            lambda session: InterviewService(session)._save_ai_response(
+                story, content
+            )
+        )
+
+        yield "done", {
+            "id": ai_msg_db.id,
+            "role": ai_msg_db.role,
+            "content": ai_msg_db.content,
+            **phase_metadata,
         }
 
-        return ai_msg_db, phase_metadata
+
+def _chunk_text(chunk) -> str:
+    """Extract plain text from a streamed message chunk."""
+    content = getattr(chunk, "content", "")
+    if isinstance(content, list):
+        return "".join(
+            part if isinstance(part, str) else part.get("text", "")
+            for part in content
+            if isinstance(part, (str, dict))
+        )
+    return content or ""
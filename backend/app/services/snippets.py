@@ -7,6 +7,9 @@ short, impactful snippets (max 300 characters) suitable for printing on cards.
 Snippets are persisted to the database and can be retrieved later without
 regeneration. Use get_existing_snippets() to check for cached snippets before
 regenerating.
+
+Generation can also run in the background: run_snippet_generation() is the
+job function queued on snippet_jobs by the API.
 """
 
 import json
@@ -16,11 +19,31 @@ from typing import Dict, List, Optional, cast
 from langchain_core.messages import HumanMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from pydantic import SecretStr
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from backend.app.core.events import EVENT_SNIPPETS, story_events
+from backend.app.core.jobs import JobQueue
+from backend.app.core.llm_clients import llm_clients
+from backend.app.core.llm_scheduler import PRIORITY_BACKGROUND, llm_scheduler
+from backend.app.core.model_health import model_health
+from backend.app.core.retry_policy import (
+    ACTION_RETRY,
+    record_model_error,
+    retry_policy,
+)
+from backend.app.db.read_models import SNIPPET_COLUMNS, rows_to_dicts
+from backend.app.db.session import SessionLocal, release_connection, unit_of_work
 from backend.app.models.message import Message
 from backend.app.models.snippets import Snippet
 from backend.app.models.story import Story
+from backend.domain.services.context_window import ContextWindowService
+
+
+SNIPPET_TEMPERATURE = 0.7
+
+# Worker threads for background snippet generation
+SNIPPET_JOB_WORKERS = int(os.getenv("SNIPPET_JOB_WORKERS", "2"))
 
 
 def get_model_cascade() -> List[str]:
@@ -55,21 +78,36 @@ class SnippetService:
             raise ValueError("GEMINI_API_KEY not set in environment")
         self.api_key = SecretStr(api_key_str)
 
-    def get_story_messages(self, story_id: int) -> List[Dict[str, str]]:
+    def _new_llm(self, model_name: str, temperature: float) -> ChatGoogleGenerativeAI:
+        """Build a new chat model client (called by the client registry on a miss)."""
+        return ChatGoogleGenerativeAI(
+            model=model_name,
+            api_key=self.api_key,
+            temperature=temperature,
+            convert_system_message_to_human=True,
+        )
+
+    def get_story_messages(
+        self, story_id: int, after_id: Optional[int] = None
+    ) -> List[Dict]:
         """
         Fetch all messages for a story.
 
-        Returns list of dicts with 'role' and 'content' keys.
+        Args:
+            story_id: ID of the story
+            after_id: If set, only return messages with a higher id
+
+        Returns list of dicts with 'id', 'role' and 'content' keys.
         """
-        messages = (
-            self.db.query(Message)
-            .filter(Message.story_id == story_id)
-            .order_by(Message.created_at.asc())
-            .all()
-        )
+        query = self.db.query(Message).filter(Message.story_id == story_id)
+        if after_id is not None:
+            query = query.filter(Message.id > after_id)
+
+        messages = query.order_by(Message.created_at.asc(), Message.id.asc()).all()
 
         return [
-            {"role": str(msg.role), "content": str(msg.content)} for msg in messages
+            {"id": msg.id, "role": str(msg.role), "content": str(msg.content)}
+            for msg in messages
         ]
 
     def get_existing_snippets(
@@ -90,15 +128,14 @@ class SnippetService:
                 - cached (bool): True if snippets exist, False if empty
                 - error (str|None): None
         """
-        query = self.db.query(Snippet).filter(Snippet.story_id == story_id)
+        query = self.db.query(*SNIPPET_COLUMNS).filter(Snippet.story_id == story_id)
 
         # Only return active snippets by default
         if not include_archived:
             query = query.filter(Snippet.is_active == True)  # noqa: E712
 
-        snippets = query.order_by(Snippet.created_at.asc()).all()
-
-        snippet_list = [s.to_dict() for s in snippets]
+        # Same dicts as Snippet.to_dict(), without loading ORM objects
+        snippet_list = rows_to_dicts(query.order_by(Snippet.created_at.asc()))
 
         return {
             "success": True,
@@ -118,16 +155,13 @@ class SnippetService:
         Returns:
             Dict with success, snippets array, and count
         """
-        snippets = (
-            self.db.query(Snippet)
+        snippet_list = rows_to_dicts(
+            self.db.query(*SNIPPET_COLUMNS)
             .filter(Snippet.story_id == story_id)
             .filter(Snippet.is_active == False)  # noqa: E712
             .order_by(Snippet.created_at.desc())  # Most recent first for archived
-            .all()
         )
 
-        snippet_list = [s.to_dict() for s in snippets]
-
         return {
             "success": True,
             "snippets": snippet_list,
@@ -188,7 +222,8 @@ class SnippetService:
         Returns:
             Updated snippet dict, or None if not found
         """
-        snippet = self.db.query(Snippet).filter(Snippet.id == snippet_id).first()
+        # Session.get reuses the row if the endpoint already loaded it
+        snippet = self.db.get(Snippet, snippet_id)
         if not snippet:
             return None
 
@@ -207,7 +242,7 @@ class SnippetService:
         Returns:
             Restored snippet dict, or None if not found
         """
-        snippet = self.db.query(Snippet).filter(Snippet.id == snippet_id).first()
+        snippet = self.db.get(Snippet, snippet_id)
         if not snippet:
             return None
 
@@ -226,7 +261,7 @@ class SnippetService:
         Returns:
             Updated snippet dict, or None if not found
         """
-        snippet = self.db.query(Snippet).filter(Snippet.id == snippet_id).first()
+        snippet = self.db.get(Snippet, snippet_id)
         if not snippet:
             return None
 
@@ -286,6 +321,9 @@ class SnippetService:
         """
         Save generated snippets to the database.
 
+        Pending changes in the session (e.g. the story's snippet cursor,
+        archived cards) are committed in the same transaction.
+
         Args:
             story_id: ID of the story
             user_id: ID of the user who owns the story
@@ -294,28 +332,34 @@ class SnippetService:
         Returns:
             List of created Snippet objects
         """
-        created = []
-        for snippet_data in snippets:
-            snippet = Snippet(
-                story_id=story_id,
-                user_id=user_id,
-                title=snippet_data["title"],
-                content=snippet_data["content"],
-                phase=snippet_data.get("phase"),
-                theme=snippet_data.get("theme"),
-            )
-            self.db.add(snippet)
-            created.append(snippet)
+        rows = [
+            {
+                "story_id": story_id,
+                "user_id": user_id,
+                "title": snippet_data["title"],
+                "content": snippet_data["content"],
+                "phase": snippet_data.get("phase"),
+                "theme": snippet_data.get("theme"),
+            }
+            for snippet_data in snippets
+        ]
+        if not rows:
+            self.db.commit()
+            return []
 
-        self.db.commit()
+        # One batched INSERT ... RETURNING gives back complete rows, so
+        # nothing has to be refreshed after the commit
+        with unit_of_work(self.db):
+            created = list(self.db.scalars(insert(Snippet).returning(Snippet), rows))
 
-        # Refresh to get IDs
-        for s in created:
-            self.db.refresh(s)
+        # RETURNING order is not guaranteed; ids follow insertion order
+        created.sort(key=lambda snippet: snippet.id)
 
         return created
 
-    def generate_snippets(self, story_id: int) -> Dict:
+    def generate_snippets(
+        self, story_id: int, incremental: bool = False, story: Optional[Story] = None
+    ) -> Dict:
         """
         Generate story snippets for a given story and persist to database.
 
@@ -324,8 +368,14 @@ class SnippetService:
         2. Generates new snippets using AI
         3. Saves the new snippets to the database
 
+        With incremental=True, and once snippets have been generated for the
+        story, only messages added since the last run are sent, together
+        with a digest of the current cards; see _generate_incremental.
+
         Args:
             story_id: ID of the story to generate snippets for
+            incremental: Update the existing cards instead of replacing them
+            story: The story, if the caller already loaded it
 
         Returns:
             Dict with keys:
@@ -336,7 +386,8 @@ class SnippetService:
                 - error (str|None): Error message if failed
         """
         # Verify story exists and capture user_id immediately
-        story = self.db.query(Story).filter(Story.id == story_id).first()
+        if story is None:
+            story = self.db.query(Story).filter(Story.id == story_id).first()
         if not story:
             return {
                 "success": False,
@@ -349,6 +400,9 @@ class SnippetService:
         # Capture user_id before any operations that might expire the session object
         user_id = story.user_id
 
+        if incremental and story.snippets_through_message_id is not None:
+            return self._generate_incremental(story)
+
         # Fetch messages
         messages = self.get_story_messages(story_id)
         if not messages:
@@ -430,89 +484,112 @@ RULES:
 
 Remember: Output ONLY the JSON object with snippets array. Each snippet max 300 characters."""
 
-        # Try models in cascade
-        model_cascade = get_model_cascade()
-        print(f"[Snippets] 🔄 Model cascade: {model_cascade}")
         print(f"[Snippets] 🔄 Story ID: {story_id}, User ID: {user_id}")
+        result = self._call_model_cascade(system_instruction, user_prompt, user_id)
+
+        # If parsing succeeded, save snippets to database
+        if result["success"] and result["snippets"]:
+            # Committed together with the snippets
+            story.snippets_through_message_id = messages[-1]["id"]
+            saved_snippets = self._save_snippets(
+                story_id=story_id, user_id=user_id, snippets=result["snippets"]
+            )
+            # Update result with saved snippet data (includes IDs)
+            result["snippets"] = [s.to_dict() for s in saved_snippets]
+
+        return result
+
+    def _call_model_cascade(
+        self,
+        system_instruction: str,
+        user_prompt: str,
+        user_id: Optional[int] = None,
+    ) -> Dict:
+        """
+        Send a prompt through the model cascade and parse the JSON reply.
+
+        Models that are cooling down are skipped. Transient errors are
+        retried on the same model as retry_policy allows; otherwise the
+        next model is tried (snippet jobs have no user waiting on an
+        error, so even fatal errors fall through). Calls queue behind
+        interactive chat, fairly per user_id.
+
+        Returns:
+            Result dict from _parse_response, or a failure dict if every
+            model failed
+        """
+        model_cascade = model_health.available_models(get_model_cascade())
+        print(f"[Snippets] 🔄 Model cascade: {model_cascade}")
+        prompt_tokens = ContextWindowService.estimate_tokens(
+            system_instruction + user_prompt
+        )
+
+        budget = retry_policy.start()
 
         for attempt_idx, model_name in enumerate(model_cascade):
-            try:
-                print(
-                    f"[Snippets] 🔄 Attempt {attempt_idx + 1}/{len(model_cascade)}: Trying '{model_name}'..."
-                )
-
-                llm = ChatGoogleGenerativeAI(
-                    model=model_name,
-                    api_key=self.api_key,
-                    temperature=0.7,
-                    convert_system_message_to_human=True,
-                )
-                print(f"[Snippets] 🔄 LLM initialized for {model_name}")
-
-                # Call Gemini
-                print(f"[Snippets] 🔄 Sending request to {model_name}...")
-                response = llm.invoke(
-                    [
-                        SystemMessage(content=system_instruction),
-                        HumanMessage(content=user_prompt),
-                    ]
-                )
-                print(f"[Snippets] 🔄 Response received from {model_name}")
-
-                print(f"[Snippets] ✅ SUCCESS with {model_name}!")
-
-                # Parse JSON response - handle both string and list content
-                content = response.content
-                if isinstance(content, list):
-                    # Join list items if response is a list
-                    content = " ".join(str(item) for item in content)
-
-                result = self._parse_response(str(content), model_name)
-
-                # If parsing succeeded, save snippets to database
-                if result["success"] and result["snippets"]:
-                    saved_snippets = self._save_snippets(
-                        story_id=story_id, user_id=user_id, snippets=result["snippets"]
+            print(
+                f"[Snippets] 🔄 Attempt {attempt_idx + 1}/{len(model_cascade)}: Trying '{model_name}'..."
+            )
+            while True:
+                try:
+                    llm = llm_clients.get(
+                        model_name, SNIPPET_TEMPERATURE, self._new_llm
                     )
-                    # Update result with saved snippet data (includes IDs)
-                    result["snippets"] = [s.to_dict() for s in saved_snippets]
-
-                return result
-
-            except Exception as e:
-                error_message = str(e)
-                print(f"[Snippets] ❌ {model_name} FAILED")
-                print(f"[Snippets] ❌ Error type: {type(e).__name__}")
-                print(f"[Snippets] ❌ Error message: {error_message[:200]}")
-
-                # Check if rate limit
-                is_rate_limit = any(
-                    indicator in error_message.lower()
-                    for indicator in [
-                        "429",
-                        "resource_exhausted",
-                        "rate limit",
-                        "quota",
-                    ]
-                )
-
-                if is_rate_limit:
-                    print(f"[Snippets] 🔄 Rate limit detected, trying next model...")
-
-                if is_rate_limit and attempt_idx < len(model_cascade) - 1:
+                    print(f"[Snippets] 🔄 LLM ready for {model_name}")
+
+                    # Call Gemini
+                    with llm_scheduler.slot(
+                        model_name, user_id, PRIORITY_BACKGROUND, prompt_tokens
+                    ) as permit:
+                        print(f"[Snippets] 🔄 Sending request to {model_name}...")
+                        response = llm.invoke(
+                            [
+                                SystemMessage(content=system_instruction),
+                                HumanMessage(content=user_prompt),
+                            ]
+                        )
+                        permit.record_usage(response)
+                    print(f"[Snippets] 🔄 Response received from {model_name}")
+                    model_health.record_success(model_name)
+
+                    print(f"[Snippets] ✅ SUCCESS with {model_name}!")
+
+                    # Parse JSON response - handle both string and list content
+                    content = response.content
+                    if isinstance(content, list):
+                        # Join list items if response is a list
+                        content = " ".join(str(item) for item in content)
+
+                    return self._parse_response(str(content), model_name)
+
+                except Exception as e:
+                    error_message = str(e)
+                    print(f"[Snippets] ❌ {model_name} FAILED")
+                    print(f"[Snippets] ❌ Error type: {type(e).__name__}")
+                    print(f"[Snippets] ❌ Error message: {error_message[:200]}")
+
+                    decision = budget.decide(e, model_name)
+                    if decision.action == ACTION_RETRY:
+                        print(
+                            f"[Snippets] 🔁 Retrying {model_name} "
+                            f"in {decision.delay:.2f}s..."
+                        )
+                        budget.sleep(decision.delay)
+                        continue
+
+                    # Busy lanes are not reported to the circuit breaker
+                    record_model_error(model_name, e, decision.kind)
+                    if attempt_idx == len(model_cascade) - 1:
+                        print(f"[Snippets] ❌ ALL MODELS EXHAUSTED")
+                        return {
+                            "success": False,
+                            "snippets": [],
+                            "count": 0,
+                            "model": None,
+                            "error": f"All models failed. Last error: {error_message}",
+                        }
                     print(f"[Snippets] 🔄 Moving to next model...")
-                    continue
-
-                # Last model or non-rate-limit error
-                if attempt_idx == len(model_cascade) - 1:
-                    print(f"[Snippets] ❌ ALL MODELS EXHAUSTED")
-                    return {
-                        "success": False,
-                        "snippets": [],
-                        "count": 0,
-                        "model": None,
-                        "error": f"All models failed. Last error: {error_message}",
-                    }
+                    break
 
         return {
             "success": False,
@@ -522,6 +599,132 @@ Remember: Output ONLY the JSON object with snippets array. Each snippet max 300
             "error": "Failed to generate snippets with any model",
         }
 
+    def _generate_incremental(self, story: Story) -> Dict:
+        """
+        Update the existing cards with the messages added since the last run.
+
+        Only the new messages and a short digest of the active cards are
+        sent, so the prompt no longer grows with the whole story. The model
+        returns new cards, each optionally naming an unlocked card it
+        replaces; untouched cards are kept as they are.
+
+        Args:
+            story: Story whose snippets_through_message_id is set
+
+        Returns:
+            Result dict like generate_snippets, with the full active deck
+            in "snippets"; "cached" is True if there was nothing new
+        """
+        story_id = story.id
+        user_id = story.user_id
+
+        new_messages = self.get_story_messages(
+            story_id, after_id=story.snippets_through_message_id
+        )
+        active_snippets = (
+            self.db.query(Snippet)
+            .filter(
+                Snippet.story_id == story_id,
+                Snippet.is_active == True,  # noqa: E712
+            )
+            .order_by(Snippet.created_at.asc())
+            .all()
+        )
+
+        if not new_messages:
+            print(f"[Snippets] ✅ No new messages for story {story_id}, keeping cards")
+            return {
+                "success": True,
+                "snippets": [s.to_dict() for s in active_snippets],
+                "count": len(active_snippets),
+                "model": None,
+                "error": None,
+                "cached": True,
+            }
+
+        new_text = "\n".join(
+            [f"{msg['role'].upper()}: {msg['content']}" for msg in new_messages]
+        )
+        card_digest = "\n".join(
+            [
+                f"- [{s.id}] {'LOCKED ' if s.is_locked else ''}"
+                f"({s.phase}, {s.theme}) {s.title}: {s.content[:100]}"
+                for s in active_snippets
+            ]
+        ) or "(none)"
+
+        system_instruction = f"""You are a story curator updating a deck of printable game cards.
+
+Your task: The story has continued since the deck was made. Read the NEW part of the conversation and decide which cards to add or improve.
+
+OUTPUT FORMAT: You MUST respond with ONLY valid JSON, no other text. Use this exact structure:
+{{
+  "snippets": [
+    {{
+      "title": "2-5 word catchy title",
+      "content": "The snippet text, max 300 characters. Written in third person, narrative style.",
+      "phase": "CHILDHOOD|ADOLESCENCE|EARLY_ADULTHOOD|MIDLIFE|PRESENT|FAMILY_HISTORY",
+      "theme": "family|growth|challenge|adventure|love|legacy|identity|friendship",
+      "replaces": null
+    }}
+  ]
+}}
+
+RULES:
+1. Only output cards that are new or that change an existing card
+2. To rewrite an existing card with new details, set "replaces" to its id
+3. NEVER replace a LOCKED card and never duplicate an existing card's topic
+4. Return an empty "snippets" array if the new messages add nothing card-worthy
+5. Each snippet content MUST be under 300 characters
+6. Write in third person ("They discovered...", "Growing up, they...")
+7. ONLY output the JSON object, nothing else
+
+EXISTING CARDS ([id] title: content):
+{card_digest}"""
+
+        user_prompt = f"""New part of the life story conversation:
+
+---NEW MESSAGES START---
+{new_text}
+---NEW MESSAGES END---
+
+Remember: Output ONLY the JSON object with snippets array. Each snippet max 300 characters."""
+
+        print(
+            f"[Snippets] 🔄 Incremental update for story {story_id}: "
+            f"{len(new_messages)} new messages, {len(active_snippets)} cards"
+        )
+        replaceable_ids = {s.id for s in active_snippets if not s.is_locked}
+        through_message_id = new_messages[-1]["id"]
+
+        # Hand the connection back while the model runs
+        release_connection(self.db)
+        result = self._call_model_cascade(system_instruction, user_prompt, user_id)
+        if not result["success"]:
+            return result
+
+        # Archive the cards being replaced; locked cards are never touched,
+        # including ones locked while the model was running
+        replaced_ids = {
+            snippet_data.get("replaces") for snippet_data in result["snippets"]
+        } & replaceable_ids
+        if replaced_ids:
+            self.db.query(Snippet).filter(
+                Snippet.id.in_(replaced_ids),
+                Snippet.is_locked == False,  # noqa: E712
+            ).update({"is_active": False}, synchronize_session=False)
+
+        # Committed together with the snippets
+        story.snippets_through_message_id = through_message_id
+        self._save_snippets(
+            story_id=story_id, user_id=user_id, snippets=result["snippets"]
+        )
+
+        deck = self.get_existing_snippets(story_id)["snippets"]
+        result["snippets"] = deck
+        result["count"] = len(deck)
+        return result
+
     def _parse_response(self, response_text: str, model_name: str) -> Dict:
         """Parse and validate the JSON response from Gemini."""
         try:
@@ -557,14 +760,18 @@ Remember: Output ONLY the JSON object with snippets array. Each snippet max 300
                 if len(content) > 300:
                     content = content[:297] + "..."
 
-                validated_snippets.append(
-                    {
-                        "title": title,
-                        "content": content,
-                        "phase": phase,
-                        "theme": theme,
-                    }
-                )
+                validated = {
+                    "title": title,
+                    "content": content,
+                    "phase": phase,
+                    "theme": theme,
+                }
+                # Incremental mode: id of the existing card this one rewrites
+                replaces = snippet.get("replaces")
+                if isinstance(replaces, int) and not isinstance(replaces, bool):
+                    validated["replaces"] = replaces
+
+                validated_snippets.append(validated)
 
             return {
                 "success": True,
@@ -584,3 +791,59 @@ Remember: Output ONLY the JSON object with snippets array. Each snippet max 300
                 "model": model_name,
                 "error": f"Failed to parse AI response as JSON: {str(e)}",
             }
+
+
+def snippet_job_key(story_id: int) -> str:
+    """Deduplication key for snippet jobs: one pending job per story."""
+    return f"snippets:{story_id}"
+
+
+def snippet_job_mode(incremental: bool) -> str:
+    """
+    Job mode of a snippet generation request.
+
+    A pending job is only reused for a request of the same mode; the other
+    mode is rejected, since a full and an incremental run write to the
+    same deck and must not overlap.
+    """
+    return "incremental" if incremental else "full"
+
+
+def publish_snippets_result(story_id: int, result: Dict) -> None:
+    """Tell the story's event subscribers that snippet generation finished."""
+    story_events.publish(
+        story_id,
+        EVENT_SNIPPETS,
+        {
+            "success": result.get("success", False),
+            "count": result.get("count", 0),
+            "cached": result.get("cached", False),
+            "error": result.get("error"),
+        },
+    )
+
+
+def run_snippet_generation(story_id: int, incremental: bool = False) -> Dict:
+    """
+    Generate snippets for a story on a job worker.
+
+    Opens its own session, since the request that queued the job has
+    already returned and closed its session.
+    """
+    db = SessionLocal()
+    try:
+        result = SnippetService(db).generate_snippets(
+            story_id, incremental=incremental
+        )
+    except Exception as e:
+        publish_snippets_result(story_id, {"success": False, "error": str(e)})
+        raise
+    finally:
+        db.close()
+
+    publish_snippets_result(story_id, result)
+    return result
+
+
+# Background snippet generation, shared by all requests
+snippet_jobs = JobQueue(max_workers=SNIPPET_JOB_WORKERS, name="snippet-jobs")
@@ -0,0 +1,170 @@
+"""
+Rolling per-phase summaries of the interview.
+
+When a story leaves a phase, the messages of that phase are condensed into
+a single Summary row in the background. The chat flow then sends these
+summaries plus only the recent raw turns of the current phase, instead of
+replaying the whole conversation on every turn.
+"""
+
+import os
+from typing import Callable, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+from sqlalchemy.orm import Session
+
+from backend.app.core.agent import agent_app
+from backend.app.core.jobs import Job, JobQueue
+from backend.app.core.llm_scheduler import PRIORITY_BACKGROUND, caller_config
+from backend.app.db.session import SessionLocal, release_connection
+from backend.app.models.message import Message
+from backend.app.models.summary import Summary
+
+# Interview chapters worth summarizing (GREETING and SYNTHESIS are not)
+SUMMARIZABLE_PHASES = [
+    "FAMILY_HISTORY",
+    "CHILDHOOD",
+    "ADOLESCENCE",
+    "EARLY_ADULTHOOD",
+    "MIDLIFE",
+    "PRESENT",
+]
+
+SUMMARY_WORKERS = int(os.getenv("PHASE_SUMMARY_WORKERS", "2"))
+
+SUMMARY_INSTRUCTION = """You are condensing one chapter of a life story interview into notes for the interviewer.
+
+Write a factual summary of what the user shared in this chapter (max 120 words):
+- Keep names, places, dates, relationships and turning points
+- Note the feelings the user expressed about them
+- Write in the third person ("They grew up in...")
+- Do not add anything the user did not say
+
+Return only the summary text."""
+
+
+class PhaseSummaryService:
+    """Create and read per-phase summaries for a story."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_phase_messages(self, story_id: int, phase: str) -> List[Message]:
+        """Get the messages of one phase in chronological order."""
+        return (
+            self.db.query(Message)
+            .filter(Message.story_id == story_id, Message.phase_context == phase)
+            .order_by(Message.created_at.asc(), Message.id.asc())
+            .all()
+        )
+
+    def get_summaries(self, story_id: int) -> List[Summary]:
+        """Get the final phase summaries of a story, oldest chapter first."""
+        return (
+            self.db.query(Summary)
+            .filter(Summary.story_id == story_id, Summary.is_final == True)  # noqa: E712
+            .order_by(Summary.created_at.asc(), Summary.id.asc())
+            .all()
+        )
+
+    def summarize_phase(self, story_id: int, phase: str) -> Optional[Summary]:
+        """
+        Condense the messages of a phase into its final Summary.
+
+        Re-running for the same phase replaces the existing summary.
+
+        Returns:
+            The saved summary, or None if the phase has nothing to summarize
+        """
+        if phase not in SUMMARIZABLE_PHASES:
+            return None
+
+        messages = self.get_phase_messages(story_id, phase)
+        if not any(msg.role == "user" for msg in messages):
+            return None
+
+        transcript = "\n".join(
+            f"{'User' if msg.role == 'user' else 'Interviewer'}: {msg.content}"
+            for msg in messages
+        )
+        release_connection(self.db)
+
+        result = agent_app.invoke(
+            {
+                "messages": [
+                    HumanMessage(content=f"Chapter: {phase}\n\n{transcript}")
+                ],
+                "phase_instruction": SUMMARY_INSTRUCTION,
+            },
+            config=caller_config(None, PRIORITY_BACKGROUND),
+        )
+        content = str(result["messages"][-1].content).strip()
+        if not content:
+            return None
+
+        summary = (
+            self.db.query(Summary)
+            .filter(Summary.story_id == story_id, Summary.phase == phase)
+            .first()
+        )
+        if summary:
+            summary.content = content
+            summary.is_final = True
+        else:
+            summary = Summary(
+                story_id=story_id, phase=phase, content=content, is_final=True
+            )
+            self.db.add(summary)
+
+        self.db.commit()
+        self.db.refresh(summary)
+        print(f"[Summaries] ✅ Summarized {phase} for story {story_id}")
+        return summary
+
+
+class PhaseSummarizer:
+    """
+    Runs phase summaries on the background job queue.
+
+    Each job opens its own session, so it never shares a connection with
+    the request that scheduled it. Failures are logged and dropped: the
+    chat simply keeps sending raw messages for a phase without a summary.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_workers: int = SUMMARY_WORKERS,
+    ):
+        self.session_factory = session_factory
+        self.jobs = JobQueue(max_workers=max_workers, name="phase-summary")
+
+    def schedule(self, story_id: int, phase: str) -> Optional[Job]:
+        """Queue a summary of a finished phase. Returns None if not needed."""
+        if phase not in SUMMARIZABLE_PHASES:
+            return None
+        return self.jobs.submit(
+            f"summary:{story_id}:{phase}", self._run, story_id, phase
+        )
+
+    def _run(self, story_id: int, phase: str) -> Optional[Summary]:
+        db = self.session_factory()
+        try:
+            return PhaseSummaryService(db).summarize_phase(story_id, phase)
+        except Exception as e:
+            print(f"[Summaries] ❌ Failed to summarize {phase} for story {story_id}: {e}")
+            db.rollback()
+            return None
+        finally:
+            db.close()
+
+
+def format_summaries(summaries: List[Summary]) -> str:
+    """Render phase summaries as a block for the system prompt."""
+    chapters: Dict[str, str] = {s.phase: s.content for s in summaries}
+    lines = [f"[{phase}] {content}" for phase, content in chapters.items()]
+    return "STORY SO FAR (summaries of earlier chapters):\n" + "\n".join(lines)
+
+
+# Shared by the interview services
+phase_summarizer = PhaseSummarizer()
@@ -8,13 +8,24 @@ These follow the Repository Pattern from Domain-Driven Design.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from dataclasses import dataclass, field
+from typing import Generic, List, Optional, TypeVar
 
 from backend.domain.entities.message import Message
 from backend.domain.entities.snippet import Snippet
 from backend.domain.entities.story import Story
 from backend.domain.entities.user import User
 
+T = TypeVar("T")
+
+
+@dataclass
+class Page(Generic[T]):
+    """One page of a keyset-paginated listing."""
+    items: List[T] = field(default_factory=list)
+    # Opaque cursor of the next page; None on the last page
+    next_cursor: Optional[str] = None
+
 
 class UserRepository(ABC):
     """Abstract interface for user data access."""
@@ -54,10 +65,10 @@ class StoryRepository(ABC):
         pass
     
     @abstractmethod
-    def get_by_user_id(self, user_id: int, 
-                       skip: int = 0, 
-                       limit: int = 100) -> List[Story]:
-        """Get all stories for a user."""
+    def get_by_user_id(self, user_id: int,
+                       cursor: Optional[str] = None,
+                       limit: int = 100) -> Page[Story]:
+        """Get a page of stories for a user, oldest first."""
         pass
     
     @abstractmethod
@@ -85,10 +96,15 @@ class MessageRepository(ABC):
         pass
     
     @abstractmethod
-    def get_by_story_id(self, story_id: int, 
-                        skip: int = 0, 
-                        limit: int = 100) -> List[Message]:
-        """Get all messages for a story."""
+    def get_by_story_id(self, story_id: int,
+                        cursor: Optional[str] = None,
+                        limit: int = 100) -> Page[Message]:
+        """Get a page of messages for a story, in chronological order."""
+        pass
+    
+    @abstractmethod
+    def get_recent_by_story_id(self, story_id: int, limit: int) -> List[Message]:
+        """Get the latest messages for a story, in chronological order."""
         pass
     
     @abstractmethod
@@ -116,15 +132,19 @@ class SnippetRepository(ABC):
         pass
     
     @abstractmethod
-    def get_by_story_id(self, story_id: int, 
-                        include_archived: bool = False) -> List[Snippet]:
-        """Get all snippets for a story."""
+    def get_by_story_id(self, story_id: int,
+                        include_archived: bool = False,
+                        cursor: Optional[str] = None,
+                        limit: int = 100) -> Page[Snippet]:
+        """Get a page of snippets for a story, oldest first."""
         pass
     
     @abstractmethod
     def get_by_user_id(self, user_id: int,
-                       include_archived: bool = False) -> List[Snippet]:
-        """Get all snippets for a user."""
+                       include_archived: bool = False,
+                       cursor: Optional[str] = None,
+                       limit: int = 100) -> Page[Snippet]:
+        """Get a page of snippets for a user, oldest first."""
         pass
     
     @abstractmethod
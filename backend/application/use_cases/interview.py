@@ -19,6 +19,7 @@ from backend.domain.exceptions import (
     EntityNotFoundError,
     PhaseTransitionError,
 )
+from backend.domain.services.context_window import ContextWindowService
 from backend.domain.services.phase_service import PhaseService
 
 
@@ -53,9 +54,12 @@ class ProcessChatUseCase:
     - Returns the AI response
     """
     
-    # Maximum messages to include in context
+    # Maximum messages to include in context (newest first)
     MAX_HISTORY_MESSAGES = 20
     
+    # Estimated token budget for the history window
+    HISTORY_TOKEN_BUDGET = 6000
+    
     def __init__(self,
                  story_repo: StoryRepository,
                  message_repo: MessageRepository,
@@ -101,10 +105,13 @@ class ProcessChatUseCase:
         )
         self.message_repo.save(user_message)
         
-        # Load conversation history
-        history = self.message_repo.get_by_story_id(
-            story.id, 
-            limit=self.MAX_HISTORY_MESSAGES
+        # Load conversation history (latest turns within the token budget)
+        recent = self.message_repo.get_recent_by_story_id(
+            story.id,
+            limit=self.MAX_HISTORY_MESSAGES,
+        )
+        history = ContextWindowService.fit_to_budget(
+            recent, self.HISTORY_TOKEN_BUDGET, lambda m: m.content
         )
         
         # Convert to ChatMessage format
@@ -164,7 +164,7 @@ class GetStoryUseCase:
 class ListStoriesInput:
     """Input DTO for listing stories."""
     user_id: int
-    skip: int = 0
+    cursor: Optional[str] = None
     limit: int = 100
 
 
@@ -178,29 +178,36 @@ class StoryListItemOutput:
     progress_percentage: float
 
 
+@dataclass
+class ListStoriesOutput:
+    """Output DTO for one page of stories."""
+    stories: List[StoryListItemOutput]
+    next_cursor: Optional[str] = None
+
+
 class ListStoriesUseCase:
     """Use case for listing user's stories."""
     
     def __init__(self, story_repo: StoryRepository):
         self.story_repo = story_repo
     
-    def execute(self, input_dto: ListStoriesInput) -> List[StoryListItemOutput]:
+    def execute(self, input_dto: ListStoriesInput) -> ListStoriesOutput:
         """
-        List user's stories.
+        List one page of the user's stories.
         
         Args:
             input_dto: List parameters
             
         Returns:
-            List of story summaries
+            Story summaries and the cursor of the next page
         """
-        stories = self.story_repo.get_by_user_id(
+        page = self.story_repo.get_by_user_id(
             input_dto.user_id,
-            skip=input_dto.skip,
+            cursor=input_dto.cursor,
             limit=input_dto.limit,
         )
         
-        return [
+        stories = [
             StoryListItemOutput(
                 id=s.id,
                 title=s.title,
@@ -208,8 +215,9 @@ class ListStoriesUseCase:
                 status=s.status.value if isinstance(s.status, StoryStatus) else s.status,
                 progress_percentage=s.progress_percentage,
             )
-            for s in stories
+            for s in page.items
         ]
+        return ListStoriesOutput(stories=stories, next_cursor=page.next_cursor)
 
 
 class DeleteStoryUseCase:
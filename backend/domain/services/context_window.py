@@ -0,0 +1,70 @@
+"""
+Context Window Service - Domain service for bounding conversation history.
+
+Decides which past messages are sent to the model on each turn.
+This is a pure domain service with no infrastructure dependencies.
+"""
+
+from typing import Callable, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+
+class ContextWindowService:
+    """
+    Business rules for the conversation context sent to the AI.
+
+    The window is the most recent messages that fit a token budget, in
+    chronological order. Token counts are estimated from character length,
+    which is close enough for Gemini models on English prose and needs no
+    tokenizer.
+    """
+
+    # Rough average for English text
+    CHARS_PER_TOKEN = 4
+
+    @staticmethod
+    def estimate_tokens(text: str) -> int:
+        """
+        Estimate the token count of a piece of text.
+
+        Args:
+            text: Message content
+
+        Returns:
+            Estimated token count (at least 1 for non-empty text)
+        """
+        if not text:
+            return 0
+        return -(-len(text) // ContextWindowService.CHARS_PER_TOKEN)
+
+    @staticmethod
+    def fit_to_budget(
+        messages: Sequence[T],
+        token_budget: int,
+        get_content: Callable[[T], str],
+    ) -> List[T]:
+        """
+        Trim a chronological message list to the newest messages within budget.
+
+        The newest message is always kept, even if it alone exceeds the
+        budget, so the model always sees the turn it is answering.
+
+        Args:
+            messages: Messages in chronological order (oldest first)
+            token_budget: Maximum estimated tokens for the window
+            get_content: Returns the text of a message
+
+        Returns:
+            Suffix of messages, still in chronological order
+        """
+        kept = 0
+        used = 0
+        for message in reversed(messages):
+            tokens = ContextWindowService.estimate_tokens(get_content(message))
+            if kept and used + tokens > token_budget:
+                break
+            used += tokens
+            kept += 1
+
+        return list(messages[len(messages) - kept :])
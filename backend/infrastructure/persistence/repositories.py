@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 
 from backend.application.interfaces.repositories import (
     MessageRepository,
+    Page,
     SnippetRepository,
     StoryRepository,
     UserRepository,
@@ -19,6 +20,8 @@ from backend.domain.entities.snippet import Snippet as SnippetEntity
 from backend.domain.entities.story import Story as StoryEntity
 from backend.domain.entities.user import User as UserEntity
 
+from backend.app.core.pagination import fetch_page
+
 # ORM Models
 from backend.app.models.message import Message as MessageModel
 from backend.app.models.snippets import Snippet as SnippetModel
@@ -98,15 +101,11 @@ class SQLAlchemyStoryRepository(StoryRepository):
             return story_model_to_entity(model)
         return None
     
-    def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100) -> List[StoryEntity]:
-        models = (
-            self.session.query(StoryModel)
-            .filter(StoryModel.user_id == user_id)
-            .offset(skip)
-            .limit(limit)
-            .all()
-        )
-        return [story_model_to_entity(m) for m in models]
+    def get_by_user_id(self, user_id: int, cursor: Optional[str] = None,
+                       limit: int = 100) -> Page[StoryEntity]:
+        query = self.session.query(StoryModel).filter(StoryModel.user_id == user_id)
+        models, next_cursor = fetch_page(query, (StoryModel.id,), cursor, limit)
+        return Page([story_model_to_entity(m) for m in models], next_cursor)
     
     def save(self, story: StoryEntity) -> StoryEntity:
         if story.id:
@@ -148,15 +147,24 @@ class SQLAlchemyMessageRepository(MessageRepository):
             return message_model_to_entity(model)
         return None
     
-    def get_by_story_id(self, story_id: int, skip: int = 0, limit: int = 100) -> List[MessageEntity]:
+    def get_by_story_id(self, story_id: int, cursor: Optional[str] = None,
+                        limit: int = 100) -> Page[MessageEntity]:
+        query = self.session.query(MessageModel).filter(MessageModel.story_id == story_id)
+        models, next_cursor = fetch_page(
+            query, (MessageModel.created_at, MessageModel.id), cursor, limit
+        )
+        return Page([message_model_to_entity(m) for m in models], next_cursor)
+    
+    def get_recent_by_story_id(self, story_id: int, limit: int) -> List[MessageEntity]:
+        # Newest first so LIMIT keeps the latest messages, then restore order
         models = (
             self.session.query(MessageModel)
             .filter(MessageModel.story_id == story_id)
-            .order_by(MessageModel.created_at)
-            .offset(skip)
+            .order_by(MessageModel.created_at.desc(), MessageModel.id.desc())
             .limit(limit)
             .all()
         )
+        models.reverse()
         return [message_model_to_entity(m) for m in models]
     
     def save(self, message: MessageEntity) -> MessageEntity:
@@ -187,19 +195,26 @@ class SQLAlchemySnippetRepository(SnippetRepository):
             return snippet_model_to_entity(model)
         return None
     
-    def get_by_story_id(self, story_id: int, include_archived: bool = False) -> List[SnippetEntity]:
+    def get_by_story_id(self, story_id: int, include_archived: bool = False,
+                        cursor: Optional[str] = None,
+                        limit: int = 100) -> Page[SnippetEntity]:
         query = self.session.query(SnippetModel).filter(SnippetModel.story_id == story_id)
-        if not include_archived:
-            query = query.filter(SnippetModel.is_active == True)
-        models = query.all()
-        return [snippet_model_to_entity(m) for m in models]
+        return self._page(query, include_archived, cursor, limit)
     
-    def get_by_user_id(self, user_id: int, include_archived: bool = False) -> List[SnippetEntity]:
+    def get_by_user_id(self, user_id: int, include_archived: bool = False,
+                       cursor: Optional[str] = None,
+                       limit: int = 100) -> Page[SnippetEntity]:
         query = self.session.query(SnippetModel).filter(SnippetModel.user_id == user_id)
+        return self._page(query, include_archived, cursor, limit)
+    
+    def _page(self, query, include_archived: bool, cursor: Optional[str],
+              limit: int) -> Page[SnippetEntity]:
         if not include_archived:
             query = query.filter(SnippetModel.is_active == True)
-        models = query.all()
-        return [snippet_model_to_entity(m) for m in models]
+        models, next_cursor = fetch_page(
+            query, (SnippetModel.created_at, SnippetModel.id), cursor, limit
+        )
+        return Page([snippet_model_to_entity(m) for m in models], next_cursor)
     
     def save(self, snippet: SnippetEntity) -> SnippetEntity:
         if snippet.id:
@@ -3,7 +3,7 @@ import { PhaseTimeline } from "./PhaseTimeline";
 import { ChatMessage } from "./ChatMessage";
 import { AgeSelectionCards } from "./AgeSelectionCards";
 import { InputBar } from "./InputBar";
-import { useProjectMessages, SendMessageResponse, PHASE_DISPLAY_INFO } from "@/hooks/useChat";
+import { useProjectMessages, useStoryEvents, SendMessageResponse, PHASE_DISPLAY_INFO } from "@/hooks/useChat";
 import { useQueryClient } from "@tanstack/react-query";
 
 interface Message {
@@ -31,7 +31,6 @@ interface ChatAreaProps {
 
 export function ChatArea({ sendMessage, projectId, initialPhase, initialAgeRange }: ChatAreaProps) {
   const queryClient = useQueryClient();
-  const { data: apiMessages = [], isLoading } = useProjectMessages(projectId);
   const [selectedAge, setSelectedAge] = useState<string | null>(initialAgeRange || null);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
@@ -43,6 +42,17 @@ export function ChatArea({ sendMessage, projectId, initialPhase, initialAgeRange
     ageRange: initialAgeRange || null,
   });
 
+  // Live updates over the events socket; polling slows down while connected
+  const { connected } = useStoryEvents(projectId, (phase) => {
+    setPhaseState((prev) => ({
+      phase: phase.phase ?? prev.phase,
+      phaseOrder: phase.phase_order ?? prev.phaseOrder,
+      phaseIndex: phase.phase_index ?? prev.phaseIndex,
+      ageRange: phase.age_range ?? prev.ageRange,
+    }));
+  });
+  const { data: apiMessages = [], isLoading } = useProjectMessages(projectId, connected);
+
   // Update state when project data loads (for returning to existing projects)
   useEffect(() => {
     if (initialPhase || initialAgeRange) {
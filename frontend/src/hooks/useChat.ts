@@ -1,5 +1,9 @@
-import { useMutation, useQuery } from '@tanstack/react-query';
+import { useEffect, useState } from 'react';
+import { useMutation, useQuery, useQueryClient } from '@tanstack/react-query';
 import { api } from '@/lib/api';
+import { useAuthStore } from '@/stores/authStore';
+
+const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:8000';
 
 export interface Message {
     role: 'user' | 'assistant';
@@ -40,23 +44,116 @@ export const PHASE_DISPLAY_INFO: Record<string, { label: string; ageRange?: stri
 };
 
 // Fetch messages for a project
-export const useProjectMessages = (projectId: number | undefined) => {
+// After the first load only messages newer than the last one are fetched
+// and appended; the browser revalidates the poll with the response ETag.
+// With live=true (events socket connected) polling is only a slow fallback.
+export const useProjectMessages = (projectId: number | undefined, live = false) => {
+    const queryClient = useQueryClient();
+    const queryKey = ['projects', projectId, 'messages'];
+
     return useQuery({
-        queryKey: ['projects', projectId, 'messages'],
+        queryKey,
         queryFn: async () => {
             if (!projectId) {
                 return [];
             }
+            const cached = queryClient.getQueryData<Message[]>(queryKey) ?? [];
+            const lastId = cached.length > 0 ? cached[cached.length - 1].id : undefined;
+
             // API endpoint remains /api/stories/{id}/messages (backend unchanged)
-            const response = await api.get<Message[]>(`/api/stories/${projectId}/messages`);
-            return response.data;
+            // The transcript is paginated; follow X-Next-Cursor until the last page
+            const items: Message[] = [];
+            let cursor: string | undefined;
+            do {
+                const response = await api.get<Message[]>(`/api/stories/${projectId}/messages`, {
+                    params: {
+                        ...(lastId !== undefined ? { after_id: lastId } : {}),
+                        ...(cursor ? { cursor } : {}),
+                    },
+                });
+                items.push(...response.data);
+                cursor = response.headers['x-next-cursor'] || undefined;
+            } while (cursor);
+            if (lastId === undefined) {
+                return items;
+            }
+            return items.length > 0 ? [...cached, ...items] : cached;
         },
         enabled: !!projectId,
         staleTime: 30 * 1000, // 30 seconds
-        refetchInterval: 5000, // Refetch every 5 seconds to get new messages
+        // Refetch every 5 seconds to get new messages, unless they are pushed
+        refetchInterval: live ? 60 * 1000 : 5000,
     });
 };
 
+interface StoryEvent {
+    event: 'message' | 'phase' | 'snippets' | 'resync' | 'ping';
+    story_id: number;
+    data: Record<string, unknown>;
+}
+
+// Subscribe to a project's event socket and apply pushed updates to the
+// query cache. Returns whether the socket is connected.
+export const useStoryEvents = (
+    projectId: number | undefined,
+    onPhase?: (phase: Partial<SendMessageResponse>) => void,
+) => {
+    const queryClient = useQueryClient();
+    const token = useAuthStore((state) => state.token);
+    const [connected, setConnected] = useState(false);
+
+    useEffect(() => {
+        if (!projectId || !token) {
+            return;
+        }
+        const messagesKey = ['projects', projectId, 'messages'];
+        const wsBase = API_BASE_URL.replace(/^http/, 'ws');
+        let socket: WebSocket | null = null;
+        let retry: ReturnType<typeof setTimeout> | undefined;
+        let closed = false;
+
+        const connect = () => {
+            socket = new WebSocket(
+                `${wsBase}/api/stories/${projectId}/events?token=${encodeURIComponent(token)}`
+            );
+            socket.onopen = () => setConnected(true);
+            socket.onmessage = (frame) => {
+                const event: StoryEvent = JSON.parse(frame.data);
+                if (event.event === 'message') {
+                    const message = event.data as unknown as Message;
+                    queryClient.setQueryData<Message[]>(messagesKey, (current = []) =>
+                        current.some((m) => m.id === message.id) ? current : [...current, message]
+                    );
+                } else if (event.event === 'phase') {
+                    onPhase?.(event.data as Partial<SendMessageResponse>);
+                } else if (event.event === 'snippets') {
+                    queryClient.invalidateQueries({ queryKey: ['snippets', projectId] });
+                } else if (event.event === 'resync') {
+                    queryClient.invalidateQueries({ queryKey: messagesKey });
+                }
+            };
+            socket.onclose = (close) => {
+                setConnected(false);
+                // 4401/4403/4404: not allowed, polling takes over
+                if (!closed && close.code < 4400) {
+                    retry = setTimeout(connect, 5000);
+                }
+            };
+        };
+        connect();
+
+        return () => {
+            closed = true;
+            clearTimeout(retry);
+            socket?.close();
+        };
+        // onPhase is read when an event arrives; do not reconnect when it changes
+        // eslint-disable-next-line react-hooks/exhaustive-deps
+    }, [projectId, token, queryClient]);
+
+    return { connected };
+};
+
 // Send message to project interview endpoint
 export const useSendMessage = (projectId: number | undefined) => {
     return useMutation({
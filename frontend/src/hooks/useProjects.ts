@@ -57,8 +57,17 @@ export const useProjects = () => {
         queryKey: ['projects'],
         queryFn: async () => {
             // API endpoint remains /api/stories/ (backend unchanged)
-            const response = await api.get<Project[]>('/api/stories/');
-            return response.data;
+            // The list is paginated; follow X-Next-Cursor until the last page
+            const items: Project[] = [];
+            let cursor: string | undefined;
+            do {
+                const response = await api.get<Project[]>('/api/stories/', {
+                    params: cursor ? { cursor } : undefined,
+                });
+                items.push(...response.data);
+                cursor = response.headers['x-next-cursor'] || undefined;
+            } while (cursor);
+            return items;
         },
         staleTime: 2 * 60 * 1000, // 2 minutes
     });
@@ -41,8 +41,17 @@ export const useStories = () => {
     return useQuery({
         queryKey: ['stories'],
         queryFn: async () => {
-            const response = await api.get<Story[]>('/api/stories/');
-            return response.data;
+            // The list is paginated; follow X-Next-Cursor until the last page
+            const items: Story[] = [];
+            let cursor: string | undefined;
+            do {
+                const response = await api.get<Story[]>('/api/stories/', {
+                    params: cursor ? { cursor } : undefined,
+                });
+                items.push(...response.data);
+                cursor = response.headers['x-next-cursor'] || undefined;
+            } while (cursor);
+            return items;
         },
         staleTime: 2 * 60 * 1000, // 2 minutes
     });
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark of the message listing serialization paths.
+
+Compares, for transcripts of several sizes:
+- default: ORM objects validated against List[MessageResponse], run through
+  jsonable_encoder and json.dumps (FastAPI's response_model path)
+- projected: column rows turned into dicts, encoded by the stdlib
+  JSONResponse (FAST_JSON_RESPONSES off)
+- fast: column rows turned into dicts, encoded by ORJSONResponse
+  (FAST_JSON_RESPONSES on)
+
+Only serialization is timed; the rows are loaded once from an in-memory
+SQLite database beforehand.
+
+Usage:
+    python scripts/bench_json_responses.py [--sizes 500 2000] [--repeat 20]
+"""
+
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import List
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from backend.app.api.endpoints.stories import MessageResponse
+from backend.app.core.responses import ORJSONResponse, orjson
+from backend.app.db.base import Base
+from backend.app.db.read_models import MESSAGE_COLUMNS, rows_to_dicts
+from backend.app.models.message import Message
+from backend.app.models.story import Story
+from backend.app.models.user import User
+
+MESSAGE_LIST = TypeAdapter(List[MessageResponse])
+
+
+def load_transcript(size: int):
+    """Create a story with `size` messages; return its ORM objects and rows."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    story = Story(user_id=user.id, title="Bench")
+    db.add(story)
+    db.flush()
+
+    start = datetime(2024, 1, 1, 12, 0, 0)
+    db.add_all(
+        Message(
+            story_id=story.id,
+            role="user" if i % 2 == 0 else "assistant",
+            content="I grew up in a small village by the sea. " * 8,
+            phase_context="CHILDHOOD",
+            created_at=start + timedelta(seconds=i),
+        )
+        for i in range(size)
+    )
+    db.commit()
+
+    objects = db.query(Message).order_by(Message.id).all()
+    rows = db.query(*MESSAGE_COLUMNS).order_by(Message.id).all()
+    return objects, rows
+
+
+def default_path(objects) -> bytes:
+    validated = MESSAGE_LIST.validate_python(objects, from_attributes=True)
+    return json.dumps(jsonable_encoder(validated)).encode()
+
+
+def projected_path(rows) -> bytes:
+    return JSONResponse(rows_to_dicts(rows)).body
+
+
+def fast_path(rows) -> bytes:
+    return ORJSONResponse(rows_to_dicts(rows)).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    paths = [("default", default_path), ("projected", projected_path)]
+    if orjson is not None:
+        paths.append(("fast", fast_path))
+    else:
+        print("orjson is not installed; skipping the fast path")
+
+    print(f"{'messages':>8}  {'path':<10} {'ms/call':>8}  {'speedup':>7}")
+    for size in args.sizes:
+        objects, rows = load_transcript(size)
+        baseline = None
+        for name, path in paths:
+            data = objects if name == "default" else rows
+            timings = timeit.repeat(lambda: path(data), number=1, repeat=args.repeat)
+            seconds = min(timings)
+            baseline = baseline or seconds
+            print(
+                f"{size:>8}  {name:<10} {seconds * 1000:>8.2f}  "
+                f"{baseline / seconds:>6.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -48,6 +48,22 @@ def sample_system_instruction():
 Your role is to guide users through telling their life story with empathy and curiosity."""
 
 
+class FakeClock:
+    """Manually advanced monotonic clock; bump .now to move time forward."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """Fake clock to pass as the clock= argument of TTL-based classes."""
+    return FakeClock()
+
+
 @pytest.fixture(autouse=True)
 def set_test_env():
     """Set test environment variables."""
@@ -60,6 +76,44 @@ def set_test_env():
         del os.environ["GEMINI_MODELS"]
 
 
+@pytest.fixture(autouse=True)
+def reset_llm_state():
+    """
+    Reset process-wide LLM state between tests.
+
+    Drops cached clients so patched client classes take effect, clears
+    the circuit breaker so one test's simulated 429s do not skip models in
+    the next, and forgets cached prompt prefixes, replies and scheduler lanes.
+    """
+    from backend.app.core.llm_clients import llm_clients
+    from backend.app.core.llm_scheduler import llm_scheduler
+    from backend.app.core.model_health import model_health
+    from backend.app.core.prompt_cache import prompt_cache
+    from backend.app.core.response_cache import phase_entry_cache
+
+    llm_clients.clear()
+    model_health.reset()
+    prompt_cache.clear()
+    phase_entry_cache.clear()
+    llm_scheduler.reset()
+    yield
+    llm_clients.clear()
+    model_health.reset()
+    prompt_cache.clear()
+    phase_entry_cache.clear()
+    llm_scheduler.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_principal_cache():
+    """Clear cached principals, since every test database reuses user ids."""
+    from backend.app.core.principal_cache import principal_cache
+
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
 @pytest.fixture
 def mock_db_session():
     """Mock database session for testing."""
@@ -95,6 +149,83 @@ def mock_db_session():
     session.close()
 
 
+@pytest.fixture
+def file_db_url(tmp_path):
+    """SQLite database file shared by a sync and an async engine."""
+    from sqlalchemy import create_engine
+
+    from backend.app.db.base import Base
+
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    return url
+
+
+@pytest.fixture
+def file_db_session(file_db_url):
+    """Sync session on the file database, used to arrange test data."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(file_db_url)
+    session = sessionmaker(bind=engine)()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+@pytest.fixture
+def async_session_factory(file_db_url):
+    """
+    Async session factory on the file database.
+
+    NullPool opens a fresh aiosqlite connection per session, so sessions
+    work from whichever event loop uses them (pytest-asyncio or TestClient).
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from backend.app.db.session import get_async_database_url
+
+    engine = create_async_engine(
+        get_async_database_url(file_db_url), poolclass=NullPool
+    )
+    return async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+
+@pytest.fixture
+def file_db_story(file_db_session):
+    """Create a test user and story in the file database."""
+    from backend.app.models.story import Story
+    from backend.app.models.user import User
+
+    user = User(
+        email="async@example.com",
+        hashed_password="fake_hash",
+        display_name="Async User",
+        is_active=True,
+    )
+    file_db_session.add(user)
+    file_db_session.commit()
+
+    story = Story(
+        user_id=user.id,
+        title="Async Story",
+        current_phase="GREETING",
+        status="draft",
+    )
+    file_db_session.add(story)
+    file_db_session.commit()
+    file_db_session.refresh(story)
+
+    return story
+
+
 @pytest.fixture
 def sample_user(mock_db_session):
     """Create a test user."""
@@ -131,6 +262,41 @@ def sample_story(mock_db_session, sample_user):
     return story
 
 
+@pytest.fixture
+def authed(mock_db_session, sample_user):
+    """Serve sync endpoints from mock_db_session, authenticated as sample_user."""
+    from backend.app.core.auth import get_current_active_user
+    from backend.app.db.session import get_db
+    from backend.app.main import app
+
+    def override_get_db():
+        yield mock_db_session
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_active_user] = lambda: sample_user
+    yield
+    app.dependency_overrides = {}
+
+
+@pytest.fixture
+def add_messages():
+    """Helper that saves count user messages to a story and returns them."""
+    from backend.app.models.message import Message
+
+    def add(db, story_id, count, created_at=None):
+        rows = [
+            Message(
+                story_id=story_id, role="user", content=f"m{i}", created_at=created_at
+            )
+            for i in range(count)
+        ]
+        db.add_all(rows)
+        db.commit()
+        return rows
+
+    return add
+
+
 @pytest.fixture
 def mock_langchain_response():
     """Mock LangChain AIMessage response."""
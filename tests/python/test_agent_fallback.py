@@ -216,3 +216,64 @@ class TestChatbotNode:
                 assert len(call_args) == 2  # System + 1 user message
                 assert isinstance(call_args[0], SystemMessage)
                 assert call_args[0].content == "You are a warm interviewer."
+
+
+class TestAsyncChatbotNode:
+    """Test achatbot_node, the async node used by agent_app.ainvoke."""
+
+    @pytest.mark.asyncio
+    async def test_fallback_on_rate_limit(self, mock_langchain_response):
+        """Should await the model and fall back on rate limits."""
+        from unittest.mock import AsyncMock
+
+        from backend.app.core.agent import achatbot_node
+
+        state = {
+            "messages": [HumanMessage(content="Hello")],
+            "phase_instruction": "Test instruction",
+        }
+
+        with patch("backend.app.core.agent.get_model_cascade") as mock_cascade:
+            mock_cascade.return_value = ["model-1", "model-2"]
+
+            with patch(
+                "backend.app.core.agent.ChatGoogleGenerativeAI"
+            ) as mock_llm_class:
+                mock_llm_1 = Mock()
+                mock_llm_1.ainvoke = AsyncMock(side_effect=Exception("429 quota"))
+                mock_llm_2 = Mock()
+                mock_llm_2.ainvoke = AsyncMock(return_value=mock_langchain_response)
+                mock_llm_class.side_effect = [mock_llm_1, mock_llm_2]
+
+                result = await achatbot_node(state)
+
+                assert mock_llm_class.call_count == 2
+                mock_llm_1.invoke.assert_not_called()
+                assert result["messages"][0] is mock_langchain_response
+
+    @pytest.mark.asyncio
+    async def test_abort_on_non_rate_limit_error(self):
+        """Should abort immediately on non-rate-limit errors."""
+        from unittest.mock import AsyncMock
+
+        from backend.app.core.agent import achatbot_node
+
+        state = {
+            "messages": [HumanMessage(content="Hello")],
+            "phase_instruction": "Test instruction",
+        }
+
+        with patch("backend.app.core.agent.get_model_cascade") as mock_cascade:
+            mock_cascade.return_value = ["model-1", "model-2"]
+
+            with patch(
+                "backend.app.core.agent.ChatGoogleGenerativeAI"
+            ) as mock_llm_class:
+                mock_llm = Mock()
+                mock_llm.ainvoke = AsyncMock(side_effect=ValueError("Bad input"))
+                mock_llm_class.return_value = mock_llm
+
+                with pytest.raises(ValueError, match="Bad input"):
+                    await achatbot_node(state)
+
+                assert mock_llm_class.call_count == 1
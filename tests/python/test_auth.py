@@ -282,3 +282,121 @@ class TestAuthEndpoints:
 
         assert response.status_code == 200
         assert "Successfully logged out" in response.json()["message"]
+
+
+class TestPrincipalCache:
+    """Test the TTL/LRU principal cache."""
+
+    def test_entry_expires_after_ttl(self, clock):
+        from backend.app.core.principal_cache import Principal, PrincipalCache
+
+        cache = PrincipalCache(ttl_seconds=30, clock=clock)
+        cache.set("1", Principal(id=1, is_active=True))
+
+        clock.now += 29
+        assert cache.get("1") == Principal(id=1, is_active=True)
+
+        clock.now += 2
+        assert cache.get("1") is None
+
+    def test_evicts_least_recently_used(self):
+        from backend.app.core.principal_cache import Principal, PrincipalCache
+
+        cache = PrincipalCache(max_size=2)
+        cache.set("1", Principal(id=1, is_active=True))
+        cache.set("2", Principal(id=2, is_active=True))
+        cache.get("1")  # 2 is now least recently used
+        cache.set("3", Principal(id=3, is_active=True))
+
+        assert cache.get("2") is None
+        assert cache.get("1") is not None
+        assert len(cache) == 2
+
+    def test_zero_ttl_disables_cache(self):
+        from backend.app.core.principal_cache import Principal, PrincipalCache
+
+        cache = PrincipalCache(ttl_seconds=0)
+        cache.set("1", Principal(id=1, is_active=True))
+
+        assert cache.get("1") is None
+
+
+class TestGetCurrentPrincipal:
+    """Test the cached auth dependency."""
+
+    def _credentials(self, user_id):
+        from fastapi.security import HTTPAuthorizationCredentials
+
+        token = create_access_token({"sub": str(user_id)})
+        return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+    def _count_user_queries(self, session):
+        from sqlalchemy import event
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            if "FROM users" in statement:
+                statements.append(statement)
+
+        event.listen(session.get_bind(), "before_cursor_execute", before_execute)
+        return statements
+
+    def test_second_request_served_from_cache(self, mock_db_session, sample_user):
+        """Only the first lookup for a token subject should hit the database."""
+        from backend.app.core.auth import get_current_principal
+
+        queries = self._count_user_queries(mock_db_session)
+        credentials = self._credentials(sample_user.id)
+
+        first = get_current_principal(credentials, mock_db_session)
+        second = get_current_principal(credentials, mock_db_session)
+
+        assert first.id == second.id == sample_user.id
+        assert first.is_active is True
+        assert len(queries) == 1
+
+    def test_deactivation_invalidates_cache(self, mock_db_session, sample_user):
+        """Deactivating a user should take effect on the next request."""
+        from fastapi import HTTPException
+
+        from backend.app.core.auth import get_current_principal
+
+        credentials = self._credentials(sample_user.id)
+        get_current_principal(credentials, mock_db_session)
+
+        sample_user.is_active = False
+        mock_db_session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_principal(credentials, mock_db_session)
+        assert exc_info.value.status_code == 403
+
+    def test_deleted_user_rejected(self, mock_db_session, sample_user):
+        """Deleting a user should drop the cached principal."""
+        from fastapi import HTTPException
+
+        from backend.app.core.auth import get_current_principal
+
+        credentials = self._credentials(sample_user.id)
+        get_current_principal(credentials, mock_db_session)
+
+        mock_db_session.delete(sample_user)
+        mock_db_session.commit()
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_principal(credentials, mock_db_session)
+        assert exc_info.value.status_code == 401
+
+    def test_unknown_user_rejected(self, mock_db_session):
+        """A token for a missing user should be rejected and not cached."""
+        from fastapi import HTTPException
+
+        from backend.app.core.auth import get_current_principal
+        from backend.app.core.principal_cache import principal_cache
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_principal(self._credentials(999), mock_db_session)
+
+        assert exc_info.value.status_code == 401
+        assert principal_cache.get("999") is None
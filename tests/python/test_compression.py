@@ -0,0 +1,205 @@
+"""
+Unit tests for backend/app/core/compression.py
+
+Tests which responses CompressionMiddleware compresses, and that SSE
+streams and WebSockets pass through untouched.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, WebSocket
+from fastapi.responses import HTMLResponse, JSONResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.compression import CompressionMiddleware, parse_accept_encoding
+
+LARGE = [{"role": "user", "content": "I grew up by the sea. " * 10}] * 20
+
+
+def make_client(**options) -> TestClient:
+    app = FastAPI()
+    options.setdefault("encodings", "gzip")
+    app.add_middleware(CompressionMiddleware, **options)
+
+    @app.get("/large")
+    def large():
+        return JSONResponse(LARGE)
+
+    @app.get("/small")
+    def small():
+        return JSONResponse({"ok": True})
+
+    @app.get("/html")
+    def html():
+        return HTMLResponse("<p>hello</p>" * 500)
+
+    @app.get("/not-modified")
+    def not_modified():
+        return Response(status_code=304, headers={"ETag": 'W/"x"'})
+
+    @app.get("/stream")
+    def stream():
+        def events():
+            for i in range(3):
+                yield f"event: token\ndata: {json.dumps('x' * 2000)}\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.websocket("/ws")
+    async def ws(websocket: WebSocket):
+        await websocket.accept()
+        await websocket.send_json(LARGE)
+        await websocket.close()
+
+    return TestClient(app)
+
+
+def get(client, path, accept_encoding="gzip, deflate"):
+    return client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+class TestCompressionMiddleware:
+    """Test CompressionMiddleware."""
+
+    def test_parse_accept_encoding(self):
+        assert parse_accept_encoding("gzip;q=0.5, br, identity;q=0") == {
+            "gzip": 0.5,
+            "br": 1.0,
+            "identity": 0.0,
+        }
+
+    def test_compresses_large_json(self):
+        """Large JSON bodies should be gzipped and decode to the same data."""
+        client = make_client()
+
+        response = get(client, "/large", "gzip")
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert response.json() == LARGE
+        raw_length = len(json.dumps(LARGE, separators=(",", ":")))
+        assert int(response.headers["content-length"]) < raw_length / 4
+
+    def test_skips_small_bodies(self):
+        response = get(make_client(), "/small")
+
+        assert "content-encoding" not in response.headers
+
+    def test_skips_other_content_types(self):
+        response = get(make_client(), "/html")
+
+        assert "content-encoding" not in response.headers
+        assert "vary" not in response.headers
+
+    def test_content_type_filter_is_configurable(self):
+        response = get(make_client(content_types="application/json,text/*"), "/html")
+
+        assert response.headers["content-encoding"] == "gzip"
+
+    def test_respects_client_encodings(self):
+        """Should send identity when the client does not accept gzip."""
+        client = make_client()
+
+        assert "content-encoding" not in get(client, "/large", "identity").headers
+        assert "content-encoding" not in get(client, "/large", "gzip;q=0").headers
+
+    def test_sse_stream_passes_through(self):
+        """Chat streams must never be buffered or compressed."""
+        response = get(make_client(), "/stream")
+
+        assert "content-encoding" not in response.headers
+        assert response.text.count("event: token") == 3
+
+    @pytest.mark.asyncio
+    async def test_sse_start_sent_before_first_chunk(self):
+        """SSE headers must reach the client before the first token exists."""
+        sent = []
+        sent_before_body = []
+
+        async def app(scope, receive, send):
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 200,
+                    "headers": [(b"content-type", b"text/event-stream")],
+                }
+            )
+            sent_before_body.extend(sent)
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b"data: x\n\n",
+                    "more_body": True,
+                }
+            )
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http",
+            "headers": [(b"accept-encoding", b"gzip")],
+        }
+        await CompressionMiddleware(app, encodings="gzip")(scope, None, send)
+
+        assert [m["type"] for m in sent_before_body] == ["http.response.start"]
+        assert len(sent) == 2
+
+    def test_sse_never_compressed_even_if_listed(self):
+        response = get(make_client(content_types="text/event-stream"), "/stream")
+
+        assert "content-encoding" not in response.headers
+
+    def test_not_modified_untouched(self):
+        response = get(make_client(), "/not-modified")
+
+        assert response.status_code == 304
+        assert "content-encoding" not in response.headers
+
+    def test_websocket_passes_through(self):
+        with make_client().websocket_connect("/ws") as websocket:
+            assert websocket.receive_json() == LARGE
+
+    def test_brotli_preferred_when_available(self):
+        pytest.importorskip("brotli")
+        client = make_client(encodings="br,gzip")
+
+        response = get(client, "/large", "gzip, br")
+
+        assert response.headers["content-encoding"] == "br"
+        assert response.json() == LARGE
+
+    def test_story_transcript_is_compressed(
+        self, mock_db_session, sample_user, sample_story
+    ):
+        """The polled transcript endpoint should come back gzipped."""
+        from backend.app.api.endpoints.stories import get_current_active_user, get_db
+        from backend.app.main import app
+        from backend.app.models.message import Message
+
+        mock_db_session.add_all(
+            Message(story_id=sample_story.id, role="user", content="Hello " * 50)
+            for _ in range(10)
+        )
+        mock_db_session.commit()
+
+        def override_get_db():
+            yield mock_db_session
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_active_user] = lambda: sample_user
+        try:
+            response = get(TestClient(app), f"/api/stories/{sample_story.id}/messages")
+        finally:
+            app.dependency_overrides = {}
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 10
+        assert response.headers["ETag"]
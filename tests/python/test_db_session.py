@@ -0,0 +1,178 @@
+"""
+Unit tests for backend/app/db/session.py
+
+Tests database URL handling and engine/pool configuration.
+"""
+
+from backend.app.db.session import get_async_database_url
+
+
+class TestAsyncDatabaseUrl:
+    """Test DATABASE_URL translation to async drivers."""
+
+    def test_postgres_uses_asyncpg(self):
+        """Should map postgresql:// to the asyncpg driver."""
+        url = get_async_database_url("postgresql://user:secret@db:5432/lifestory")
+        assert url == "postgresql+asyncpg://user:secret@db:5432/lifestory"
+
+    def test_postgres_sslmode_becomes_ssl(self):
+        """Should pass sslmode through as asyncpg's ssl parameter."""
+        url = get_async_database_url(
+            "postgresql://user:secret@db:5432/lifestory?sslmode=require"
+        )
+        assert url == "postgresql+asyncpg://user:secret@db:5432/lifestory?ssl=require"
+
+    def test_sqlite_uses_aiosqlite(self):
+        """Should map sqlite:// to the aiosqlite driver."""
+        assert get_async_database_url("sqlite:///./app.db") == (
+            "sqlite+aiosqlite:///./app.db"
+        )
+
+
+class TestEngineOptions:
+    """Test engine keyword arguments built from the DB_* settings."""
+
+    PG_URL = "postgresql://user:secret@db:5432/lifestory"
+    ASYNC_PG_URL = "postgresql+asyncpg://user:secret@db:5432/lifestory"
+
+    def test_sqlite_keeps_defaults(self):
+        """Should not pass pool sizing to SQLite engines."""
+        from backend.app.db.session import engine_options
+
+        assert engine_options("sqlite:///./app.db") == {}
+        assert engine_options("sqlite+aiosqlite:///./app.db", is_async=True) == {}
+
+    def test_queue_pool_settings(self, monkeypatch):
+        """Should size, recycle and pre-ping the pool from settings."""
+        from backend.app.db import session
+
+        monkeypatch.setattr(session, "DB_POOL_SIZE", 15)
+        monkeypatch.setattr(session, "DB_MAX_OVERFLOW", 5)
+        monkeypatch.setattr(session, "DB_POOL_RECYCLE", 600)
+
+        options = session.engine_options(self.PG_URL)
+
+        assert options["pool_size"] == 15
+        assert options["max_overflow"] == 5
+        assert options["pool_recycle"] == 600
+        assert options["pool_pre_ping"] is True
+        assert "poolclass" not in options
+        assert "connect_args" not in options
+
+    def test_null_pool_mode_for_pgbouncer(self, monkeypatch):
+        """Should use NullPool and disable asyncpg statement caches."""
+        from sqlalchemy.pool import NullPool
+
+        from backend.app.db import session
+
+        monkeypatch.setattr(session, "DB_POOL_MODE", "null")
+
+        options = session.engine_options(self.ASYNC_PG_URL, is_async=True)
+
+        assert options["poolclass"] is NullPool
+        assert "pool_size" not in options
+        assert options["connect_args"] == {
+            "statement_cache_size": 0,
+            "prepared_statement_cache_size": 0,
+        }
+
+    def test_statement_timeout(self, monkeypatch):
+        """Should set statement_timeout through each driver's connect args."""
+        from backend.app.db import session
+
+        monkeypatch.setattr(session, "DB_STATEMENT_TIMEOUT_MS", 5000)
+
+        sync_options = session.engine_options(self.PG_URL)
+        async_options = session.engine_options(self.ASYNC_PG_URL, is_async=True)
+
+        assert sync_options["connect_args"] == {
+            "options": "-c statement_timeout=5000"
+        }
+        assert async_options["connect_args"] == {
+            "server_settings": {"statement_timeout": "5000"}
+        }
+
+
+class TestPoolMetrics:
+    """Test connection checkout metrics."""
+
+    def test_counts_checkouts_and_hold_time(self, tmp_path):
+        """Should count checkouts and track connections held at once."""
+        from sqlalchemy import create_engine, text
+
+        from backend.app.db.session import PoolMetrics
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}")
+        metrics = PoolMetrics().attach(engine)
+
+        with engine.connect() as first:
+            with engine.connect() as second:
+                first.execute(text("SELECT 1"))
+                second.execute(text("SELECT 1"))
+                assert metrics.snapshot()["checked_out"] == 2
+
+        snapshot = metrics.snapshot()
+        assert snapshot["checkouts"] == 2
+        assert snapshot["checkins"] == 2
+        assert snapshot["checked_out"] == 0
+        assert snapshot["peak_checked_out"] == 2
+        assert snapshot["connects"] == 2
+        assert snapshot["max_hold_ms"] >= 0
+        assert "Pool size" in snapshot["pool"]
+        engine.dispose()
+
+    def test_health_endpoint_reports_pool(self):
+        """Should expose the metrics on /health/db."""
+        from fastapi.testclient import TestClient
+
+        from backend.app.main import app
+
+        response = TestClient(app).get("/health/db")
+
+        assert response.status_code == 200
+        assert "checkouts" in response.json()["sync"]
+
+
+class TestUnitOfWork:
+    """Test the unit_of_work transaction helper."""
+
+    def test_commits_once_and_keeps_objects_loaded(
+        self, mock_db_session, sample_user
+    ):
+        """Should commit at the end without expiring what was written."""
+        from sqlalchemy import event, inspect
+
+        from backend.app.db.session import unit_of_work
+        from backend.app.models.story import Story
+
+        commits = []
+        event.listen(mock_db_session, "after_commit", lambda s: commits.append(1))
+
+        with unit_of_work(mock_db_session):
+            story = Story(
+                user_id=sample_user.id, title="One", current_phase="GREETING"
+            )
+            mock_db_session.add(story)
+            mock_db_session.flush()
+
+        assert len(commits) == 1
+        assert inspect(story).expired_attributes == set()
+        assert mock_db_session.expire_on_commit is True
+
+    def test_rolls_back_on_error(self, mock_db_session, sample_user):
+        """Should roll back the whole block if it raises."""
+        import pytest
+
+        from backend.app.db.session import unit_of_work
+        from backend.app.models.story import Story
+
+        user_id = sample_user.id
+        with pytest.raises(RuntimeError):
+            with unit_of_work(mock_db_session):
+                mock_db_session.add(
+                    Story(user_id=user_id, title="Lost", current_phase="GREETING")
+                )
+                mock_db_session.flush()
+                raise RuntimeError("boom")
+
+        assert mock_db_session.query(Story).filter_by(title="Lost").count() == 0
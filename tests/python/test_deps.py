@@ -0,0 +1,143 @@
+"""
+Unit tests for backend/app/api/deps.py
+
+Tests the shared load-and-authorize dependencies.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.api.deps import get_owned_story, owned_snippet
+from backend.app.core.principal_cache import Principal
+from backend.app.main import app
+from backend.app.models.snippets import Snippet
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def sample_snippet(mock_db_session, sample_user, sample_story):
+    snippet = Snippet(
+        user_id=sample_user.id,
+        story_id=sample_story.id,
+        title="Village Soccer Days",
+        content="They played soccer every evening.",
+    )
+    mock_db_session.add(snippet)
+    mock_db_session.commit()
+    mock_db_session.refresh(snippet)
+    return snippet
+
+
+@pytest.fixture
+def statements(mock_db_session):
+    """Record the SQL statements run on the test database."""
+    recorded = []
+
+    def before_execute(conn, cursor, statement, *args):
+        recorded.append(statement)
+
+    engine = mock_db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_execute)
+    yield recorded
+    event.remove(engine, "before_cursor_execute", before_execute)
+
+
+class TestGetOwnedStory:
+    """Test get_owned_story."""
+
+    def test_returns_owned_story(self, mock_db_session, sample_user, sample_story):
+        owner = Principal(id=sample_user.id, is_active=True)
+
+        story = get_owned_story(sample_story.id, owner, mock_db_session)
+
+        assert story is sample_story
+
+    def test_missing_story_is_404(self, mock_db_session, sample_user):
+        owner = Principal(id=sample_user.id, is_active=True)
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_owned_story(999, owner, mock_db_session)
+        assert exc_info.value.status_code == 404
+
+    def test_other_users_story_is_403(self, mock_db_session, sample_story):
+        other = Principal(id=sample_story.user_id + 1, is_active=True)
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_owned_story(sample_story.id, other, mock_db_session)
+        assert exc_info.value.status_code == 403
+
+
+class TestOwnedSnippet:
+    """Test the owned_snippet dependency factory."""
+
+    def test_loads_and_authorizes_in_one_query(
+        self, mock_db_session, sample_user, sample_snippet, statements
+    ):
+        """Snippet and story owner should come from a single joined query."""
+        snippet_id = sample_snippet.id
+        owner = Principal(id=sample_user.id, is_active=True)
+        mock_db_session.expire_all()
+        statements.clear()
+
+        snippet = owned_snippet("update")(snippet_id, owner, mock_db_session)
+
+        assert snippet.id == snippet_id
+        assert len(statements) == 1
+        assert "JOIN stories" in statements[0]
+
+    def test_missing_snippet_is_404(self, mock_db_session, sample_user):
+        with pytest.raises(HTTPException) as exc_info:
+            owned_snippet()(
+                999, Principal(id=sample_user.id, is_active=True), mock_db_session
+            )
+        assert exc_info.value.status_code == 404
+
+    def test_other_users_snippet_is_403_with_action(
+        self, mock_db_session, sample_user, sample_snippet
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            owned_snippet("restore")(
+                sample_snippet.id,
+                Principal(id=sample_user.id + 1, is_active=True),
+                mock_db_session,
+            )
+        assert exc_info.value.status_code == 403
+        assert exc_info.value.detail == "Not authorized to restore this snippet"
+
+    def test_lock_endpoint_does_not_reload_snippet(
+        self, mock_db_session, sample_user, sample_snippet, statements
+    ):
+        """The service should reuse the row loaded by the dependency."""
+        from backend.app.core.auth import get_current_active_user
+        from backend.app.db.session import get_db
+
+        def override_get_db():
+            yield mock_db_session
+
+        app.dependency_overrides[get_db] = override_get_db
+        owner = Principal(id=sample_user.id, is_active=True)
+        app.dependency_overrides[get_current_active_user] = lambda: owner
+        snippet_id = sample_snippet.id
+        mock_db_session.expire_all()
+        statements.clear()
+
+        try:
+            response = client.patch(f"/api/snippets/{snippet_id}/lock")
+        finally:
+            app.dependency_overrides = {}
+
+        assert response.status_code == 200
+        assert response.json()["is_locked"] is True
+        selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+        # Ownership check, then the refresh after commit
+        assert len(selects) == 2
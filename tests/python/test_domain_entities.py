@@ -205,3 +205,37 @@ class TestSnippetEntity:
         assert snippet.is_archived == True
         snippet.restore()
         assert snippet.is_active == True
+
+
+class TestContextWindowService:
+    """Tests for ContextWindowService."""
+    
+    def test_estimate_tokens(self):
+        """Should estimate roughly four characters per token."""
+        from backend.domain.services.context_window import ContextWindowService
+        
+        assert ContextWindowService.estimate_tokens("") == 0
+        assert ContextWindowService.estimate_tokens("abcd") == 1
+        assert ContextWindowService.estimate_tokens("abcde") == 2
+    
+    def test_keeps_newest_messages_within_budget(self):
+        """Should drop the oldest messages once the budget is spent."""
+        from backend.domain.services.context_window import ContextWindowService
+        
+        messages = ["a" * 40, "b" * 40, "c" * 40]  # 10 tokens each
+        window = ContextWindowService.fit_to_budget(messages, 25, lambda m: m)
+        assert window == ["b" * 40, "c" * 40]
+    
+    def test_always_keeps_latest_message(self):
+        """Should keep the newest message even if it exceeds the budget."""
+        from backend.domain.services.context_window import ContextWindowService
+        
+        messages = ["short", "x" * 400]
+        window = ContextWindowService.fit_to_budget(messages, 10, lambda m: m)
+        assert window == ["x" * 400]
+    
+    def test_empty_history(self):
+        """Should return an empty window for no messages."""
+        from backend.domain.services.context_window import ContextWindowService
+        
+        assert ContextWindowService.fit_to_budget([], 100, lambda m: m) == []
@@ -0,0 +1,224 @@
+"""
+Unit tests for backend/app/core/events.py
+
+Tests the story event bus and the events WebSocket that relays it.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.events import (
+    EVENT_MESSAGE,
+    EVENT_PHASE,
+    EVENT_RESYNC,
+    StoryEventBus,
+    story_events,
+)
+from backend.app.core.security import create_access_token
+from backend.app.main import app
+
+
+@pytest.fixture(autouse=True)
+def reset_story_events():
+    story_events.clear()
+    yield
+    story_events.clear()
+
+
+def wait_for_subscriber(story_id: int, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not story_events.has_subscribers(story_id):
+        assert time.monotonic() < deadline, "socket never subscribed"
+        time.sleep(0.01)
+
+
+class TestStoryEventBus:
+    """Test StoryEventBus."""
+
+    @pytest.mark.asyncio
+    async def test_delivers_to_subscribers_of_the_story(self):
+        """Should fan an event out to the story's subscribers only."""
+        bus = StoryEventBus()
+        first = bus.subscribe(1)
+        second = bus.subscribe(1)
+        other = bus.subscribe(2)
+
+        assert bus.publish(1, EVENT_MESSAGE, {"id": 5}) == 2
+        await asyncio.sleep(0)
+
+        expected = {"event": EVENT_MESSAGE, "story_id": 1, "data": {"id": 5}}
+        assert await first.get() == expected
+        assert await second.get() == expected
+        assert other.queue.empty()
+
+    @pytest.mark.asyncio
+    async def test_publish_from_another_thread(self):
+        """Should hand events from worker threads to the subscriber's loop."""
+        bus = StoryEventBus()
+        subscription = bus.subscribe(1)
+
+        worker = threading.Thread(target=bus.publish, args=(1, EVENT_PHASE))
+        worker.start()
+        worker.join()
+
+        event = await asyncio.wait_for(subscription.get(), timeout=1)
+        assert event["event"] == EVENT_PHASE
+
+    @pytest.mark.asyncio
+    async def test_unsubscribe_stops_delivery(self):
+        """Should forget a subscription and the story once nobody listens."""
+        bus = StoryEventBus()
+        subscription = bus.subscribe(1)
+
+        bus.unsubscribe(subscription)
+
+        assert bus.has_subscribers(1) is False
+        assert bus.publish(1, EVENT_MESSAGE) == 0
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_resync(self):
+        """Should replace an overflowing backlog with a single resync event."""
+        bus = StoryEventBus(max_queue=2)
+        subscription = bus.subscribe(1)
+
+        for i in range(3):
+            bus.publish(1, EVENT_MESSAGE, {"id": i})
+        await asyncio.sleep(0)
+
+        assert subscription.queue.qsize() == 1
+        assert (await subscription.get())["event"] == EVENT_RESYNC
+
+
+@pytest.fixture
+def events_client(async_session_factory):
+    from backend.app.db.session import get_async_db
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    yield TestClient(app)
+    app.dependency_overrides = {}
+
+
+class TestStoryEventsSocket:
+    """Test the /api/stories/{story_id}/events WebSocket."""
+
+    def test_relays_published_events(self, events_client, file_db_story):
+        """Should forward events published for the story to the client."""
+        token = create_access_token({"sub": str(file_db_story.user_id)})
+        url = f"/api/stories/{file_db_story.id}/events?token={token}"
+
+        with events_client.websocket_connect(url) as ws:
+            wait_for_subscriber(file_db_story.id)
+            story_events.publish(file_db_story.id, EVENT_MESSAGE, {"id": 9})
+
+            assert ws.receive_json() == {
+                "event": EVENT_MESSAGE,
+                "story_id": file_db_story.id,
+                "data": {"id": 9},
+            }
+
+        # Closing the socket drops the subscription
+        deadline = time.monotonic() + 2
+        while story_events.has_subscribers(file_db_story.id):
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+
+    def test_sends_ping_when_idle(self, events_client, file_db_story, monkeypatch):
+        """Should send a heartbeat when no event arrives in time."""
+        from backend.app.api.endpoints import stories
+
+        monkeypatch.setattr(stories, "EVENTS_HEARTBEAT_SECONDS", 0.05)
+        token = create_access_token({"sub": str(file_db_story.user_id)})
+
+        with events_client.websocket_connect(
+            f"/api/stories/{file_db_story.id}/events?token={token}"
+        ) as ws:
+            assert ws.receive_json()["event"] == "ping"
+
+    def test_rejects_invalid_token(self, events_client, file_db_story):
+        """Should close with 4401 when the token is invalid."""
+        with events_client.websocket_connect(
+            f"/api/stories/{file_db_story.id}/events?token=not-a-token"
+        ) as ws:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+
+        assert exc_info.value.code == 4401
+
+    def test_rejects_story_of_another_user(
+        self, events_client, file_db_session, file_db_story
+    ):
+        """Should close with 4403 when the story belongs to someone else."""
+        from backend.app.models.user import User
+
+        other = User(email="other@example.com", hashed_password="x", is_active=True)
+        file_db_session.add(other)
+        file_db_session.commit()
+        token = create_access_token({"sub": str(other.id)})
+
+        with events_client.websocket_connect(
+            f"/api/stories/{file_db_story.id}/events?token={token}"
+        ) as ws:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+
+        assert exc_info.value.code == 4403
+        assert story_events.has_subscribers(file_db_story.id) is False
+
+    def test_rejects_missing_story(self, events_client, file_db_story):
+        """Should close with 4404 when the story does not exist."""
+        token = create_access_token({"sub": str(file_db_story.user_id)})
+
+        with events_client.websocket_connect(
+            f"/api/stories/9999/events?token={token}"
+        ) as ws:
+            with pytest.raises(WebSocketDisconnect) as exc_info:
+                ws.receive_json()
+
+        assert exc_info.value.code == 4404
+
+
+class TestPublishers:
+    """Test that story changes are published."""
+
+    @pytest.mark.asyncio
+    async def test_phase_advance_and_messages_are_published(
+        self, mock_db_session, sample_story
+    ):
+        """Should publish the phase change and the saved messages."""
+        from backend.app.services.interview import InterviewService
+
+        subscription = story_events.subscribe(sample_story.id)
+        service = InterviewService(mock_db_session)
+        sample_story.age_range = "31_45"
+        sample_story.current_phase = "FAMILY_HISTORY"
+        mock_db_session.commit()
+
+        with patch("backend.app.services.interview.phase_summarizer"):
+            service.advance_to_next_phase(sample_story)
+        service._prepare_chat(sample_story.id, "Hello", False, story=sample_story)
+        await asyncio.sleep(0)
+
+        phase = await subscription.get()
+        assert phase["event"] == EVENT_PHASE
+        assert phase["data"]["phase"] == "CHILDHOOD"
+
+        message = await subscription.get()
+        assert message["event"] == EVENT_MESSAGE
+        assert message["data"]["content"] == "Hello"
+        assert message["data"]["role"] == "user"
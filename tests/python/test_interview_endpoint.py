@@ -152,3 +152,235 @@ class TestInterviewEndpoint:
                     assert response.status_code == 200
                     data = response.json()
                     assert data["phase"] == "UNKNOWN"
+
+
+@pytest.fixture
+def async_client(async_session_factory, file_db_story):
+    """Test client with the async DB session and story owner injected."""
+    from backend.app.core.auth import get_current_active_user_async
+    from backend.app.db.session import get_async_db
+    from backend.app.models.user import User
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    owner = User(id=file_db_story.user_id, email="async@example.com", is_active=True)
+
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_current_active_user_async] = lambda: owner
+
+    yield TestClient(app)
+
+    app.dependency_overrides = {}
+
+
+class TestAsyncChatEndpoint:
+    """Test POST /api/interview/{story_id} on the async pipeline."""
+
+    def test_chat_awaits_agent(self, async_client, file_db_story):
+        """Should use agent_app.ainvoke and return the saved AI message."""
+        from unittest.mock import AsyncMock
+
+        from langchain_core.messages import AIMessage
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.ainvoke = AsyncMock(
+                return_value={"messages": [AIMessage(content="Welcome!")]}
+            )
+
+            response = async_client.post(
+                f"/api/interview/{file_db_story.id}", json={"message": "Hello!"}
+            )
+
+            assert response.status_code == 200
+            data = response.json()
+            assert data["role"] == "assistant"
+            assert data["content"] == "Welcome!"
+            assert data["phase"] == "GREETING"
+            mock_agent.ainvoke.assert_awaited_once()
+            mock_agent.invoke.assert_not_called()
+
+    def test_chat_missing_story_returns_404(self, async_client):
+        """Should return 404 for non-existent story."""
+        response = async_client.post("/api/interview/999", json={"message": "Hi"})
+        assert response.status_code == 404
+
+    def test_chat_other_users_story_returns_403(
+        self, async_client, file_db_session, file_db_story
+    ):
+        """Should reject stories owned by someone else."""
+        from backend.app.models.story import Story
+        from backend.app.models.user import User
+
+        other = User(email="other@example.com", hashed_password="x", is_active=True)
+        file_db_session.add(other)
+        file_db_session.commit()
+        story = Story(user_id=other.id, title="Other", current_phase="GREETING")
+        file_db_session.add(story)
+        file_db_session.commit()
+
+        response = async_client.post(f"/api/interview/{story.id}", json={"message": "Hi"})
+        assert response.status_code == 403
+
+
+class TestInterviewStreamEndpoint:
+    """Test POST /api/interview/{story_id}/stream endpoint."""
+
+    def test_stream_returns_sse_events(self, async_client, file_db_story):
+        """Should stream token events followed by a done event."""
+        from langchain_core.messages import AIMessageChunk
+
+        async def fake_astream(*args, **kwargs):
+            for text in ["Hello ", "there"]:
+                yield AIMessageChunk(content=text), {}
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.astream = fake_astream
+
+            response = async_client.post(
+                f"/api/interview/{file_db_story.id}/stream",
+                json={"message": "Hi"},
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        frames = [f for f in response.text.split("\n\n") if f]
+        assert frames[0] == 'event: token\ndata: {"content": "Hello "}'
+        assert frames[1] == 'event: token\ndata: {"content": "there"}'
+        assert frames[-1].startswith("event: done\n")
+        assert '"content": "Hello there"' in frames[-1]
+        assert '"phase": "GREETING"' in frames[-1]
+
+    def test_stream_missing_story_returns_404(self, async_client):
+        """Should return 404 before streaming for a non-existent story."""
+        response = async_client.post("/api/interview/999/stream", json={"message": "Hi"})
+        assert response.status_code == 404
+
+    def test_stream_agent_error_sends_error_event(self, async_client, file_db_story):
+        """Should report mid-stream failures as an error event."""
+
+        async def failing_astream(*args, **kwargs):
+            raise Exception("Agent error")
+            yield  # pragma: no cover
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.astream = failing_astream
+
+            response = async_client.post(
+                f"/api/interview/{file_db_story.id}/stream",
+                json={"message": "Hi"},
+            )
+
+        assert response.status_code == 200
+        assert "event: error" in response.text
+
+
+@pytest.fixture
+def token_client(async_session_factory, file_db_url, file_db_story):
+    """
+    Test client authenticating with a real bearer token.
+
+    Both the sync and the async session point at the file database, and
+    their pools are instrumented, so tests can see which one holds a
+    connection.
+    """
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from backend.app.core.security import create_access_token
+    from backend.app.db.session import PoolMetrics, get_async_db, get_db
+
+    sync_engine = create_engine(file_db_url)
+    SyncSession = sessionmaker(bind=sync_engine)
+
+    def override_get_db():
+        db = SyncSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+
+    client = TestClient(app)
+    client.headers["Authorization"] = (
+        f"Bearer {create_access_token({'sub': str(file_db_story.user_id)})}"
+    )
+    client.pool_metrics = {
+        "sync": PoolMetrics().attach(sync_engine),
+        "async": PoolMetrics().attach(async_session_factory.kw["bind"].sync_engine),
+    }
+
+    yield client
+
+    app.dependency_overrides = {}
+    sync_engine.dispose()
+
+
+class TestConnectionReleaseWithAuth:
+    """A principal cache miss must not pin a connection across the model call."""
+
+    def _checked_out(self, client):
+        return {
+            name: metrics.snapshot()["checked_out"]
+            for name, metrics in client.pool_metrics.items()
+        }
+
+    def test_chat_holds_no_connection_during_agent_call(
+        self, token_client, file_db_story
+    ):
+        """No pool should have a connection out while the agent is awaited."""
+        from langchain_core.messages import AIMessage
+
+        from backend.app.core.principal_cache import principal_cache
+
+        principal_cache.clear()
+        checked_out = []
+
+        async def ainvoke(*args, **kwargs):
+            checked_out.append(self._checked_out(token_client))
+            return {"messages": [AIMessage(content="Welcome!")]}
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.ainvoke = ainvoke
+
+            response = token_client.post(
+                f"/api/interview/{file_db_story.id}", json={"message": "Hello!"}
+            )
+
+        assert response.status_code == 200
+        assert checked_out == [{"sync": 0, "async": 0}]
+
+    def test_stream_holds_no_connection_while_streaming(
+        self, token_client, file_db_story
+    ):
+        """No pool should have a connection out while tokens are relayed."""
+        from langchain_core.messages import AIMessageChunk
+
+        from backend.app.core.principal_cache import principal_cache
+
+        principal_cache.clear()
+        checked_out = []
+
+        async def fake_astream(*args, **kwargs):
+            checked_out.append(self._checked_out(token_client))
+            yield AIMessageChunk(content="Hi"), {}
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.astream = fake_astream
+
+            response = token_client.post(
+                f"/api/interview/{file_db_story.id}/stream",
+                json={"message": "Hello!"},
+            )
+
+        assert response.status_code == 200
+        assert "event: done" in response.text
+        assert checked_out == [{"sync": 0, "async": 0}]
@@ -9,7 +9,9 @@ from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
 import pytest
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 
 # Add project root to path
 project_root = Path(__file__).parent.parent.parent
@@ -189,7 +191,7 @@ class TestInterviewService:
         call_args = mock_agent.invoke.call_args[0][0]
         messages = call_args["messages"]
 
-        # Should have: 20 history messages (new message saved to DB but NOT passed to agent)
+        # Should have: the 20 most recent messages, including the new one
         assert len(messages) == 20
 
     def test_process_chat_commits_immediately_after_user_message(
@@ -223,3 +225,558 @@ class TestInterviewService:
             user_messages = mock_db_session.query(Message).filter_by(role="user").all()
             assert len(user_messages) == 1
             assert user_messages[0].content == "Test message"
+
+
+class DroppingChatModel(BaseChatModel):
+    """Streams two tokens, then loses the connection on the first call."""
+
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "dropping"
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(
+            generations=[ChatGeneration(message=AIMessage(content="Hello there friend"))]
+        )
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        yield ChatGenerationChunk(message=AIMessageChunk(content="Hello"))
+        yield ChatGenerationChunk(message=AIMessageChunk(content=" there"))
+        if self.calls == 1:
+            raise ConnectionError("connection reset")
+        yield ChatGenerationChunk(message=AIMessageChunk(content=" friend"))
+
+
+class TestInterviewServiceStreaming:
+    """Test InterviewService.stream_chat."""
+
+    def test_stream_chat_yields_tokens_then_done(self, mock_db_session, sample_story):
+        """Should relay token events and finish with the saved message."""
+        from langchain_core.messages import AIMessageChunk
+
+        service = InterviewService(mock_db_session)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.stream.return_value = [
+                (AIMessageChunk(content="Welcome "), {}),
+                (AIMessageChunk(content=""), {}),
+                (AIMessageChunk(content="to your story!"), {}),
+            ]
+
+            events = list(service.stream_chat(sample_story.id, "Hello"))
+
+        assert events[0] == ("token", {"content": "Welcome "})
+        assert events[1] == ("token", {"content": "to your story!"})
+
+        event, data = events[-1]
+        assert event == "done"
+        assert data["role"] == "assistant"
+        assert data["content"] == "Welcome to your story!"
+        assert data["phase"] == "GREETING"
+        assert isinstance(data["id"], int)
+
+    def test_stream_chat_persists_ai_message_only_after_completion(
+        self, mock_db_session, sample_story
+    ):
+        """Should not save the assistant message until the stream is drained."""
+        from langchain_core.messages import AIMessageChunk
+
+        from backend.app.models.message import Message
+
+        service = InterviewService(mock_db_session)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.stream.return_value = [(AIMessageChunk(content="Hi"), {})]
+
+            events = service.stream_chat(sample_story.id, "Hello")
+
+            # User message is saved eagerly, assistant message is not
+            assert mock_db_session.query(Message).filter_by(role="user").count() == 1
+            assert (
+                mock_db_session.query(Message).filter_by(role="assistant").count() == 0
+            )
+
+            list(events)
+
+        assistant = mock_db_session.query(Message).filter_by(role="assistant").all()
+        assert len(assistant) == 1
+        assert assistant[0].content == "Hi"
+
+    def test_stream_chat_does_not_retry_after_tokens_were_sent(
+        self, mock_db_session, sample_story
+    ):
+        """A model failing mid-stream should end the stream, not append a retry."""
+        from backend.app.models.message import Message
+
+        service = InterviewService(mock_db_session)
+        model = DroppingChatModel()
+
+        with patch("backend.app.core.agent._create_llm", return_value=model):
+            events = service.stream_chat(sample_story.id, "Hello")
+            tokens = []
+            with pytest.raises(ConnectionError):
+                for event, data in events:
+                    tokens.append(data["content"])
+
+        assert "".join(tokens) == "Hello there"
+        assert model.calls == 1
+        assert mock_db_session.query(Message).filter_by(role="assistant").count() == 0
+
+    def test_stream_chat_raises_on_missing_story(self, mock_db_session):
+        """Should raise before streaming when the story does not exist."""
+        service = InterviewService(mock_db_session)
+
+        with pytest.raises(ValueError, match="Story with ID 999 not found"):
+            service.stream_chat(999, "Test message")
+
+
+class TestAsyncInterviewService:
+    """Test AsyncInterviewService on an async session."""
+
+    @pytest.mark.asyncio
+    async def test_process_chat_saves_both_messages(
+        self, async_session_factory, file_db_session, file_db_story
+    ):
+        """Should save user and AI messages and await the agent."""
+        from unittest.mock import AsyncMock
+
+        from backend.app.models.message import Message
+        from backend.app.services.interview import AsyncInterviewService
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.ainvoke = AsyncMock(
+                return_value={"messages": [AIMessage(content="Async hello")]}
+            )
+
+            async with async_session_factory() as session:
+                result, metadata = await AsyncInterviewService(
+                    session
+                ).process_chat(file_db_story.id, "Hello")
+
+        assert result.content == "Async hello"
+        assert metadata["phase"] == "GREETING"
+
+        roles = [
+            m.role
+            for m in file_db_session.query(Message)
+            .filter_by(story_id=file_db_story.id)
+            .order_by(Message.id)
+        ]
+        assert roles == ["user", "assistant"]
+
+    @pytest.mark.asyncio
+    async def test_process_chat_raises_on_missing_story(self, async_session_factory):
+        """Should raise ValueError for non-existent story."""
+        from backend.app.services.interview import AsyncInterviewService
+
+        async with async_session_factory() as session:
+            with pytest.raises(ValueError, match="Story with ID 999 not found"):
+                await AsyncInterviewService(session).process_chat(999, "Hi")
+
+
+    @pytest.mark.asyncio
+    async def test_stream_chat_does_not_retry_after_tokens_were_sent(
+        self, async_session_factory, file_db_session, file_db_story
+    ):
+        """The async stream should also stop when the model fails mid-reply."""
+        from backend.app.models.message import Message
+        from backend.app.services.interview import AsyncInterviewService
+
+        model = DroppingChatModel()
+        tokens = []
+
+        with patch("backend.app.core.agent._create_llm", return_value=model):
+            async with async_session_factory() as session:
+                events = await AsyncInterviewService(session).stream_chat(
+                    file_db_story.id, "Hello"
+                )
+                with pytest.raises(ConnectionError):
+                    async for event, data in events:
+                        tokens.append(data["content"])
+
+        assert "".join(tokens) == "Hello there"
+        assert model.calls == 1
+        assert (
+            file_db_session.query(Message)
+            .filter_by(story_id=file_db_story.id, role="assistant")
+            .count()
+            == 0
+        )
+
+
+class TestConnectionRelease:
+    """No connection should be held while the model runs."""
+
+    def test_process_chat_releases_connection_during_agent_call(
+        self, mock_db_session, sample_story
+    ):
+        """The session should have no open transaction inside agent_app.invoke."""
+        service = InterviewService(mock_db_session)
+        in_transaction = []
+
+        def invoke(agent_input, config=None):
+            in_transaction.append(mock_db_session.in_transaction())
+            return {"messages": [AIMessage(content="Tell me more")]}
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.side_effect = invoke
+            result, metadata = service.process_chat(sample_story.id, "Hello")
+
+        assert in_transaction == [False]
+        assert result.content == "Tell me more"
+        assert metadata["phase"] == "GREETING"
+
+    def test_stream_chat_releases_connection_while_streaming(
+        self, mock_db_session, sample_story
+    ):
+        """Tokens should be relayed without an open transaction."""
+        from langchain_core.messages import AIMessageChunk
+
+        service = InterviewService(mock_db_session)
+        in_transaction = []
+
+        def stream(agent_input, stream_mode, config=None):
+            in_transaction.append(mock_db_session.in_transaction())
+            yield AIMessageChunk(content="Hi"), {}
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.stream.side_effect = stream
+            events = list(service.stream_chat(sample_story.id, "Hello"))
+
+        assert in_transaction == [False]
+        assert events[-1][0] == "done"
+
+
+class TestCommitBatching:
+    """A chat turn should commit once per step, without refreshes."""
+
+    def test_chat_turn_commits_twice_without_refresh(
+        self, mock_db_session, sample_story
+    ):
+        """Age selection, phase advance and the user message share a commit."""
+        from sqlalchemy import event
+
+        commits = []
+        statements = []
+        event.listen(mock_db_session, "after_commit", lambda s: commits.append(1))
+        engine = mock_db_session.get_bind()
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        event.listen(engine, "before_cursor_execute", before_execute)
+        service = InterviewService(mock_db_session)
+
+        try:
+            with patch("backend.app.services.interview.agent_app") as mock_agent:
+                mock_agent.invoke.return_value = {
+                    "messages": [AIMessage(content="Tell me about your family")]
+                }
+                with patch("backend.app.services.interview.phase_summarizer"):
+                    result, metadata = service.process_chat(
+                        sample_story.id,
+                        "[Age selected via button: 31_45]",
+                        advance_phase=True,
+                    )
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+
+        assert len(commits) == 2
+        assert result.id is not None
+        assert metadata["phase"] == "CHILDHOOD"
+        # The AI message id comes from the INSERT, not a refresh
+        inserts = [
+            i for i, sql in enumerate(statements) if "INSERT INTO messages" in sql
+        ]
+        assert not any(
+            "FROM messages" in sql and "messages.id = " in sql
+            for sql in statements[inserts[-1] :]
+        )
+
+
+class TestHistoryWindow:
+    """Test the conversation history window sent to the agent."""
+
+    def _add_messages(self, db, story_id, count, content="Message {i}"):
+        from backend.app.models.message import Message
+
+        for i in range(count):
+            db.add(
+                Message(
+                    story_id=story_id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    content=content.format(i=i),
+                    phase_context="GREETING",
+                )
+            )
+        db.commit()
+
+    def test_window_holds_most_recent_messages(self, mock_db_session, sample_story):
+        """Should send the latest messages, not the first ones."""
+        self._add_messages(mock_db_session, sample_story.id, 25)
+        service = InterviewService(mock_db_session)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Response")]
+            }
+
+            service.process_chat(sample_story.id, "New message")
+
+        messages = mock_agent.invoke.call_args[0][0]["messages"]
+        assert len(messages) == 20
+        assert messages[0].content == "Message 6"
+        assert messages[-2].content == "Message 24"
+        assert messages[-1].content == "New message"
+
+    def test_window_trimmed_to_token_budget(self, mock_db_session, sample_story):
+        """Should drop older messages once the token budget is exceeded."""
+        # Each message is 400 chars, roughly 100 tokens
+        self._add_messages(
+            mock_db_session, sample_story.id, 10, content="{i}" + "x" * 399
+        )
+        service = InterviewService(mock_db_session)
+
+        with patch("backend.app.services.interview.HISTORY_TOKEN_BUDGET", 350):
+            window = service.load_history_window(sample_story.id)
+
+        assert [m.content[0] for m in window] == ["7", "8", "9"]
+
+
+class TestPhaseSummaries:
+    """Test rolling per-phase summaries."""
+
+    def _add_phase_messages(self, db, story_id, phase, contents):
+        from backend.app.models.message import Message
+
+        for i, content in enumerate(contents):
+            db.add(
+                Message(
+                    story_id=story_id,
+                    role="user" if i % 2 == 0 else "assistant",
+                    content=content,
+                    phase_context=phase,
+                )
+            )
+        db.commit()
+
+    def test_summarize_phase_saves_final_summary(self, mock_db_session, sample_story):
+        """Should condense only the phase's messages into a final Summary."""
+        from backend.app.services.summaries import PhaseSummaryService
+
+        self._add_phase_messages(
+            mock_db_session,
+            sample_story.id,
+            "FAMILY_HISTORY",
+            ["My parents met in Lisbon", "How lovely!"],
+        )
+        self._add_phase_messages(
+            mock_db_session, sample_story.id, "CHILDHOOD", ["I had a dog"]
+        )
+
+        with patch("backend.app.services.summaries.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Their parents met in Lisbon.")]
+            }
+
+            summary = PhaseSummaryService(mock_db_session).summarize_phase(
+                sample_story.id, "FAMILY_HISTORY"
+            )
+
+        assert summary.phase == "FAMILY_HISTORY"
+        assert summary.content == "Their parents met in Lisbon."
+        assert summary.is_final is True
+
+        transcript = mock_agent.invoke.call_args[0][0]["messages"][0].content
+        assert "User: My parents met in Lisbon" in transcript
+        assert "Interviewer: How lovely!" in transcript
+        assert "I had a dog" not in transcript
+
+    def test_summarize_phase_replaces_existing_summary(
+        self, mock_db_session, sample_story
+    ):
+        """Should keep a single summary per phase."""
+        from backend.app.models.summary import Summary
+        from backend.app.services.summaries import PhaseSummaryService
+
+        self._add_phase_messages(
+            mock_db_session, sample_story.id, "CHILDHOOD", ["I had a dog"]
+        )
+        service = PhaseSummaryService(mock_db_session)
+
+        with patch("backend.app.services.summaries.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {"messages": [AIMessage(content="v1")]}
+            service.summarize_phase(sample_story.id, "CHILDHOOD")
+            mock_agent.invoke.return_value = {"messages": [AIMessage(content="v2")]}
+            service.summarize_phase(sample_story.id, "CHILDHOOD")
+
+        summaries = mock_db_session.query(Summary).all()
+        assert [s.content for s in summaries] == ["v2"]
+
+    def test_summarize_phase_skips_non_chapters_and_empty_phases(
+        self, mock_db_session, sample_story
+    ):
+        """Should not call the model for GREETING or a phase without answers."""
+        from backend.app.services.summaries import PhaseSummaryService
+
+        self._add_phase_messages(mock_db_session, sample_story.id, "GREETING", ["3"])
+        service = PhaseSummaryService(mock_db_session)
+
+        with patch("backend.app.services.summaries.agent_app") as mock_agent:
+            assert service.summarize_phase(sample_story.id, "GREETING") is None
+            assert service.summarize_phase(sample_story.id, "CHILDHOOD") is None
+
+        mock_agent.invoke.assert_not_called()
+
+    def test_advance_schedules_summary_of_finished_phase(
+        self, mock_db_session, sample_story
+    ):
+        """Should queue a summary for the phase the story just left."""
+        sample_story.age_range = "31_45"
+        sample_story.current_phase = "CHILDHOOD"
+        mock_db_session.commit()
+
+        with patch("backend.app.services.interview.phase_summarizer") as summarizer:
+            new_phase = InterviewService(mock_db_session).advance_to_next_phase(
+                sample_story
+            )
+
+        assert new_phase == "ADOLESCENCE"
+        summarizer.schedule.assert_called_once_with(sample_story.id, "CHILDHOOD")
+
+    def test_process_chat_sends_summaries_instead_of_old_turns(
+        self, mock_db_session, sample_story
+    ):
+        """Should replace summarized chapters with their summary in the prompt."""
+        from backend.app.models.summary import Summary
+
+        sample_story.age_range = "31_45"
+        sample_story.current_phase = "CHILDHOOD"
+        self._add_phase_messages(
+            mock_db_session,
+            sample_story.id,
+            "FAMILY_HISTORY",
+            ["My parents met in Lisbon", "How lovely!"],
+        )
+        self._add_phase_messages(
+            mock_db_session, sample_story.id, "CHILDHOOD", ["I had a dog", "Nice!"]
+        )
+        mock_db_session.add(
+            Summary(
+                story_id=sample_story.id,
+                phase="FAMILY_HISTORY",
+                content="Their parents met in Lisbon.",
+                is_final=True,
+            )
+        )
+        mock_db_session.commit()
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Response")]
+            }
+            InterviewService(mock_db_session).process_chat(sample_story.id, "More")
+
+        agent_input = mock_agent.invoke.call_args[0][0]
+        assert [m.content for m in agent_input["messages"]] == [
+            "I had a dog",
+            "Nice!",
+            "More",
+        ]
+        assert agent_input["phase_instruction"].startswith(
+            PHASE_CONFIG["CHILDHOOD"]["prompt"]
+        )
+        assert "[FAMILY_HISTORY] Their parents met in Lisbon." in (
+            agent_input["phase_instruction"]
+        )
+
+    def test_summarizer_runs_in_background_with_own_session(
+        self, file_db_url, file_db_session, file_db_story
+    ):
+        """Should summarize on a worker thread using a fresh session."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from backend.app.models.summary import Summary
+        from backend.app.services.summaries import PhaseSummarizer
+
+        self._add_phase_messages(
+            file_db_session, file_db_story.id, "CHILDHOOD", ["I had a dog"]
+        )
+        summarizer = PhaseSummarizer(
+            session_factory=sessionmaker(bind=create_engine(file_db_url)),
+            max_workers=1,
+        )
+
+        with patch("backend.app.services.summaries.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="They had a dog.")]
+            }
+            job = summarizer.schedule(file_db_story.id, "CHILDHOOD")
+            assert job.wait(timeout=10)
+
+        assert summarizer.schedule(file_db_story.id, "GREETING") is None
+        summary = file_db_session.query(Summary).one()
+        assert summary.content == "They had a dog."
+
+    def test_summarizer_logs_and_drops_failures(
+        self, file_db_url, file_db_session, file_db_story
+    ):
+        """A failed summary should not raise out of the worker."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+
+        from backend.app.services.summaries import PhaseSummarizer
+
+        self._add_phase_messages(
+            file_db_session, file_db_story.id, "CHILDHOOD", ["I had a dog"]
+        )
+        summarizer = PhaseSummarizer(
+            session_factory=sessionmaker(bind=create_engine(file_db_url)),
+            max_workers=1,
+        )
+
+        with patch("backend.app.services.summaries.agent_app") as mock_agent:
+            mock_agent.invoke.side_effect = Exception("All 3 models exhausted")
+            job = summarizer.schedule(file_db_story.id, "CHILDHOOD")
+
+            assert job.wait(timeout=10)
+            assert job.status == "succeeded"
+            assert job.result is None
+
+
+class TestPreloadedStory:
+    """Test passing an already-loaded story into the chat flow."""
+
+    def test_process_chat_skips_story_lookup(self, mock_db_session, sample_story):
+        """Should not query the stories table when the row is passed in."""
+        from sqlalchemy import event
+
+        statements = []
+
+        def before_execute(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append(statement)
+
+        engine = mock_db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", before_execute)
+        try:
+            with patch("backend.app.services.interview.agent_app") as mock_agent:
+                mock_agent.invoke.return_value = {
+                    "messages": [AIMessage(content="Response")]
+                }
+                InterviewService(mock_db_session).process_chat(
+                    sample_story.id, "Hello", story=sample_story
+                )
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+
+        # Refreshing the expired row after a commit is fine; a fresh
+        # .first() lookup (with LIMIT) is not
+        story_lookups = [
+            s for s in statements if "FROM stories" in s and "LIMIT" in s
+        ]
+        assert story_lookups == []
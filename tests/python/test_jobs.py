@@ -0,0 +1,135 @@
+"""
+Unit tests for backend/app/core/jobs.py
+
+Tests the in-process background job queue.
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.jobs import JOB_FAILED, JOB_SUCCEEDED, JobConflict, JobQueue
+
+
+@pytest.fixture
+def queue():
+    q = JobQueue(max_workers=2, name="test-jobs")
+    yield q
+    q.shutdown()
+
+
+class TestJobQueue:
+    """Test JobQueue."""
+
+    def test_runs_job_and_stores_result(self, queue):
+        """Should run the function on a worker and keep its result."""
+        job = queue.submit("sum", lambda a, b: a + b, 2, 3, owner_id=7)
+
+        assert job.wait(timeout=5)
+        assert job.status == JOB_SUCCEEDED
+        assert job.result == 5
+        assert job.owner_id == 7
+        assert job.started_at is not None
+        assert job.finished_at is not None
+        assert queue.get(job.id) is job
+
+    def test_records_failure(self, queue):
+        """A crashing job should be marked failed with the error message."""
+
+        def boom():
+            raise RuntimeError("model unavailable")
+
+        job = queue.submit("boom", boom)
+
+        assert job.wait(timeout=5)
+        assert job.status == JOB_FAILED
+        assert job.error == "model unavailable"
+
+    def test_deduplicates_pending_jobs_by_key(self, queue):
+        """Submitting the same key while a job is pending returns that job."""
+        release = threading.Event()
+        calls = []
+
+        def slow():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "done"
+
+        first = queue.submit("snippets:1", slow)
+        second = queue.submit("snippets:1", slow)
+        other = queue.submit("snippets:2", slow)
+
+        assert second is first
+        assert other is not first
+        assert queue.active_job("snippets:1") is first
+
+        release.set()
+        assert first.wait(timeout=5) and other.wait(timeout=5)
+        assert len(calls) == 2
+        assert queue.active_job("snippets:1") is None
+
+    def test_other_mode_conflicts_with_pending_job(self, queue):
+        """A different mode for a busy key raises instead of starting a job."""
+        release = threading.Event()
+        first = queue.submit("snippets:1", release.wait, 5, mode="incremental")
+
+        with pytest.raises(JobConflict) as exc_info:
+            queue.submit("snippets:1", lambda: None, mode="full")
+        same = queue.submit("snippets:1", lambda: None, mode="incremental")
+
+        assert exc_info.value.active is first
+        assert same is first
+
+        release.set()
+        assert first.wait(timeout=5)
+        assert queue.submit("snippets:1", lambda: None, mode="full").mode == "full"
+
+    def test_new_job_after_previous_finished(self, queue):
+        """Once a job is done, the same key starts a fresh job."""
+        first = queue.submit("snippets:1", lambda: 1)
+        first.wait(timeout=5)
+
+        second = queue.submit("snippets:1", lambda: 2)
+        second.wait(timeout=5)
+
+        assert second.id != first.id
+        assert second.result == 2
+
+    def test_prunes_expired_finished_jobs(self, clock):
+        """Finished jobs older than the retention window are dropped."""
+        queue = JobQueue(max_workers=1, retention_seconds=60, clock=clock)
+        try:
+            old = queue.submit("a", lambda: 1)
+            old.wait(timeout=5)
+
+            clock.now += 61
+            new = queue.submit("b", lambda: 2)
+            new.wait(timeout=5)
+
+            assert queue.get(old.id) is None
+            assert queue.get(new.id) is new
+        finally:
+            queue.shutdown()
+
+    def test_caps_number_of_finished_jobs(self):
+        """Only the newest max_finished finished jobs are kept."""
+        queue = JobQueue(max_workers=1, max_finished=2)
+        try:
+            jobs = []
+            for i in range(4):
+                job = queue.submit(f"k{i}", lambda: None)
+                job.wait(timeout=5)
+                jobs.append(job)
+            queue.submit("last", lambda: None).wait(timeout=5)
+
+            assert queue.get(jobs[0].id) is None
+            assert queue.get(jobs[1].id) is None
+            assert queue.get(jobs[3].id) is jobs[3]
+        finally:
+            queue.shutdown()
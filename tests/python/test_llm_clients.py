@@ -0,0 +1,102 @@
+"""
+Unit tests for backend/app/core/llm_clients.py
+
+Tests the process-wide chat model client registry.
+"""
+
+from unittest.mock import Mock, patch
+
+from langchain_core.messages import HumanMessage
+
+from backend.app.core.llm_clients import LLMClientRegistry
+
+
+class TestLLMClientRegistry:
+    """Test LLMClientRegistry caching."""
+
+    def test_reuses_client_for_same_model_and_temperature(self):
+        """Should build a client once and return it on later calls."""
+        registry = LLMClientRegistry()
+        factory = Mock(side_effect=lambda model, temp: Mock(name=model))
+
+        first = registry.get("model-a", 0.7, factory)
+        second = registry.get("model-a", 0.7, factory)
+
+        assert first is second
+        factory.assert_called_once_with("model-a", 0.7)
+
+    def test_separate_clients_per_temperature(self):
+        """Should key clients by (model, temperature)."""
+        registry = LLMClientRegistry()
+        factory = Mock(side_effect=lambda model, temp: Mock())
+
+        warm = registry.get("model-a", 0.7, factory)
+        cold = registry.get("model-a", 0.0, factory)
+
+        assert warm is not cold
+        assert sorted(registry.keys()) == [("model-a", 0.0), ("model-a", 0.7)]
+
+    def test_warm_up_skips_failures(self):
+        """Should warm every model it can and report which succeeded."""
+        registry = LLMClientRegistry()
+
+        def factory(model, temp):
+            if model == "broken":
+                raise ValueError("bad model")
+            return Mock()
+
+        warmed = registry.warm_up(["model-a", "broken", "model-b"], 0.7, factory)
+
+        assert warmed == ["model-a", "model-b"]
+        assert len(registry.keys()) == 2
+
+    def test_clear_drops_clients(self):
+        """Should rebuild clients after clear()."""
+        registry = LLMClientRegistry()
+        factory = Mock(side_effect=lambda model, temp: Mock())
+
+        registry.get("model-a", 0.7, factory)
+        registry.clear()
+        registry.get("model-a", 0.7, factory)
+
+        assert factory.call_count == 2
+
+
+class TestAgentClientReuse:
+    """Test that the agent reuses registry clients across requests."""
+
+    def test_chatbot_node_builds_client_once(self, mock_langchain_response):
+        """Should construct the model client only on the first request."""
+        from backend.app.core.agent import chatbot_node
+
+        state = {
+            "messages": [HumanMessage(content="Hello")],
+            "phase_instruction": "Test instruction",
+        }
+
+        with patch("backend.app.core.agent.get_model_cascade") as mock_cascade:
+            mock_cascade.return_value = ["model-1"]
+
+            with patch(
+                "backend.app.core.agent.ChatGoogleGenerativeAI"
+            ) as mock_llm_class:
+                mock_llm = Mock()
+                mock_llm.invoke.return_value = mock_langchain_response
+                mock_llm_class.return_value = mock_llm
+
+                chatbot_node(state)
+                chatbot_node(state)
+
+                assert mock_llm_class.call_count == 1
+                assert mock_llm.invoke.call_count == 2
+
+    def test_warm_up_builds_cascade_clients(self):
+        """Should pre-build a client for every model in the cascade."""
+        from backend.app.core.agent import warm_up_llm_clients
+
+        with patch("backend.app.core.agent.ChatGoogleGenerativeAI") as mock_llm_class:
+            warmed = warm_up_llm_clients()
+
+        # conftest sets GEMINI_MODELS=test-model-1,test-model-2,test-model-3
+        assert warmed == ["test-model-1", "test-model-2", "test-model-3"]
+        assert mock_llm_class.call_count == 3
@@ -0,0 +1,314 @@
+"""
+Unit tests for backend/app/core/llm_scheduler.py
+
+Tests per-model concurrency limits, quota buckets, priority and per-user
+fairness of the outbound scheduler, and its use by the agent.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_CHAT,
+    ModelLimits,
+    OutboundScheduler,
+    QueueTimeout,
+    TokenBucket,
+    caller_config,
+    caller_from_config,
+    parse_model_limits,
+)
+
+
+def wait_until(condition, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition never became true"
+        time.sleep(0.005)
+
+
+def queued(scheduler: OutboundScheduler, model_name: str = "m") -> int:
+    return scheduler.snapshot().get(model_name, {}).get("queued", 0)
+
+
+def start_waiter(scheduler, order, label, user_key, priority):
+    """Queue a call in a thread that records its label once granted."""
+
+    def run():
+        with scheduler.slot("m", user_key, priority):
+            order.append(label)
+
+    thread = threading.Thread(target=run)
+    before = queued(scheduler)
+    thread.start()
+    wait_until(lambda: queued(scheduler) == before + 1)
+    return thread
+
+
+class TestConfiguration:
+    """Test limit parsing and caller config."""
+
+    def test_parse_model_limits(self):
+        """Should read concurrency:rpm:tpm per model, defaulting the rest."""
+        limits = parse_model_limits("a=2:10:5000, b=3,bad")
+
+        assert limits["a"] == ModelLimits(max_concurrency=2, rpm=10, tpm=5000)
+        assert limits["b"].max_concurrency == 3
+        assert limits["b"].rpm == ModelLimits().rpm
+        assert "bad" not in limits
+
+    def test_caller_config_round_trip(self):
+        """Should carry user and priority through a RunnableConfig."""
+        config = caller_config(7, PRIORITY_BACKGROUND)
+
+        assert caller_from_config(config) == (7, PRIORITY_BACKGROUND)
+        assert caller_from_config(None) == (None, PRIORITY_CHAT)
+
+
+class TestTokenBucket:
+    """Test TokenBucket."""
+
+    def test_waits_for_refill(self):
+        """Should report the time until enough units have refilled."""
+        bucket = TokenBucket(60, now=0.0)
+        bucket.take(60, now=0.0)
+
+        assert bucket.wait_time(1, now=0.0) == pytest.approx(1.0)
+        assert bucket.wait_time(1, now=1.0) == 0.0
+
+    def test_zero_rate_is_unlimited(self):
+        """A bucket with no rate should never make a call wait."""
+        bucket = TokenBucket(0, now=0.0)
+        bucket.take(1000, now=0.0)
+
+        assert bucket.wait_time(1000, now=0.0) == 0.0
+
+
+class TestOutboundScheduler:
+    """Test OutboundScheduler."""
+
+    def test_limits_concurrency_per_model(self):
+        """Should hold calls beyond the limit until a slot is released."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1))
+        first = scheduler.acquire("m")
+        order = []
+
+        thread = start_waiter(scheduler, order, "second", 1, PRIORITY_CHAT)
+        assert order == []
+        # Other models have their own slots
+        scheduler.acquire("other").release()
+
+        first.release()
+        thread.join(timeout=2)
+
+        assert order == ["second"]
+        assert scheduler.snapshot()["m"]["in_flight"] == 0
+
+    def test_chat_goes_before_background_work(self):
+        """Should serve waiting chat calls before snippet and summary jobs."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1))
+        held = scheduler.acquire("m")
+        order = []
+
+        threads = [
+            start_waiter(scheduler, order, "snippets", 1, PRIORITY_BACKGROUND),
+            start_waiter(scheduler, order, "chat", 2, PRIORITY_CHAT),
+        ]
+        held.release()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert order == ["chat", "snippets"]
+
+    def test_round_robin_across_users(self):
+        """One user's burst should not starve another user."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1))
+        held = scheduler.acquire("m")
+        order = []
+
+        threads = [
+            start_waiter(scheduler, order, "a1", "a", PRIORITY_CHAT),
+            start_waiter(scheduler, order, "a2", "a", PRIORITY_CHAT),
+            start_waiter(scheduler, order, "b1", "b", PRIORITY_CHAT),
+        ]
+        held.release()
+        for thread in threads:
+            thread.join(timeout=2)
+
+        assert order == ["a1", "b1", "a2"]
+
+    def test_rate_limit_spaces_out_calls(self):
+        """Should hold calls once the requests-per-minute bucket is empty."""
+        scheduler = OutboundScheduler(
+            ModelLimits(max_concurrency=5, rpm=600), queue_timeout=2
+        )
+        for _ in range(600):
+            scheduler.acquire("m").release()
+
+        started = time.monotonic()
+        scheduler.acquire("m").release()
+
+        # 600 rpm refills one request every 0.1s
+        assert time.monotonic() - started >= 0.05
+
+    def test_queue_timeout(self):
+        """Should give up when no slot frees up in time."""
+        scheduler = OutboundScheduler(
+            ModelLimits(max_concurrency=1), queue_timeout=0.05
+        )
+        scheduler.acquire("m")
+
+        with pytest.raises(QueueTimeout):
+            scheduler.acquire("m")
+
+        stats = scheduler.snapshot()["m"]
+        assert stats["timeouts"] == 1
+        assert stats["queued"] == 0
+
+    def test_caller_timeout_caps_queue_timeout(self):
+        """A shorter caller timeout should win over the queue timeout."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1), queue_timeout=30)
+        scheduler.acquire("m")
+
+        started = time.monotonic()
+        with pytest.raises(QueueTimeout):
+            scheduler.acquire("m", timeout=0.05)
+
+        assert time.monotonic() - started < 1
+
+    def test_record_usage_charges_actual_tokens(self):
+        """Should replace the token estimate with the reported usage."""
+        scheduler = OutboundScheduler(ModelLimits(tpm=1000))
+        permit = scheduler.acquire("m", tokens=100)
+
+        permit.record_usage(
+            AIMessage(
+                content="Hi",
+                usage_metadata={
+                    "input_tokens": 600,
+                    "output_tokens": 300,
+                    "total_tokens": 900,
+                },
+            )
+        )
+        permit.release()
+
+        lane = scheduler._lanes["m"]
+        assert lane.token_budget.tokens == pytest.approx(100, abs=1)
+
+    @pytest.mark.asyncio
+    async def test_async_acquire_waits_without_blocking_loop(self):
+        """Should await a slot released by another task."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1))
+        held = await scheduler.aacquire("m")
+
+        waiting = asyncio.create_task(scheduler.aacquire("m"))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        held.release()
+        permit = await asyncio.wait_for(waiting, timeout=1)
+        permit.release()
+
+        assert scheduler.snapshot()["m"]["granted"] == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self):
+        """A cancelled call should not keep its place or a slot."""
+        scheduler = OutboundScheduler(ModelLimits(max_concurrency=1))
+        held = await scheduler.aacquire("m")
+
+        waiting = asyncio.create_task(scheduler.aacquire("m"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        held.release()
+
+        stats = scheduler.snapshot()["m"]
+        assert stats["queued"] == 0
+        assert stats["in_flight"] == 0
+
+
+class TestAgentScheduling:
+    """Test the agent nodes taking scheduler slots."""
+
+    def test_queue_timeout_moves_to_next_model(self):
+        """A busy model should be skipped without opening its circuit."""
+        from backend.app.core import agent
+        from backend.app.core.model_health import model_health
+
+        scheduler = OutboundScheduler(
+            model_limits={"test-model-1": ModelLimits(max_concurrency=0)},
+            queue_timeout=0.01,
+        )
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content="Hi")
+        state = {"messages": [HumanMessage(content="Hello")], "phase_instruction": "x"}
+
+        with patch.object(agent, "llm_scheduler", scheduler):
+            with patch.object(agent, "_create_llm", return_value=mock_llm):
+                result = agent.chatbot_node(state, caller_config(7, PRIORITY_CHAT))
+
+        assert result["messages"][0].content == "Hi"
+        assert model_health.is_available("test-model-1")
+        stats = scheduler.snapshot()
+        assert stats["test-model-1"]["timeouts"] == 1
+        assert stats["test-model-2"]["granted"] == 1
+
+    def test_queue_waits_stop_at_request_deadline(self):
+        """Waits across the cascade should end with the retry deadline."""
+        from backend.app.core import agent
+        from backend.app.core.retry_policy import RetryPolicy
+
+        scheduler = OutboundScheduler(
+            ModelLimits(max_concurrency=0), queue_timeout=30
+        )
+        mock_llm = MagicMock()
+        state = {"messages": [HumanMessage(content="Hello")], "phase_instruction": "x"}
+
+        started = time.monotonic()
+        with patch.object(agent, "llm_scheduler", scheduler):
+            with patch.object(agent, "retry_policy", RetryPolicy(deadline=0.1)):
+                with patch.object(agent, "_create_llm", return_value=mock_llm):
+                    with pytest.raises(QueueTimeout):
+                        agent.chatbot_node(state, caller_config(7, PRIORITY_CHAT))
+
+        assert time.monotonic() - started < 5
+        stats = scheduler.snapshot()
+        assert stats["test-model-1"]["timeouts"] == 1
+        assert "test-model-2" not in stats
+        mock_llm.invoke.assert_not_called()
+
+    def test_snippet_cascade_skips_busy_model(self, mock_db_session):
+        """Snippet calls should also move on when a model has no free slot."""
+        from backend.app.services import snippets
+        from backend.app.services.snippets import SnippetService
+
+        scheduler = OutboundScheduler(
+            model_limits={"test-model-1": ModelLimits(max_concurrency=0)},
+            queue_timeout=0.01,
+        )
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content='{"snippets": []}')
+
+        with patch.object(snippets, "llm_scheduler", scheduler):
+            with patch.object(snippets.llm_clients, "get", return_value=mock_llm):
+                result = SnippetService(mock_db_session)._call_model_cascade(
+                    "system", "prompt", user_id=1
+                )
+
+        assert result["model"] == "test-model-2"
+        assert scheduler.snapshot()["test-model-1"]["timeouts"] == 1
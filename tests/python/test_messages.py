@@ -0,0 +1,81 @@
+"""
+Tests for the /api/messages feed.
+"""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.core.pagination import NEXT_CURSOR_HEADER
+from backend.app.main import app
+from backend.app.models.message import Message
+from backend.app.models.story import Story
+from backend.app.models.user import User
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def other_story(mock_db_session):
+    """A story of another user, with one message."""
+    other = User(email="other@example.com", hashed_password="x", is_active=True)
+    mock_db_session.add(other)
+    mock_db_session.commit()
+    story = Story(user_id=other.id, title="Not yours")
+    mock_db_session.add(story)
+    mock_db_session.commit()
+    mock_db_session.add(Message(story_id=story.id, role="user", content="secret"))
+    mock_db_session.commit()
+    return story
+
+
+class TestMessageFeed:
+    """Tests for read_messages."""
+
+    def test_requires_authentication(self):
+        response = client.get("/api/messages/")
+
+        assert response.status_code == 401
+
+    def test_only_returns_own_messages(
+        self, authed, mock_db_session, sample_story, other_story, add_messages
+    ):
+        """Messages of other users' stories should never be listed."""
+        rows = add_messages(mock_db_session, sample_story.id, 2)
+
+        response = client.get("/api/messages/")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [m["id"] for m in data] == [m.id for m in rows]
+        assert {m["story_id"] for m in data} == {sample_story.id}
+        assert "secret" not in response.text
+
+    def test_filters_by_story(
+        self, authed, mock_db_session, sample_user, sample_story, add_messages
+    ):
+        second = Story(user_id=sample_user.id, title="Second")
+        mock_db_session.add(second)
+        mock_db_session.commit()
+        add_messages(mock_db_session, sample_story.id, 2)
+        wanted = add_messages(mock_db_session, second.id, 1)
+
+        response = client.get("/api/messages/", params={"story_id": second.id})
+
+        assert [m["id"] for m in response.json()] == [wanted[0].id]
+
+    def test_limit_is_capped(self, authed, mock_db_session, sample_story, add_messages):
+        """Asking for a huge page should still return at most the cap."""
+        rows = add_messages(mock_db_session, sample_story.id, 3)
+
+        with patch("backend.app.api.endpoints.messages.PAGE_SIZE_MAX", 2):
+            first = client.get("/api/messages/", params={"limit": 10_000})
+            second = client.get(
+                "/api/messages/", params={"cursor": first.headers[NEXT_CURSOR_HEADER]}
+            )
+
+        assert len(first.json()) == 2
+        assert [m["id"] for m in first.json() + second.json()] == [
+            m.id for m in rows
+        ]
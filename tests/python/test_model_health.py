@@ -0,0 +1,228 @@
+"""
+Unit tests for backend/app/core/model_health.py
+
+Tests the per-model circuit breaker shared by the agent and SnippetService.
+"""
+
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from langchain_core.messages import HumanMessage
+
+from backend.app.core.model_health import ModelCircuitBreaker, is_rate_limit_error
+
+
+@pytest.fixture
+def breaker(clock):
+    return ModelCircuitBreaker(
+        rate_limit_cooldown=60, failure_threshold=2, failure_cooldown=30, clock=clock
+    )
+
+
+class TestIsRateLimitError:
+    """Test rate-limit detection."""
+
+    @pytest.mark.parametrize(
+        "message", ["429 Too Many Requests", "RESOURCE_EXHAUSTED", "quota exceeded"]
+    )
+    def test_detects_rate_limits(self, message):
+        assert is_rate_limit_error(Exception(message))
+
+    def test_ignores_other_errors(self):
+        assert not is_rate_limit_error(ValueError("Invalid input format"))
+
+
+class TestModelCircuitBreaker:
+    """Test circuit breaker state transitions."""
+
+    def test_unknown_model_is_available(self, breaker):
+        assert breaker.is_available("model-1")
+
+    def test_rate_limit_opens_until_cooldown(self, breaker, clock):
+        """Should skip a rate-limited model until its cooldown expires."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+
+        assert breaker.available_models(["model-1", "model-2"]) == ["model-2"]
+
+        clock.now += 61
+        assert breaker.available_models(["model-1", "model-2"]) == [
+            "model-1",
+            "model-2",
+        ]
+        assert breaker.snapshot()["model-1"]["state"] == "half_open"
+
+    def test_failures_open_at_threshold(self, breaker):
+        """Should tolerate failures below the threshold."""
+        breaker.record_failure("model-1", ValueError("boom"))
+        assert breaker.is_available("model-1")
+
+        breaker.record_failure("model-1", ValueError("boom"))
+        assert not breaker.is_available("model-1")
+
+    def test_failed_probe_reopens(self, breaker, clock):
+        """Should reopen immediately when the half-open probe fails."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+
+        breaker.record_failure("model-1", ValueError("still broken"))
+
+        assert not breaker.is_available("model-1")
+
+    def test_success_closes(self, breaker, clock):
+        """Should reset the model after a successful call."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+
+        breaker.record_success("model-1")
+
+        state = breaker.snapshot()["model-1"]
+        assert state["state"] == "closed"
+        assert state["consecutive_failures"] == 0
+
+    def test_half_open_allows_single_probe(self, breaker, clock):
+        """Should let only one caller probe a half-open model at a time."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+
+        first = breaker.available_models(["model-1", "model-2"])
+        second = breaker.available_models(["model-1", "model-2"])
+
+        assert first == ["model-1", "model-2"]
+        assert second == ["model-2"]
+        assert not breaker.is_available("model-1")
+        assert breaker.snapshot()["model-1"]["probing"] is True
+
+    def test_resolved_probe_frees_model(self, breaker, clock):
+        """Should admit everyone again once the probe succeeds."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+        breaker.available_models(["model-1"])
+
+        breaker.record_success("model-1")
+
+        assert breaker.available_models(["model-1"]) == ["model-1"]
+        assert breaker.available_models(["model-1"]) == ["model-1"]
+
+    def test_abandoned_probe_expires(self, clock):
+        """Should hand the probe to another caller after probe_timeout."""
+        breaker = ModelCircuitBreaker(
+            rate_limit_cooldown=60, probe_timeout=5, clock=clock
+        )
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+        breaker.available_models(["model-1", "model-2"])
+
+        clock.now += 6
+
+        assert breaker.available_models(["model-1", "model-2"]) == [
+            "model-1",
+            "model-2",
+        ]
+
+    def test_busy_error_releases_probe(self, clock):
+        """Should free the probe when the call never reached the model."""
+        from backend.app.core import retry_policy
+        from backend.app.core.llm_scheduler import QueueTimeout
+
+        breaker = ModelCircuitBreaker(rate_limit_cooldown=60, clock=clock)
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 61
+        breaker.available_models(["model-1", "model-2"])
+
+        with patch.object(retry_policy, "model_health", breaker):
+            retry_policy.record_model_error(
+                "model-1", QueueTimeout("busy"), retry_policy.ERROR_BUSY
+            )
+
+        assert breaker.available_models(["model-1", "model-2"]) == [
+            "model-1",
+            "model-2",
+        ]
+
+    def test_all_open_returns_soonest_probe(self, breaker, clock):
+        """Should offer the model that recovers first when all are open."""
+        breaker.record_rate_limit("model-1", Exception("429"))
+        clock.now += 10
+        breaker.record_rate_limit("model-2", Exception("429"))
+
+        assert breaker.available_models(["model-1", "model-2"]) == ["model-1"]
+
+    def test_snapshot_reports_cooldown(self, breaker, clock):
+        breaker.record_rate_limit("model-1", Exception("429 quota"))
+        clock.now += 15
+
+        state = breaker.snapshot()["model-1"]
+        assert state["state"] == "open"
+        assert state["rate_limited"] is True
+        assert state["retry_in_seconds"] == 45.0
+        assert "429" in state["last_error"]
+
+
+class TestBreakerIntegration:
+    """Test that the agent and snippet cascades consult the breaker."""
+
+    def test_agent_skips_rate_limited_model_on_next_request(
+        self, mock_langchain_response
+    ):
+        """Should not retry a model that just returned 429."""
+        from backend.app.core.agent import chatbot_node
+
+        state = {
+            "messages": [HumanMessage(content="Hello")],
+            "phase_instruction": "Test instruction",
+        }
+
+        with patch("backend.app.core.agent.get_model_cascade") as mock_cascade:
+            mock_cascade.return_value = ["model-1", "model-2"]
+
+            with patch(
+                "backend.app.core.agent.ChatGoogleGenerativeAI"
+            ) as mock_llm_class:
+                mock_llm_1 = Mock()
+                mock_llm_1.invoke.side_effect = Exception("429 rate limit")
+                mock_llm_2 = Mock()
+                mock_llm_2.invoke.return_value = mock_langchain_response
+                mock_llm_class.side_effect = [mock_llm_1, mock_llm_2]
+
+                chatbot_node(state)
+                chatbot_node(state)
+
+                assert mock_llm_1.invoke.call_count == 1
+                assert mock_llm_2.invoke.call_count == 2
+
+    def test_snippets_skip_model_opened_by_agent(self, mock_db_session, sample_story):
+        """Should share breaker state between the agent and SnippetService."""
+        from backend.app.core.model_health import model_health
+        from backend.app.models.message import Message
+        from backend.app.services.snippets import SnippetService
+
+        mock_db_session.add(
+            Message(story_id=sample_story.id, role="user", content="I grew up by the sea.")
+        )
+        mock_db_session.commit()
+
+        # conftest sets GEMINI_MODELS=test-model-1,test-model-2,test-model-3
+        model_health.record_rate_limit("test-model-1", Exception("429"))
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            mock_llm = Mock()
+            mock_llm.invoke.return_value = Mock(content='{"snippets": []}')
+            MockLLM.return_value = mock_llm
+
+            SnippetService(mock_db_session).generate_snippets(sample_story.id)
+
+            models_tried = [call.kwargs["model"] for call in MockLLM.call_args_list]
+            assert models_tried == ["test-model-2"]
+
+    def test_health_endpoint_exposes_state(self):
+        """Should report breaker state on /health/models."""
+        from backend.app.core.model_health import model_health
+        from backend.app.main import app
+
+        model_health.record_rate_limit("test-model-1", Exception("429"))
+
+        response = TestClient(app).get("/health/models")
+
+        assert response.status_code == 200
+        assert response.json()["models"]["test-model-1"]["state"] == "open"
@@ -0,0 +1,199 @@
+"""
+Unit tests for backend/app/core/pagination.py
+
+Tests cursor encoding, keyset paging and its use by the story and message
+listings and the SQLAlchemy repositories.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.pagination import (
+    NEXT_CURSOR_HEADER,
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+from backend.app.main import app
+from backend.app.models.message import Message
+from backend.app.models.story import Story
+
+client = TestClient(app)
+
+
+class TestCursors:
+    """Test encode_cursor and decode_cursor."""
+
+    def test_round_trip(self):
+        """Should restore datetimes and ids from an opaque cursor."""
+        key = [datetime(2024, 1, 1, 12, 30), 42]
+        cursor = encode_cursor(key)
+
+        assert "42" not in cursor
+        assert decode_cursor(cursor, (Message.created_at, Message.id)) == key
+
+    @pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor(["x"]), "e30"])
+    def test_rejects_bad_cursors(self, cursor):
+        with pytest.raises(InvalidCursor):
+            decode_cursor(cursor, (Message.id,))
+
+    def test_rejects_cursor_of_other_listing(self):
+        """A one-column cursor should not seek a two-column listing."""
+        with pytest.raises(InvalidCursor):
+            decode_cursor(encode_cursor([1]), (Message.created_at, Message.id))
+
+
+class TestFetchPage:
+    """Test fetch_page."""
+
+    def test_pages_cover_all_rows_once(
+        self, mock_db_session, sample_story, add_messages
+    ):
+        """Rows sharing a timestamp should be split by id, not lost or repeated."""
+        same_time = datetime(2024, 1, 1, 12, 0)
+        rows = add_messages(mock_db_session, sample_story.id, 5, same_time)
+        query = mock_db_session.query(Message).filter(
+            Message.story_id == sample_story.id
+        )
+        columns = (Message.created_at, Message.id)
+
+        seen, cursor, pages = [], None, 0
+        while True:
+            page, cursor = fetch_page(query, columns, cursor, limit=2)
+            seen.extend(m.id for m in page)
+            pages += 1
+            if cursor is None:
+                break
+
+        assert seen == [m.id for m in rows]
+        assert pages == 3
+
+    def test_exact_page_has_no_next_cursor(
+        self, mock_db_session, sample_story, add_messages
+    ):
+        add_messages(mock_db_session, sample_story.id, 2)
+        query = mock_db_session.query(Message)
+
+        page, cursor = fetch_page(query, (Message.id,), limit=2)
+
+        assert len(page) == 2
+        assert cursor is None
+
+    def test_descending(self, mock_db_session, sample_story, add_messages):
+        rows = add_messages(mock_db_session, sample_story.id, 3)
+        query = mock_db_session.query(Message)
+
+        first, cursor = fetch_page(query, (Message.id,), limit=2, descending=True)
+        second, _ = fetch_page(query, (Message.id,), cursor, 2, descending=True)
+
+        assert [m.id for m in first + second] == [m.id for m in reversed(rows)]
+
+
+class TestPaginatedEndpoints:
+    """Test the cursor parameters of the list endpoints."""
+
+    def test_list_stories_follows_cursor(self, authed, mock_db_session, sample_user):
+        """Should split the stories into pages linked by X-Next-Cursor."""
+        for i in range(3):
+            mock_db_session.add(Story(user_id=sample_user.id, title=f"S{i}"))
+        mock_db_session.commit()
+
+        first = client.get("/api/stories/", params={"limit": 2})
+        second = client.get(
+            "/api/stories/",
+            params={"limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]},
+        )
+
+        assert [s["title"] for s in first.json()] == ["S0", "S1"]
+        assert [s["title"] for s in second.json()] == ["S2"]
+        assert NEXT_CURSOR_HEADER not in second.headers
+
+    def test_invalid_cursor_is_rejected(self, authed):
+        response = client.get("/api/stories/", params={"cursor": "garbage!"})
+
+        assert response.status_code == 400
+
+    def test_story_messages_paginate(
+        self, authed, mock_db_session, sample_story, add_messages
+    ):
+        """Each page should have its own ETag and link to the next one."""
+        rows = add_messages(mock_db_session, sample_story.id, 3)
+        url = f"/api/stories/{sample_story.id}/messages"
+
+        first = client.get(url, params={"limit": 2})
+        second = client.get(
+            url, params={"limit": 2, "cursor": first.headers[NEXT_CURSOR_HEADER]}
+        )
+
+        assert [m["id"] for m in first.json()] == [rows[0].id, rows[1].id]
+        assert [m["id"] for m in second.json()] == [rows[2].id]
+        assert first.headers["ETag"] != second.headers["ETag"]
+
+    def test_read_messages_uses_cursor_not_offset(
+        self, authed, mock_db_session, sample_story, add_messages
+    ):
+        rows = add_messages(mock_db_session, sample_story.id, 3)
+
+        first = client.get("/api/messages/", params={"limit": 2})
+        second = client.get(
+            "/api/messages/", params={"cursor": first.headers[NEXT_CURSOR_HEADER]}
+        )
+
+        assert [m["id"] for m in first.json() + second.json()] == [
+            m.id for m in rows
+        ]
+
+
+class TestRepositoryPages:
+    """Test the keyset pages of the SQLAlchemy repositories."""
+
+    def test_message_repository_pages(
+        self, mock_db_session, sample_story, add_messages
+    ):
+        from backend.infrastructure.persistence.repositories import (
+            SQLAlchemyMessageRepository,
+        )
+
+        rows = add_messages(mock_db_session, sample_story.id, 3)
+        repo = SQLAlchemyMessageRepository(mock_db_session)
+
+        first = repo.get_by_story_id(sample_story.id, limit=2)
+        second = repo.get_by_story_id(sample_story.id, first.next_cursor, limit=2)
+
+        assert [m.id for m in first.items + second.items] == [m.id for m in rows]
+        assert second.next_cursor is None
+
+    def test_list_stories_use_case_returns_cursor(
+        self, mock_db_session, sample_user, sample_story
+    ):
+        from backend.application.use_cases.story import (
+            ListStoriesInput,
+            ListStoriesUseCase,
+        )
+        from backend.infrastructure.persistence.repositories import (
+            SQLAlchemyStoryRepository,
+        )
+
+        mock_db_session.add(Story(user_id=sample_user.id, title="Second"))
+        mock_db_session.commit()
+        use_case = ListStoriesUseCase(SQLAlchemyStoryRepository(mock_db_session))
+
+        first = use_case.execute(ListStoriesInput(user_id=sample_user.id, limit=1))
+        second = use_case.execute(
+            ListStoriesInput(
+                user_id=sample_user.id, cursor=first.next_cursor, limit=1
+            )
+        )
+
+        assert [s.id for s in first.stories] == [sample_story.id]
+        assert [s.title for s in second.stories] == ["Second"]
+        assert second.next_cursor is None
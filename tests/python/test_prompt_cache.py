@@ -0,0 +1,292 @@
+"""
+Unit tests for backend/app/core/prompt_cache.py
+
+Tests prefix fingerprinting, provider context caching and the agent's use
+of cached prompts.
+"""
+
+import sys
+import threading
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.prompt_cache import (
+    PromptPrefixCache,
+    is_caching_unsupported,
+    split_prefix,
+)
+
+LONG_PROMPT = "You are a biographer. " * 400
+
+
+class FakeProvider:
+    """Records create() calls and hands out numbered cache names."""
+
+    def __init__(self, fail: bool = False, error: Exception = None):
+        self.fail = fail
+        self.error = error or ValueError("model does not support caching")
+        self.calls = []
+        self.threads = []
+
+    def create(self, model_name, system_instruction, ttl_seconds):
+        self.calls.append((model_name, ttl_seconds))
+        self.threads.append(threading.current_thread())
+        if self.fail:
+            raise self.error
+        return f"cachedContents/{len(self.calls)}"
+
+
+def prompt(system: str, text: str = "Hello"):
+    return [SystemMessage(content=system), HumanMessage(content=text)]
+
+
+class TestPrefixFingerprints:
+    """Test the local fingerprint cache."""
+
+    def test_split_prefix(self):
+        """Should split leading system messages from the conversation."""
+        messages = prompt("Phase prompt")
+
+        prefix, conversation = split_prefix(messages)
+
+        assert prefix == messages[:1]
+        assert conversation == messages[1:]
+
+    def test_counts_repeated_prefixes(self):
+        """Should count a prefix hit when the system prompt repeats."""
+        cache = PromptPrefixCache()
+
+        cache.prepare("m", prompt("Phase A", "first"))
+        cache.prepare("m", prompt("Phase A", "second"))
+        cache.prepare("m", prompt("Phase B"))
+
+        stats = cache.snapshot()
+        assert stats["requests"] == 3
+        assert stats["prefix_hits"] == 1
+        assert stats["prefixes"] == 2
+        assert stats["prefix_hit_rate"] == pytest.approx(0.333)
+
+    def test_prefixes_are_per_model(self):
+        """Should key prefixes by model, as provider caches are per model."""
+        cache = PromptPrefixCache()
+
+        cache.prepare("m1", prompt("Phase A"))
+        cache.prepare("m2", prompt("Phase A"))
+
+        assert cache.snapshot()["prefix_hits"] == 0
+
+    def test_evicts_least_recently_used(self):
+        """Should keep at most max_entries prefixes."""
+        cache = PromptPrefixCache(max_entries=2)
+
+        for system in ("A", "B", "C"):
+            cache.prepare("m", prompt(system))
+        cache.prepare("m", prompt("A"))
+
+        stats = cache.snapshot()
+        assert stats["prefixes"] == 2
+        assert stats["prefix_hits"] == 0
+
+    def test_without_provider_sends_full_prompt(self):
+        """Should leave the prompt untouched when no provider is configured."""
+        cache = PromptPrefixCache()
+        messages = prompt(LONG_PROMPT)
+
+        prepared = cache.prepare("m", messages)
+
+        assert prepared.messages == messages
+        assert prepared.cached_content is None
+
+    def test_record_usage_counts_cache_reads(self):
+        """Should add up input and provider cache-read tokens."""
+        cache = PromptPrefixCache()
+        response = AIMessage(
+            content="Hi",
+            usage_metadata={
+                "input_tokens": 1200,
+                "output_tokens": 10,
+                "total_tokens": 1210,
+                "input_token_details": {"cache_read": 1000},
+            },
+        )
+
+        cache.record_usage(response)
+        cache.record_usage(AIMessage(content="No usage"))
+
+        stats = cache.snapshot()
+        assert stats["input_tokens"] == 1200
+        assert stats["cache_read_tokens"] == 1000
+
+
+class TestProviderCaching:
+    """Test provider context caching."""
+
+    def test_caches_long_prefix_and_strips_system_message(self):
+        """Should create one provider cache and send only the conversation."""
+        provider = FakeProvider()
+        cache = PromptPrefixCache(provider=provider, min_provider_tokens=1000)
+
+        first = cache.prepare("m", prompt(LONG_PROMPT, "first"))
+        second = cache.prepare("m", prompt(LONG_PROMPT, "second"))
+
+        assert len(provider.calls) == 1
+        assert first.cached_content == second.cached_content == "cachedContents/1"
+        assert [m.content for m in second.messages] == ["second"]
+        assert cache.snapshot()["provider_hits"] == 1
+
+    def test_skips_short_prefix(self):
+        """Should not create caches below the provider's minimum size."""
+        provider = FakeProvider()
+        cache = PromptPrefixCache(provider=provider, min_provider_tokens=1000)
+
+        prepared = cache.prepare("m", prompt("Short phase prompt"))
+
+        assert provider.calls == []
+        assert prepared.cached_content is None
+
+    def test_recreates_expired_cache(self, clock):
+        """Should create a new provider cache once the old one nears expiry."""
+        provider = FakeProvider()
+        cache = PromptPrefixCache(
+            provider=provider, min_provider_tokens=1000, ttl_seconds=600, clock=clock
+        )
+
+        cache.prepare("m", prompt(LONG_PROMPT))
+        clock.now += 600
+        prepared = cache.prepare("m", prompt(LONG_PROMPT))
+
+        assert prepared.cached_content == "cachedContents/2"
+
+    def test_remembers_unsupported_models(self):
+        """Should stop trying a model whose cache creation failed."""
+        provider = FakeProvider(fail=True)
+        cache = PromptPrefixCache(provider=provider, min_provider_tokens=1000)
+
+        first = cache.prepare("gemma", prompt(LONG_PROMPT))
+        cache.prepare("gemma", prompt(LONG_PROMPT))
+
+        assert first.cached_content is None
+        assert len(provider.calls) == 1
+        assert cache.snapshot()["unsupported_models"] == ["gemma"]
+
+    def test_retries_after_transient_error(self, clock):
+        """Should pause, not give up on, a model whose cache creation timed out."""
+        provider = FakeProvider(fail=True, error=TimeoutError("deadline exceeded"))
+        cache = PromptPrefixCache(
+            provider=provider, min_provider_tokens=1000, retry_seconds=60, clock=clock
+        )
+
+        cache.prepare("m", prompt(LONG_PROMPT))
+        cache.prepare("m", prompt(LONG_PROMPT))
+        assert len(provider.calls) == 1
+        assert cache.snapshot()["unsupported_models"] == []
+
+        provider.fail = False
+        clock.now += 61
+        prepared = cache.prepare("m", prompt(LONG_PROMPT))
+
+        assert prepared.cached_content == "cachedContents/2"
+
+    @pytest.mark.parametrize(
+        "status, unsupported", [(400, True), (404, True), (429, False), (503, False)]
+    )
+    def test_unsupported_only_for_client_errors(self, status, unsupported):
+        """Should treat 4xx (but not 408/429) as caching unsupported."""
+        error = Exception("cache create failed")
+        error.code = status
+
+        assert is_caching_unsupported(error) is unsupported
+
+    @pytest.mark.asyncio
+    async def test_aprepare_creates_cache_off_event_loop(self):
+        """The async path should not run the blocking create on the loop thread."""
+        provider = FakeProvider()
+        cache = PromptPrefixCache(provider=provider, min_provider_tokens=1000)
+
+        prepared = await cache.aprepare("m", prompt(LONG_PROMPT, "first"))
+
+        assert prepared.cached_content == "cachedContents/1"
+        assert [m.content for m in prepared.messages] == ["first"]
+        assert provider.threads[0] is not threading.current_thread()
+
+    def test_discard_forgets_provider_cache(self):
+        """Should create a fresh cache after a rejected one is discarded."""
+        provider = FakeProvider()
+        cache = PromptPrefixCache(provider=provider, min_provider_tokens=1000)
+
+        prepared = cache.prepare("m", prompt(LONG_PROMPT))
+        cache.discard(prepared)
+        again = cache.prepare("m", prompt(LONG_PROMPT))
+
+        assert again.cached_content == "cachedContents/2"
+
+
+class TestAgentPromptCache:
+    """Test the agent's use of the prompt cache."""
+
+    @pytest.fixture
+    def cached_prompts(self):
+        from backend.app.core import agent
+
+        cache = PromptPrefixCache(provider=FakeProvider(), min_provider_tokens=1000)
+        with patch.object(agent, "prompt_cache", cache):
+            yield cache
+
+    @pytest.fixture
+    def state(self):
+        return {
+            "messages": [HumanMessage(content="Hello")],
+            "phase_instruction": LONG_PROMPT,
+        }
+
+    def test_sends_cached_content(self, cached_prompts, state):
+        """Should reference the provider cache instead of resending the prompt."""
+        from backend.app.core.agent import chatbot_node
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.return_value = AIMessage(content="Hi")
+        with patch("backend.app.core.agent._create_llm", return_value=mock_llm):
+            chatbot_node(state)
+
+        args, kwargs = mock_llm.invoke.call_args
+        assert kwargs == {"cached_content": "cachedContents/1"}
+        assert not any(isinstance(m, SystemMessage) for m in args[0])
+
+    def test_resends_full_prompt_when_cache_rejected(self, cached_prompts, state):
+        """Should fall back to the full prompt if the provider cache is gone."""
+        from backend.app.core.agent import chatbot_node
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            ValueError("CachedContent not found"),
+            AIMessage(content="Hi"),
+        ]
+        with patch("backend.app.core.agent._create_llm", return_value=mock_llm):
+            result = chatbot_node(state)
+
+        assert result["messages"][0].content == "Hi"
+        args, kwargs = mock_llm.invoke.call_args
+        assert kwargs == {}
+        assert isinstance(args[0][0], SystemMessage)
+
+    @pytest.mark.asyncio
+    async def test_async_node_sends_cached_content(self, cached_prompts, state):
+        """The async node should use the provider cache the same way."""
+        from unittest.mock import AsyncMock
+
+        from backend.app.core.agent import achatbot_node
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(return_value=AIMessage(content="Hi"))
+        with patch("backend.app.core.agent._create_llm", return_value=mock_llm):
+            await achatbot_node(state)
+
+        _, kwargs = mock_llm.ainvoke.call_args
+        assert kwargs == {"cached_content": "cachedContents/1"}
@@ -0,0 +1,110 @@
+"""
+Unit tests for backend/app/db/read_models.py
+
+Checks that the column-projection read paths return exactly what the
+Pydantic response models would, without loading ORM objects.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.api.endpoints.snippets import SnippetItem
+from backend.app.api.endpoints.stories import MessageResponse, StoryResponse
+from backend.app.db.read_models import SNIPPET_COLUMNS, row_to_dict
+from backend.app.main import app
+from backend.app.models.message import Message
+from backend.app.models.snippets import Snippet
+from backend.app.services.snippets import SnippetService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def snippets(mock_db_session, sample_story):
+    rows = [
+        Snippet(
+            user_id=sample_story.user_id,
+            story_id=sample_story.id,
+            title=f"Card {i}",
+            content="...",
+            theme="family",
+            is_locked=i == 0,
+            is_active=i < 2,
+            created_at=datetime(2024, 1, 1, 12, i, 0, 123456),
+        )
+        for i in range(3)
+    ]
+    mock_db_session.add_all(rows)
+    mock_db_session.commit()
+    return rows
+
+
+class TestReadModels:
+    """Test the projected rows and the endpoints that return them."""
+
+    def test_row_to_dict_matches_to_dict(self, mock_db_session, snippets):
+        """Projected snippets should look exactly like Snippet.to_dict()."""
+        row = (
+            mock_db_session.query(*SNIPPET_COLUMNS)
+            .filter(Snippet.id == snippets[0].id)
+            .one()
+        )
+
+        assert row_to_dict(row) == snippets[0].to_dict()
+
+    def test_story_messages_match_response_model(
+        self, authed, mock_db_session, sample_story
+    ):
+        message = Message(
+            story_id=sample_story.id,
+            role="user",
+            content="Hello",
+            created_at=datetime(2024, 1, 1, 12, 0, 0, 5),
+        )
+        mock_db_session.add(message)
+        mock_db_session.commit()
+
+        response = client.get(f"/api/stories/{sample_story.id}/messages")
+
+        expected = MessageResponse.model_validate(message).model_dump(mode="json")
+        assert response.json() == [expected]
+
+    def test_story_list_matches_response_model(self, authed, sample_story):
+        response = client.get("/api/stories/")
+
+        expected = StoryResponse.model_validate(sample_story).model_dump(mode="json")
+        assert response.json() == [expected]
+
+    def test_snippets_match_response_model(self, authed, sample_story, snippets):
+        response = client.get(f"/api/snippets/{sample_story.id}")
+
+        data = response.json()
+        assert data["count"] == 2
+        assert data["locked_count"] == 1
+        assert data["snippets"] == [
+            SnippetItem.model_validate(s).model_dump(mode="json")
+            for s in snippets[:2]
+        ]
+
+    def test_snippet_reads_do_not_load_orm_objects(
+        self, mock_db_session, sample_story, snippets
+    ):
+        """The snippet deck should be read without filling the identity map."""
+        story_id = sample_story.id
+        mock_db_session.expunge_all()
+        service = SnippetService(mock_db_session)
+
+        active = service.get_existing_snippets(story_id)
+        archived = service.get_archived_snippets(story_id)
+
+        assert active["count"] == 2
+        assert archived["count"] == 1
+        assert len(mock_db_session.identity_map) == 0
@@ -0,0 +1,208 @@
+"""
+Unit tests for backend/app/core/response_cache.py
+
+Tests the phase-entry response cache and its use by InterviewService.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.response_cache import ResponseCache, normalize_input
+from backend.app.services.interview import InterviewService
+
+
+class TestResponseCache:
+    """Test ResponseCache."""
+
+    def test_normalize_input(self):
+        """Should ignore case, extra whitespace and trailing punctuation."""
+        assert normalize_input("  Hello   there!! ") == "hello there"
+
+    def test_disabled_cache_has_no_keys(self):
+        """Should hand out no key, so lookups and stores are skipped."""
+        cache = ResponseCache(enabled=False)
+
+        assert cache.key("GREETING", None, "Hello") is None
+        assert cache.get(None) is None
+        assert cache.snapshot()["hits"] + cache.snapshot()["misses"] == 0
+
+    def test_hit_and_miss_counts(self):
+        """Should serve stored replies and report the hit rate."""
+        cache = ResponseCache(enabled=True)
+        key = cache.key("GREETING", None, "Hello")
+
+        assert cache.get(key) is None
+        cache.put(key, "Welcome!")
+        assert cache.get(cache.key("GREETING", None, "hello.")) == "Welcome!"
+
+        stats = cache.snapshot()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_key_includes_phase_and_age_range(self):
+        """Should keep replies apart per phase and age range."""
+        cache = ResponseCache(enabled=True)
+        cache.put(cache.key("FAMILY_HISTORY", "18_30", "3"), "Roots!")
+
+        assert cache.get(cache.key("FAMILY_HISTORY", "31_45", "3")) is None
+        assert cache.get(cache.key("CHILDHOOD", "18_30", "3")) is None
+
+    def test_entries_expire(self, clock):
+        """Should drop replies older than the TTL."""
+        cache = ResponseCache(enabled=True, ttl_seconds=60, clock=clock)
+        key = cache.key("GREETING", None, "Hello")
+        cache.put(key, "Welcome!")
+
+        clock.now += 61
+
+        assert cache.get(key) is None
+        assert cache.snapshot()["entries"] == 0
+
+    def test_evicts_least_recently_used(self):
+        """Should keep at most max_entries replies."""
+        cache = ResponseCache(enabled=True, max_entries=2)
+        a, b, c = (cache.key("GREETING", None, text) for text in "abc")
+        cache.put(a, "A")
+        cache.put(b, "B")
+        cache.get(a)
+        cache.put(c, "C")
+
+        assert cache.get(b) is None
+        assert cache.get(a) == "A"
+
+    def test_ignores_empty_and_non_text_replies(self):
+        """Should not store replies that cannot be served as text."""
+        cache = ResponseCache(enabled=True)
+        key = cache.key("GREETING", None, "Hello")
+
+        cache.put(key, "   ")
+        cache.put(key, [{"type": "text", "text": "Hi"}])
+
+        assert cache.snapshot()["entries"] == 0
+
+
+@pytest.fixture
+def entry_cache():
+    cache = ResponseCache(enabled=True)
+    with patch("backend.app.services.interview.phase_entry_cache", cache):
+        yield cache
+
+
+def new_story(db, user_id):
+    from backend.app.models.story import Story
+
+    story = Story(user_id=user_id, title="New", current_phase="GREETING")
+    db.add(story)
+    db.commit()
+    return story
+
+
+class TestPhaseEntryCaching:
+    """Test InterviewService serving phase-entry replies from the cache."""
+
+    def test_greeting_served_from_cache_for_next_story(
+        self, mock_db_session, sample_story, entry_cache
+    ):
+        """The second new story's greeting should not call the model."""
+        service = InterviewService(mock_db_session)
+        other_story = new_story(mock_db_session, sample_story.user_id)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Welcome!")]
+            }
+            service.process_chat(sample_story.id, "Hello")
+            reply, metadata = service.process_chat(other_story.id, "hello ")
+
+        assert mock_agent.invoke.call_count == 1
+        assert reply.content == "Welcome!"
+        assert reply.story_id == other_story.id
+        assert metadata["phase"] == "GREETING"
+        assert entry_cache.snapshot()["hits"] == 1
+
+    def test_age_selection_served_from_cache(
+        self, mock_db_session, sample_story, entry_cache
+    ):
+        """Picking the same age range should reuse the phase-entry reply."""
+        service = InterviewService(mock_db_session)
+        other_story = new_story(mock_db_session, sample_story.user_id)
+        marker = "[Age selected via button: 31_45]"
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Let's start with your roots.")]
+            }
+            service.process_chat(sample_story.id, marker)
+            reply, metadata = service.process_chat(other_story.id, marker)
+
+        assert mock_agent.invoke.call_count == 1
+        assert reply.content == "Let's start with your roots."
+        assert metadata["phase"] == "FAMILY_HISTORY"
+        assert metadata["age_range"] == "31_45"
+
+    def test_follow_up_turns_are_not_cached(
+        self, mock_db_session, sample_story, entry_cache
+    ):
+        """Only the first turn of a phase should be looked up."""
+        service = InterviewService(mock_db_session)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Welcome!")]
+            }
+            service.process_chat(sample_story.id, "Hello")
+            service.process_chat(sample_story.id, "Hello")
+
+        assert mock_agent.invoke.call_count == 2
+        assert entry_cache.snapshot()["misses"] == 1
+
+    def test_personal_history_is_not_shared(
+        self, mock_db_session, sample_story, entry_cache
+    ):
+        """A phase entry after free-text answers should always reach the model."""
+        service = InterviewService(mock_db_session)
+        sample_story.age_range = "31_45"
+        sample_story.current_phase = "FAMILY_HISTORY"
+        mock_db_session.commit()
+        marker = "[Moving to next phase: CHILDHOOD]"
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.invoke.return_value = {
+                "messages": [AIMessage(content="Tell me about Rome.")]
+            }
+            with patch("backend.app.services.interview.phase_summarizer"):
+                service.process_chat(sample_story.id, "My parents met in Rome")
+                service.process_chat(sample_story.id, marker, advance_phase=True)
+
+        # Only the first turn (keyed on its own text) was looked up
+        assert mock_agent.invoke.call_count == 2
+        assert entry_cache.snapshot()["misses"] == 1
+        assert entry_cache.snapshot()["hits"] == 0
+
+    def test_stream_chat_replays_cached_reply(
+        self, mock_db_session, sample_story, entry_cache
+    ):
+        """Streaming should store the joined reply and replay it as one token."""
+        service = InterviewService(mock_db_session)
+        other_story = new_story(mock_db_session, sample_story.user_id)
+
+        with patch("backend.app.services.interview.agent_app") as mock_agent:
+            mock_agent.stream.return_value = [
+                (AIMessageChunk(content="Wel"), {}),
+                (AIMessageChunk(content="come!"), {}),
+            ]
+            list(service.stream_chat(sample_story.id, "Hello"))
+            events = list(service.stream_chat(other_story.id, "Hello"))
+
+        assert mock_agent.stream.call_count == 1
+        assert events[0] == ("token", {"content": "Welcome!"})
+        assert events[-1][1]["content"] == "Welcome!"
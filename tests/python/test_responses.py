@@ -0,0 +1,123 @@
+"""
+Unit tests for backend/app/core/responses.py
+
+Tests the opt-in fast JSON path and that it sends the same JSON as the
+default response_model path.
+"""
+
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core import responses
+from backend.app.core.responses import (
+    ORJSONResponse,
+    json_response,
+    prebuilt_response,
+)
+from backend.app.main import app
+from backend.app.models.message import Message
+
+pytest.importorskip("orjson")
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def fast_json():
+    with patch.object(responses, "FAST_JSON_RESPONSES", True):
+        yield
+
+
+class TestResponses:
+    """Test json_response and prebuilt_response."""
+
+    def test_default_path_is_unchanged(self):
+        """With the setting off, prebuilt data goes back to FastAPI as is."""
+        content = {"id": 1}
+
+        assert prebuilt_response(content) is content
+        assert type(json_response(content)) is JSONResponse
+
+    def test_fast_path_uses_orjson(self, fast_json):
+        assert isinstance(prebuilt_response({"id": 1}), ORJSONResponse)
+        assert isinstance(json_response([]), ORJSONResponse)
+
+    def test_orjson_matches_stdlib_encoding(self):
+        content = [{"id": 1, "content": "Çocukluk 🏠", "created_at": None}]
+
+        fast = ORJSONResponse(content).body
+        default = JSONResponse(content).body
+
+        assert json.loads(fast) == json.loads(default)
+
+    def test_falls_back_without_orjson(self, fast_json):
+        with patch.object(responses, "orjson", None):
+            assert not responses.fast_json_enabled()
+            assert prebuilt_response({"id": 1}) == {"id": 1}
+
+
+class TestFastEndpoints:
+    """Test endpoints sending the same JSON on both paths."""
+
+    def test_story_messages_identical(self, authed, mock_db_session, sample_story):
+        mock_db_session.add(
+            Message(
+                story_id=sample_story.id,
+                role="assistant",
+                content="Welcome!",
+                created_at=datetime(2024, 1, 1, 12, 0, 0, 250000),
+            )
+        )
+        mock_db_session.commit()
+        url = f"/api/stories/{sample_story.id}/messages"
+
+        default = client.get(url)
+        with patch.object(responses, "FAST_JSON_RESPONSES", True):
+            fast = client.get(url)
+
+        assert fast.status_code == 200
+        assert fast.json() == default.json()
+        assert fast.headers["ETag"] == default.headers["ETag"]
+
+    def test_snippet_generation_payload_identical(self, authed, sample_story):
+        """The prebuilt SnippetsResponse body should match the validated one."""
+        result = {
+            "success": True,
+            "snippets": [
+                {
+                    "id": 1,
+                    "title": "Sea",
+                    "content": "...",
+                    "theme": None,
+                    "phase": "CHILDHOOD",
+                    "is_locked": False,
+                    "is_active": True,
+                    "created_at": "2024-01-01T12:00:00",
+                }
+            ],
+            "count": 1,
+            "model": "test-model-1",
+        }
+        url = f"/api/snippets/{sample_story.id}"
+
+        with patch(
+            "backend.app.api.endpoints.snippets.SnippetService.generate_snippets",
+            return_value=result,
+        ):
+            default = client.post(url)
+            with patch.object(responses, "FAST_JSON_RESPONSES", True):
+                fast = client.post(url)
+
+        assert fast.status_code == 200
+        assert fast.json() == default.json()
@@ -0,0 +1,245 @@
+"""
+Unit tests for backend/app/core/retry_policy.py
+
+Tests error classification, jittered backoff, the per-request deadline
+and the retry behaviour of the agent and snippet cascades.
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+# Add project root to path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from backend.app.core.llm_scheduler import QueueTimeout
+from backend.app.core.retry_policy import (
+    ACTION_FAIL,
+    ACTION_FALL_THROUGH,
+    ACTION_RETRY,
+    ERROR_BUSY,
+    ERROR_FATAL,
+    ERROR_RATE_LIMIT,
+    ERROR_TRANSIENT,
+    RetryPolicy,
+    classify_error,
+    retry_hint,
+)
+
+
+class ServerError(Exception):
+    def __init__(self, code):
+        super().__init__(f"{code} error")
+        self.code = code
+
+
+def no_jitter_policy(**kwargs) -> RetryPolicy:
+    kwargs.setdefault("jitter", lambda: 1.0)
+    return RetryPolicy(**kwargs)
+
+
+class TestClassifyError:
+    """Test classify_error and retry_hint."""
+
+    @pytest.mark.parametrize(
+        "error",
+        [
+            Exception("503 Service Unavailable"),
+            Exception("The model is overloaded. Please try again later."),
+            Exception("Deadline exceeded"),
+            TimeoutError("read timed out"),
+            ConnectionError("reset by peer"),
+            ServerError(500),
+        ],
+    )
+    def test_transient(self, error):
+        assert classify_error(error) == ERROR_TRANSIENT
+
+    def test_rate_limit(self):
+        assert classify_error(Exception("429 Resource exhausted")) == ERROR_RATE_LIMIT
+        assert classify_error(ServerError(429)) == ERROR_RATE_LIMIT
+
+    def test_busy(self):
+        assert classify_error(QueueTimeout("No slot")) == ERROR_BUSY
+
+    def test_fatal(self):
+        assert classify_error(ValueError("Invalid input format")) == ERROR_FATAL
+        assert classify_error(ServerError(400)) == ERROR_FATAL
+
+    def test_retry_hint(self):
+        """Should read the delay Gemini suggests in a 429."""
+        assert retry_hint(Exception("429 quota. Please retry in 2.5s.")) == 2.5
+        assert retry_hint(Exception("{'retryDelay': '41s'}")) == 41.0
+        assert retry_hint(Exception("429 quota")) is None
+
+
+class TestRetryPolicy:
+    """Test RetryPolicy and RetryBudget decisions."""
+
+    def test_backoff_doubles_up_to_max(self):
+        """Backoff ceilings should double per attempt and stop at max_delay."""
+        policy = no_jitter_policy(base_delay=0.5, max_delay=3)
+
+        assert [policy.backoff(n) for n in range(1, 5)] == [0.5, 1.0, 2.0, 3]
+
+    def test_backoff_is_jittered(self):
+        """Full jitter should scale the ceiling by a random factor."""
+        policy = RetryPolicy(base_delay=1, jitter=lambda: 0.25)
+
+        assert policy.backoff(3) == 1.0
+
+    def test_transient_retries_then_falls_through(self):
+        """Should retry the same model up to max_attempts, then move on."""
+        budget = no_jitter_policy(max_attempts=3).start()
+        error = Exception("503 unavailable")
+
+        actions = [budget.decide(error, "m").action for _ in range(3)]
+
+        assert actions == [ACTION_RETRY, ACTION_RETRY, ACTION_FALL_THROUGH]
+        # Attempts are counted per model
+        assert budget.decide(error, "other").action == ACTION_RETRY
+
+    def test_fatal_fails(self):
+        decision = no_jitter_policy().start().decide(ValueError("bad"), "m")
+
+        assert decision.kind == ERROR_FATAL
+        assert decision.action == ACTION_FAIL
+
+    def test_busy_falls_through(self):
+        decision = no_jitter_policy().start().decide(QueueTimeout("busy"), "m")
+
+        assert decision.action == ACTION_FALL_THROUGH
+
+    def test_rate_limit_hinted_mode(self):
+        """Should only wait on the model when the 429 names a short delay."""
+        budget = no_jitter_policy(rate_limit_mode="hinted", max_delay=8).start()
+
+        short = budget.decide(Exception("429. Please retry in 1.5s"), "a")
+        unhinted = budget.decide(Exception("429 quota"), "b")
+        long = budget.decide(Exception("429. Please retry in 40s"), "c")
+
+        assert (short.action, short.delay) == (ACTION_RETRY, 1.5)
+        assert unhinted.action == ACTION_FALL_THROUGH
+        assert long.action == ACTION_FALL_THROUGH
+
+    def test_rate_limit_always_and_never_modes(self):
+        always = no_jitter_policy(rate_limit_mode="always").start()
+        never = no_jitter_policy(rate_limit_mode="never").start()
+
+        assert always.decide(Exception("429 quota"), "m").action == ACTION_RETRY
+        assert (
+            never.decide(Exception("429. Please retry in 1s"), "m").action
+            == ACTION_FALL_THROUGH
+        )
+
+    def test_deadline_budget_stops_backoff(self, clock):
+        """Should not sleep past the request's deadline."""
+        budget = no_jitter_policy(
+            base_delay=2, max_delay=8, deadline=3, clock=clock
+        ).start()
+        error = Exception("503 unavailable")
+
+        assert budget.decide(error, "m").action == ACTION_RETRY
+        clock.now += 2
+        # The next backoff (4s) no longer fits in the remaining second
+        assert budget.decide(error, "m").action == ACTION_FALL_THROUGH
+
+
+@pytest.fixture
+def instant_retries():
+    """Retry without sleeping, for the agent and snippet cascades."""
+    from backend.app.core import agent
+    from backend.app.services import snippets
+
+    policy = RetryPolicy(jitter=lambda: 0.0)
+    with patch.object(agent, "retry_policy", policy):
+        with patch.object(snippets, "retry_policy", policy):
+            yield policy
+
+
+@pytest.fixture
+def state():
+    return {"messages": [HumanMessage(content="Hello")], "phase_instruction": "x"}
+
+
+class TestCascadeRetries:
+    """Test the cascades applying the retry policy."""
+
+    def test_agent_retries_transient_error_on_same_model(
+        self, instant_retries, state
+    ):
+        """A 503 followed by success should not leave the preferred model."""
+        from backend.app.core import agent
+        from backend.app.core.model_health import model_health
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            Exception("503 Service Unavailable"),
+            AIMessage(content="Hi"),
+        ]
+        with patch.object(agent, "_create_llm", return_value=mock_llm) as create:
+            result = agent.chatbot_node(state)
+
+        assert result["messages"][0].content == "Hi"
+        assert [c.args[0] for c in create.call_args_list] == [
+            "test-model-1",
+            "test-model-1",
+        ]
+        health = model_health.snapshot().get("test-model-1", {})
+        assert health.get("consecutive_failures", 0) == 0
+
+    def test_agent_falls_through_after_persistent_transient_errors(
+        self, instant_retries, state
+    ):
+        """Should try the next model instead of failing the request."""
+        from backend.app.core import agent
+
+        failing = MagicMock()
+        failing.invoke.side_effect = Exception("503 Service Unavailable")
+        working = MagicMock()
+        working.invoke.return_value = AIMessage(content="Hi")
+
+        def create(model_name):
+            return failing if model_name == "test-model-1" else working
+
+        with patch.object(agent, "_create_llm", side_effect=create):
+            result = agent.chatbot_node(state)
+
+        assert result["messages"][0].content == "Hi"
+        assert failing.invoke.call_count == instant_retries.max_attempts
+
+    @pytest.mark.asyncio
+    async def test_async_agent_retries_transient_error(self, instant_retries, state):
+        from backend.app.core import agent
+
+        mock_llm = MagicMock()
+        mock_llm.ainvoke = AsyncMock(
+            side_effect=[TimeoutError("timed out"), AIMessage(content="Hi")]
+        )
+        with patch.object(agent, "_create_llm", return_value=mock_llm):
+            result = await agent.achatbot_node(state)
+
+        assert result["messages"][0].content == "Hi"
+        assert mock_llm.ainvoke.call_count == 2
+
+    def test_snippets_retry_transient_error(self, instant_retries, mock_db_session):
+        """SnippetService should share the policy with the agent."""
+        from backend.app.services import snippets
+        from backend.app.services.snippets import SnippetService
+
+        mock_llm = MagicMock()
+        mock_llm.invoke.side_effect = [
+            Exception("500 Internal error"),
+            AIMessage(content='{"snippets": []}'),
+        ]
+        with patch.object(snippets.llm_clients, "get", return_value=mock_llm):
+            result = SnippetService(mock_db_session)._call_model_cascade(
+                "system", "prompt"
+            )
+
+        assert result["model"] == "test-model-1"
+        assert mock_llm.invoke.call_count == 2
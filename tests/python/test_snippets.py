@@ -662,6 +662,39 @@ class TestSnippetServicePersistence:
         assert len(remaining) == 1  # Still exists
         assert remaining[0].is_active is False  # But is soft-deleted
 
+    def test_save_snippets_batches_insert_without_refresh(
+        self, mock_db_session, sample_story, sample_user
+    ):
+        """_save_snippets should insert in one batch and not refresh rows."""
+        from sqlalchemy import event
+
+        statements = []
+        story_id, user_id = sample_story.id, sample_user.id
+
+        def before_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        engine = mock_db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", before_execute)
+        service = SnippetService(mock_db_session)
+        try:
+            saved = service._save_snippets(
+                story_id,
+                user_id,
+                [
+                    {"title": f"Card {i}", "content": "Content", "theme": "growth"}
+                    for i in range(3)
+                ],
+            )
+            dicts = [s.to_dict() for s in saved]
+        finally:
+            event.remove(engine, "before_cursor_execute", before_execute)
+
+        assert len([s for s in statements if "INSERT INTO snippets" in s]) == 1
+        assert not [s for s in statements if s.lstrip().startswith("SELECT")]
+        assert all(d["id"] is not None for d in dicts)
+        assert [d["is_active"] for d in dicts] == [True, True, True]
+
 
 class TestSnippetsEndpointCaching:
     """TDD tests for GET endpoint and caching behavior."""
@@ -1719,3 +1752,399 @@ class TestGetSnippetsWithLockedCount:
             assert data["locked_count"] == 1
         finally:
             app.dependency_overrides = {}
+
+
+class TestIncrementalSnippetGeneration:
+    """Tests for incremental snippet regeneration."""
+
+    def _reply(self, snippets):
+        return AIMessage(content=json.dumps({"snippets": snippets}))
+
+    def _add_message(self, db, story_id, content, role="user"):
+        from backend.app.models.message import Message
+
+        db.add(Message(story_id=story_id, role=role, content=content))
+        db.commit()
+
+    def test_full_generation_records_covered_message(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """Full generation should remember the last message it covered."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            service.generate_snippets(sample_story.id)
+
+        mock_db_session.refresh(sample_story)
+        assert sample_story.snippets_through_message_id == sample_messages_in_db[-1].id
+
+    def test_incremental_without_history_falls_back_to_full(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """Without a previous run, incremental mode should generate everything."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+            prompt = MockLLM.return_value.invoke.call_args[0][0][1].content
+
+        assert result["success"] is True
+        assert result["count"] == 2
+        assert "---STORY START---" in prompt
+
+    def test_incremental_sends_only_new_messages_and_digest(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """Should send new messages plus a digest of cards, not the full story."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            service.generate_snippets(sample_story.id)
+
+            self._add_message(
+                mock_db_session, sample_story.id, "Then I moved to Paris."
+            )
+            MockLLM.return_value.invoke.return_value = self._reply([])
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+            system, prompt = [
+                m.content for m in MockLLM.return_value.invoke.call_args[0][0]
+            ]
+
+        assert "Then I moved to Paris." in prompt
+        assert "Portugal" not in prompt
+        assert "Village Soccer Days" in system
+        # Nothing new: existing deck is kept
+        assert result["success"] is True
+        assert {s["title"] for s in result["snippets"]} == {
+            "Village Soccer Days",
+            "Roots in Portugal",
+        }
+
+    def test_incremental_adds_and_replaces_affected_cards(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """Should archive only the replaced card and add the new ones."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            first = service.generate_snippets(sample_story.id)
+
+            soccer_id = first["snippets"][0]["id"]
+            self._add_message(
+                mock_db_session, sample_story.id, "Later I coached the village team."
+            )
+            MockLLM.return_value.invoke.return_value = self._reply(
+                [
+                    {
+                        "title": "Village Coach",
+                        "content": "The boy who played soccer in the square came back to coach.",
+                        "phase": "EARLY_ADULTHOOD",
+                        "theme": "legacy",
+                        "replaces": soccer_id,
+                    },
+                    {
+                        "title": "New Horizons",
+                        "content": "They set out to see the world.",
+                        "phase": "EARLY_ADULTHOOD",
+                        "theme": "adventure",
+                        "replaces": None,
+                    },
+                ]
+            )
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+        titles = {s["title"] for s in result["snippets"]}
+        assert titles == {"Roots in Portugal", "Village Coach", "New Horizons"}
+        assert result["count"] == 3
+
+        archived = service.get_archived_snippets(sample_story.id)["snippets"]
+        assert [s["title"] for s in archived] == ["Village Soccer Days"]
+
+    def test_incremental_never_replaces_locked_cards(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """A card that names a locked card as replaced is added alongside it."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            first = service.generate_snippets(sample_story.id)
+
+            locked_id = first["snippets"][0]["id"]
+            service.toggle_lock(locked_id)
+            self._add_message(mock_db_session, sample_story.id, "More soccer stories.")
+            MockLLM.return_value.invoke.return_value = self._reply(
+                [
+                    {
+                        "title": "Soccer Again",
+                        "content": "They never stopped playing.",
+                        "replaces": locked_id,
+                    }
+                ]
+            )
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+        titles = {s["title"] for s in result["snippets"]}
+        assert "Village Soccer Days" in titles
+        assert "Soccer Again" in titles
+
+    def test_incremental_with_no_new_messages_skips_model(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """Should return the current deck without calling the model."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            service.generate_snippets(sample_story.id)
+
+            MockLLM.return_value.invoke.reset_mock()
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+            MockLLM.return_value.invoke.assert_not_called()
+
+        assert result["success"] is True
+        assert result["cached"] is True
+        assert result["count"] == 2
+
+    def test_incremental_releases_connection_and_respects_new_locks(
+        self,
+        mock_db_session,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """No transaction is open during the model call, and a card locked
+        meanwhile is not archived."""
+        service = SnippetService(mock_db_session)
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+            first = service.generate_snippets(sample_story.id)
+
+            soccer_id = first["snippets"][0]["id"]
+            self._add_message(mock_db_session, sample_story.id, "More soccer.")
+            in_transaction = []
+
+            def invoke(messages):
+                in_transaction.append(mock_db_session.in_transaction())
+                # The user locks the card while the model is running
+                service.toggle_lock(soccer_id)
+                return self._reply(
+                    [{"title": "Soccer Again", "content": "...", "replaces": soccer_id}]
+                )
+
+            MockLLM.return_value.invoke.side_effect = invoke
+            result = service.generate_snippets(sample_story.id, incremental=True)
+
+        assert in_transaction == [False]
+        titles = {s["title"] for s in result["snippets"]}
+        assert {"Village Soccer Days", "Soccer Again"} <= titles
+
+
+class TestSnippetJobsEndpoint:
+    """Tests for background snippet generation jobs."""
+
+    @pytest.fixture
+    def authed_client(self, mock_db_session, sample_user):
+        """Client authenticated as sample_user; job workers share the test DB."""
+        from sqlalchemy.orm import sessionmaker
+
+        from backend.app.core.auth import get_current_active_user
+        from backend.app.db.session import get_db
+
+        def override_get_db():
+            yield mock_db_session
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_active_user] = lambda: sample_user
+
+        worker_sessions = sessionmaker(bind=mock_db_session.get_bind())
+        with patch("backend.app.services.snippets.SessionLocal", worker_sessions):
+            yield client
+
+        app.dependency_overrides = {}
+
+    def test_background_post_returns_job(
+        self,
+        authed_client,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """POST ?background=true should answer 202 with a job to poll."""
+        from backend.app.services.snippets import snippet_jobs
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.return_value = mock_gemini_snippets_response
+
+            response = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true"
+            )
+            assert response.status_code == 202
+            data = response.json()
+            assert data["status"] in ("queued", "running", "succeeded")
+
+            assert snippet_jobs.get(data["job_id"]).wait(timeout=10)
+
+        response = authed_client.get(f"/api/snippets/jobs/{data['job_id']}")
+        assert response.status_code == 200
+        job = response.json()
+        assert job["status"] == "succeeded"
+        assert job["result"]["success"] is True
+        assert job["result"]["count"] == 2
+        assert job["result"]["snippets"][0]["title"] == "Village Soccer Days"
+
+    def test_background_post_deduplicates_per_story(
+        self,
+        authed_client,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """A second POST while the job is pending should return the same job."""
+        import threading
+
+        from backend.app.services.snippets import snippet_jobs
+
+        release = threading.Event()
+
+        def slow_invoke(*args, **kwargs):
+            release.wait(timeout=5)
+            return mock_gemini_snippets_response
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.side_effect = slow_invoke
+
+            first = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true"
+            ).json()
+            second = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true"
+            ).json()
+
+            release.set()
+            assert snippet_jobs.get(first["job_id"]).wait(timeout=10)
+
+        assert second["job_id"] == first["job_id"]
+        assert MockLLM.return_value.invoke.call_count == 1
+
+    def test_full_and_incremental_jobs_never_overlap(
+        self,
+        authed_client,
+        sample_story,
+        sample_messages_in_db,
+        mock_gemini_snippets_response,
+    ):
+        """A full run is refused (409) while an incremental job is pending."""
+        import threading
+
+        from backend.app.services.snippets import snippet_jobs
+
+        release = threading.Event()
+        lock = threading.Lock()
+        running = []
+        overlaps = []
+
+        def slow_invoke(*args, **kwargs):
+            with lock:
+                running.append(1)
+                overlaps.append(len(running))
+            release.wait(timeout=5)
+            with lock:
+                running.pop()
+            return mock_gemini_snippets_response
+
+        with patch("backend.app.services.snippets.ChatGoogleGenerativeAI") as MockLLM:
+            MockLLM.return_value.invoke.side_effect = slow_invoke
+
+            incremental = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true&incremental=true"
+            )
+            conflict = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true"
+            )
+
+            release.set()
+            assert snippet_jobs.get(incremental.json()["job_id"]).wait(timeout=10)
+
+            full = authed_client.post(
+                f"/api/snippets/{sample_story.id}?background=true"
+            )
+            assert snippet_jobs.get(full.json()["job_id"]).wait(timeout=10)
+
+        assert incremental.status_code == 202
+        assert incremental.json()["mode"] == "incremental"
+        assert conflict.status_code == 409
+        assert full.status_code == 202
+        assert full.json()["mode"] == "full"
+        assert full.json()["job_id"] != incremental.json()["job_id"]
+        assert max(overlaps) == 1
+
+    def test_failed_generation_reported_in_result(
+        self, authed_client, sample_story
+    ):
+        """A story without messages should finish with success=False in result."""
+        from backend.app.services.snippets import snippet_jobs
+
+        data = authed_client.post(
+            f"/api/snippets/{sample_story.id}?background=true"
+        ).json()
+        assert snippet_jobs.get(data["job_id"]).wait(timeout=10)
+
+        job = authed_client.get(f"/api/snippets/jobs/{data['job_id']}").json()
+        assert job["status"] == "succeeded"
+        assert job["result"]["success"] is False
+        assert "no messages" in job["result"]["error"].lower()
+
+    def test_get_job_not_found(self, authed_client):
+        """Should return 404 for an unknown job id."""
+        response = authed_client.get("/api/snippets/jobs/does-not-exist")
+        assert response.status_code == 404
+
+    def test_get_job_forbidden_other_user(self, authed_client, sample_user):
+        """Should return 403 for a job queued by another user."""
+        from backend.app.services.snippets import snippet_jobs
+
+        job = snippet_jobs.submit(
+            "snippets:other", lambda: None, owner_id=sample_user.id + 1
+        )
+        job.wait(timeout=5)
+
+        response = authed_client.get(f"/api/snippets/jobs/{job.id}")
+        assert response.status_code == 403
+
+    def test_get_job_unauthorized(self):
+        """Should reject request without authentication."""
+        response = client.get("/api/snippets/jobs/abc")
+        assert response.status_code == 401
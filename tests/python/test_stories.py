@@ -266,3 +266,120 @@ class TestStoryEndpoints:
             assert response.status_code == 404
         finally:
             app.dependency_overrides = {}
+
+
+class TestStoryMessagesEndpoint:
+    """Tests for incremental message fetching."""
+
+    @pytest.fixture
+    def messages(self, mock_db_session, sample_story):
+        from backend.app.models.message import Message
+
+        rows = [
+            Message(story_id=sample_story.id, role="user", content="Hello"),
+            Message(story_id=sample_story.id, role="assistant", content="Welcome!"),
+            Message(story_id=sample_story.id, role="user", content="I was born..."),
+        ]
+        mock_db_session.add_all(rows)
+        mock_db_session.commit()
+        return rows
+
+    @pytest.fixture
+    def authed(self, mock_db_session, sample_user):
+        from backend.app.api.endpoints.stories import get_current_active_user, get_db
+
+        def override_get_db():
+            yield mock_db_session
+
+        def override_get_current_user():
+            return sample_user
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_current_active_user] = override_get_current_user
+        token = create_access_token({"sub": str(sample_user.id)})
+        yield {"Authorization": f"Bearer {token}"}
+        app.dependency_overrides = {}
+
+    def test_returns_all_messages_without_cursor(self, authed, sample_story, messages):
+        """Should return the whole transcript when no cursor is given."""
+        response = client.get(
+            f"/api/stories/{sample_story.id}/messages", headers=authed
+        )
+
+        assert response.status_code == 200
+        assert [m["id"] for m in response.json()] == [m.id for m in messages]
+        assert response.headers["ETag"]
+
+    def test_after_id_returns_only_newer_messages(
+        self, authed, sample_story, messages
+    ):
+        """Should return only messages after the given id."""
+        response = client.get(
+            f"/api/stories/{sample_story.id}/messages",
+            params={"after_id": messages[0].id},
+            headers=authed,
+        )
+
+        assert response.status_code == 200
+        assert [m["id"] for m in response.json()] == [m.id for m in messages[1:]]
+
+    def test_since_filters_by_creation_time(
+        self, authed, mock_db_session, sample_story, messages
+    ):
+        """Should return only messages created after the given time."""
+        from datetime import datetime, timedelta
+
+        base = datetime(2024, 1, 1, 12, 0, 0)
+        for offset, message in enumerate(messages):
+            message.created_at = base + timedelta(minutes=offset)
+        mock_db_session.commit()
+
+        response = client.get(
+            f"/api/stories/{sample_story.id}/messages",
+            params={"since": (base + timedelta(seconds=30)).isoformat()},
+            headers=authed,
+        )
+
+        assert response.status_code == 200
+        assert [m["id"] for m in response.json()] == [m.id for m in messages[1:]]
+
+    def test_unchanged_poll_returns_304(self, authed, sample_story, messages):
+        """Should answer 304 with no body when the ETag still matches."""
+        url = f"/api/stories/{sample_story.id}/messages"
+        first = client.get(url, params={"after_id": messages[-1].id}, headers=authed)
+        assert first.json() == []
+
+        second = client.get(
+            url,
+            params={"after_id": messages[-1].id},
+            headers={**authed, "If-None-Match": first.headers["ETag"]},
+        )
+
+        assert second.status_code == 304
+        assert second.content == b""
+        assert second.headers["ETag"] == first.headers["ETag"]
+
+    def test_etag_changes_when_a_message_is_added(
+        self, authed, mock_db_session, sample_story, messages
+    ):
+        """Should return the new message once the transcript has grown."""
+        from backend.app.models.message import Message
+
+        url = f"/api/stories/{sample_story.id}/messages"
+        first = client.get(url, params={"after_id": messages[-1].id}, headers=authed)
+
+        new_message = Message(
+            story_id=sample_story.id, role="assistant", content="Go on"
+        )
+        mock_db_session.add(new_message)
+        mock_db_session.commit()
+
+        second = client.get(
+            url,
+            params={"after_id": messages[-1].id},
+            headers={**authed, "If-None-Match": first.headers["ETag"]},
+        )
+
+        assert second.status_code == 200
+        assert second.headers["ETag"] != first.headers["ETag"]
+        assert [m["id"] for m in second.json()] == [new_message.id]